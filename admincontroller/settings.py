@@ -11,7 +11,9 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 import os
 import sys
+import tempfile
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
 
 from pathlib import Path
 
@@ -90,6 +92,8 @@ WSGI_APPLICATION = 'admincontroller.wsgi.application'
 AUTH_USER_MODEL = 'authAPI.User'
 
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_EXPOSE_HEADERS = ['X-Translation-Partial', 'Server-Timing', 'ETag', 'Last-Modified']
+CORS_ALLOW_HEADERS = (*default_headers, 'if-none-match', 'if-modified-since')
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -156,3 +160,113 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Translations
+DEEPL_AUTH_KEY = os.getenv('DEEPL_AUTH_KEY')
+# Cliente de DeepL compartido: timeout de conexion (s), reintentos y conexiones keep-alive
+DEEPL_TIMEOUT = float(os.getenv('DEEPL_TIMEOUT') or '5')
+DEEPL_MAX_RETRIES = int(os.getenv('DEEPL_MAX_RETRIES') or '2')
+DEEPL_POOL_SIZE = int(os.getenv('DEEPL_POOL_SIZE') or '10')
+# Tamaño del LRU en memoria que se antepone a la tabla de traducciones
+TRANSLATION_CACHE_SIZE = int(os.getenv('TRANSLATION_CACHE_SIZE') or '4096')
+# Tiempo maximo (s) que una respuesta espera a DeepL; lo que no llega a
+# tiempo se devuelve en el idioma original con X-Translation-Partial: true
+TRANSLATION_DEADLINE = float(os.getenv('TRANSLATION_DEADLINE') or '1.5')
+TRANSLATION_WORKERS = int(os.getenv('TRANSLATION_WORKERS') or '4')
+# Circuit breaker de DeepL: fallos (o llamadas mas lentas que SLOW_CALL s)
+# seguidos para abrirlo y segundos que permanece abierto antes de probar
+TRANSLATION_BREAKER_FAILURES = int(os.getenv('TRANSLATION_BREAKER_FAILURES') or '5')
+TRANSLATION_BREAKER_SLOW_CALL = float(os.getenv('TRANSLATION_BREAKER_SLOW_CALL') or '3')
+TRANSLATION_BREAKER_RESET = float(os.getenv('TRANSLATION_BREAKER_RESET') or '30')
+# Memoria de traduccion: reutiliza segmentos ya traducidos (exactos o casi
+# identicos, con similitud de trigramas >= FUZZY_THRESHOLD)
+TRANSLATION_MEMORY_ENABLED = (os.getenv('TRANSLATION_MEMORY_ENABLED') or 'True') == 'True'
+TRANSLATION_MEMORY_FUZZY_THRESHOLD = float(os.getenv('TRANSLATION_MEMORY_FUZZY_THRESHOLD') or '0.8')
+TRANSLATION_MEMORY_SIZE = int(os.getenv('TRANSLATION_MEMORY_SIZE') or '20000')
+# Uso de DeepL: los contadores se vuelcan a la base de datos cada
+# FLUSH_INTERVAL s; con un presupuesto mensual de caracteres (0 = sin limite)
+# se pasa a modo solo-cache al consumir BUDGET_THRESHOLD del mismo
+TRANSLATION_USAGE_FLUSH_INTERVAL = float(os.getenv('TRANSLATION_USAGE_FLUSH_INTERVAL') or '60')
+DEEPL_CHARACTER_BUDGET = int(os.getenv('DEEPL_CHARACTER_BUDGET') or '0')
+DEEPL_BUDGET_THRESHOLD = float(os.getenv('DEEPL_BUDGET_THRESHOLD') or '0.9')
+
+# Autenticacion
+# Cache de usuarios autenticados por JWT: segundos de vida (0 la desactiva) y
+# numero maximo de usuarios; se invalida al guardar o borrar el usuario
+AUTH_USER_CACHE_TTL = float(os.getenv('AUTH_USER_CACHE_TTL') or '30')
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE') or '1024')
+# Limite de intentos de login (token bucket en memoria): rafaga y recarga
+# por minuto por usuario e IP, y en total por IP
+LOGIN_THROTTLE_BURST = int(os.getenv('LOGIN_THROTTLE_BURST') or '5')
+LOGIN_THROTTLE_PER_MINUTE = float(os.getenv('LOGIN_THROTTLE_PER_MINUTE') or '5')
+LOGIN_THROTTLE_IP_BURST = int(os.getenv('LOGIN_THROTTLE_IP_BURST') or '20')
+LOGIN_THROTTLE_IP_PER_MINUTE = float(os.getenv('LOGIN_THROTTLE_IP_PER_MINUTE') or '30')
+LOGIN_THROTTLE_SIZE = int(os.getenv('LOGIN_THROTTLE_SIZE') or '10000')
+# Proxies de confianza delante de la aplicacion. Con 0 la IP de los limites
+# es REMOTE_ADDR y se ignora X-Forwarded-For (lo envia el cliente); con N se
+# toma la N-esima direccion empezando por el final de X-Forwarded-For
+REST_FRAMEWORK = {
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES') or '0'),
+}
+# Los ultimos logins se acumulan en memoria y se escriben juntos cada N s
+LAST_LOGIN_FLUSH_INTERVAL = float(os.getenv('LAST_LOGIN_FLUSH_INTERVAL') or '5')
+# Refresh tokens revocados: filtro de Bloom en memoria (capacidad y tasa de
+# falsos positivos) sincronizado con la tabla cada SYNC_INTERVAL s; las
+# revocaciones caducadas se borran cada PRUNE_INTERVAL s
+TOKEN_REVOCATION_CAPACITY = int(os.getenv('TOKEN_REVOCATION_CAPACITY') or '10000')
+TOKEN_REVOCATION_ERROR_RATE = float(os.getenv('TOKEN_REVOCATION_ERROR_RATE') or '0.01')
+TOKEN_REVOCATION_SYNC_INTERVAL = float(os.getenv('TOKEN_REVOCATION_SYNC_INTERVAL') or '10')
+TOKEN_REVOCATION_PRUNE_INTERVAL = float(os.getenv('TOKEN_REVOCATION_PRUNE_INTERVAL') or '3600')
+
+# Cache de respuestas de los listados traducidos: 'locmem' (por defecto),
+# 'file' (en RESPONSE_CACHE_LOCATION, compartida entre procesos) o la ruta
+# de cualquier backend de cache de Django
+RESPONSE_CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND') or 'locmem'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': RESPONSE_CACHE_BACKENDS.get(RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_BACKEND),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION') or (
+            os.path.join(tempfile.gettempdir(), 'admincontroller-responses')
+            if RESPONSE_CACHE_BACKEND == 'file' else 'responses'
+        ),
+        'TIMEOUT': int(os.getenv('RESPONSE_CACHE_TIMEOUT') or '600'),
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES') or '1000')},
+    },
+}
+
+# Paginacion por cursor de pedidos y facturas: tamano por defecto y maximo
+# que se puede pedir con ?page_size=
+KEYSET_PAGE_SIZE = int(os.getenv('KEYSET_PAGE_SIZE') or '50')
+KEYSET_MAX_PAGE_SIZE = int(os.getenv('KEYSET_MAX_PAGE_SIZE') or '500')
+
+# Busqueda de platos: similitud minima de trigramas para aceptar una palabra
+# con erratas (indice en memoria) y numero maximo de resultados
+DISH_SEARCH_SIMILARITY = float(os.getenv('DISH_SEARCH_SIMILARITY') or '0.4')
+DISH_SEARCH_LIMIT = int(os.getenv('DISH_SEARCH_LIMIT') or '20')
+DISH_SEARCH_MAX_LIMIT = int(os.getenv('DISH_SEARCH_MAX_LIMIT') or '100')
+
+# Segundos que se reutiliza el mapa numero de mesa -> mesa en memoria (0 lo
+# desactiva); las escrituras de Desk de cualquier proceso lo invalidan antes
+# a traves de la version de Desk
+DESK_MAP_TTL = float(os.getenv('DESK_MAP_TTL') or '300')
+
+# Segundos entre comprobaciones de la version de Desk desde el mapa de mesas;
+# dentro de esa ventana las consultas por numero de mesa no tocan la base de
+# datos y las escrituras de otros procesos tardan como mucho eso en verse
+DESK_MAP_VERSION_INTERVAL = float(os.getenv('DESK_MAP_VERSION_INTERVAL') or '5')
+
+# Listados de platos, pedidos y lineas de pedido serializados con .values()
+# (dishesAPI.fast_serializer); False vuelve al ModelSerializer de DRF
+FAST_READ_SERIALIZATION = (os.getenv('FAST_READ_SERIALIZATION') or 'True') == 'True'
+
+# Listados con ?stream=1: filas leidas y codificadas por lote y uso de orjson
+# si esta instalado (si no, json de la libreria estandar)
+STREAMING_CHUNK_SIZE = int(os.getenv('STREAMING_CHUNK_SIZE') or '2000')
+STREAMING_USE_ORJSON = (os.getenv('STREAMING_USE_ORJSON') or 'True') == 'True'
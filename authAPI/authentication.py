@@ -0,0 +1,48 @@
+import jwt
+from django.conf import settings
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from .cache import user_cache
+from .models import User
+
+
+def decode_token(token, leeway=0):
+    """Verifica la firma y la caducidad del JWT y devuelve sus claims."""
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'], leeway=leeway)
+
+
+class JWTAuthentication(BaseAuthentication):
+    """
+    Autenticacion por `Authorization: Bearer <token>`.
+
+    El token se decodifica y verifica una sola vez por peticion: DRF guarda el
+    resultado en `request.user` (el usuario, via la cache de usuarios) y
+    `request.auth` (los claims). Sin cabecera la peticion es anonima.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith(f'{self.keyword} '):
+            return None
+        token = auth_header.split(' ')[1]
+        try:
+            payload = decode_token(token)
+        except jwt.ExpiredSignatureError:
+            raise AuthenticationFailed('Token expired')
+        except jwt.InvalidTokenError:
+            raise AuthenticationFailed('Invalid token')
+
+        try:
+            user = user_cache.get(payload['user_id'], lambda user_id: User.objects.get(id=user_id))
+        except KeyError:
+            raise AuthenticationFailed('Invalid token')
+        except User.DoesNotExist:
+            raise AuthenticationFailed('User not found')
+        if not user.is_active:
+            raise AuthenticationFailed('User inactive')
+        return user, payload
+
+    def authenticate_header(self, request):
+        return self.keyword
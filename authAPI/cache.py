@@ -0,0 +1,78 @@
+import threading
+import time
+
+from cachetools import TTLCache
+from django.conf import settings
+
+DEFAULT_USER_CACHE_TTL = 30.0
+DEFAULT_USER_CACHE_SIZE = 1024
+
+
+class UserCache:
+    """
+    Cache acotada y con TTL de los usuarios autenticados por JWT, indexada por
+    id. Evita una consulta a la tabla de usuarios en cada escritura protegida;
+    las senales de User la invalidan al guardar o borrar, de modo que un
+    usuario desactivado pierde el acceso de inmediato.
+    """
+
+    def __init__(self, ttl=None, maxsize=None, clock=time.monotonic):
+        if ttl is None:
+            ttl = getattr(settings, 'AUTH_USER_CACHE_TTL', DEFAULT_USER_CACHE_TTL)
+        if maxsize is None:
+            maxsize = getattr(settings, 'AUTH_USER_CACHE_SIZE', DEFAULT_USER_CACHE_SIZE)
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, timer=clock) if ttl > 0 else None
+        self._lock = threading.Lock()
+        # Se incrementa al invalidar: una lectura de la base de datos que
+        # empezo antes de la invalidacion no vuelve a guardar datos viejos
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id, loader):
+        """Usuario `user_id` desde la cache o desde `loader(user_id)`."""
+        if self._cache is None:
+            return loader(user_id)
+
+        with self._lock:
+            user = self._cache.get(user_id)
+            if user is not None:
+                self.hits += 1
+                return user
+            self.misses += 1
+            generation = self._generation
+
+        user = loader(user_id)
+        with self._lock:
+            if generation == self._generation:
+                self._cache[user_id] = user
+        return user
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generation += 1
+            if self._cache is not None:
+                self._cache.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            if self._cache is not None:
+                self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._cache) if self._cache is not None else 0,
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+user_cache = UserCache()
@@ -0,0 +1,74 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+
+class LastLoginBuffer:
+    """
+    Acumula en memoria el ultimo login de cada usuario y lo escribe con un
+    solo `bulk_update` como mucho cada `flush_interval` segundos (y al salir
+    del proceso), en lugar de una escritura sincrona por login. Varios logins
+    del mismo usuario entre volcados se reducen al mas reciente.
+    """
+
+    def __init__(self, flush_interval=None, clock=time.monotonic):
+        if flush_interval is None:
+            flush_interval = getattr(settings, 'LAST_LOGIN_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = clock()
+
+    def record(self, user_id, when=None):
+        with self._lock:
+            self._pending[user_id] = when or timezone.now()
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush_if_due(self):
+        if self._pending and self.clock() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Escribe los logins pendientes; devuelve cuantos usuarios actualizo."""
+        if not self._flush_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._last_flush = self.clock()
+            if not pending:
+                return 0
+            from .models import User
+
+            users = [User(id=user_id, last_login=when) for user_id, when in pending.items()]
+            try:
+                User.objects.bulk_update(users, ['last_login'])
+            except Exception as e:
+                logger.error(f"Could not flush last_login: {str(e)}")
+                with self._lock:
+                    for user_id, when in pending.items():
+                        self._pending.setdefault(user_id, when)
+                return 0
+            return len(users)
+        finally:
+            self._flush_lock.release()
+
+    def reset(self):
+        with self._lock:
+            self._pending = {}
+            self._last_flush = self.clock()
+
+
+last_login_buffer = LastLoginBuffer()
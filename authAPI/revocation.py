@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 10000
+DEFAULT_ERROR_RATE = 0.01
+DEFAULT_SYNC_INTERVAL = 10.0
+DEFAULT_PRUNE_INTERVAL = 3600.0
+
+
+class BloomFilter:
+    """
+    Conjunto aproximado en un bytearray: `in` nunca da falsos negativos y da
+    falsos positivos con probabilidad ~`error_rate` hasta `capacity` claves.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).digest()
+        a = int.from_bytes(digest[:8], 'big')
+        b = int.from_bytes(digest[8:16], 'big') | 1
+        return [(a + i * b) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    """
+    Lista de refresh tokens revocados (por jti).
+
+    La tabla RevokedToken es la fuente de verdad; delante hay un filtro de
+    Bloom en memoria con todos los jti revocados, de modo que el caso comun
+    (token no revocado) se resuelve sin consultas. Solo un positivo del filtro
+    se confirma en la base de datos. Cada `sync_interval` segundos se leen las
+    revocaciones nuevas de otros procesos y, cada `prune_interval`, se borran
+    las filas caducadas y se reconstruye el filtro.
+    """
+
+    def __init__(self, capacity=None, error_rate=None, sync_interval=None, prune_interval=None,
+                 clock=time.monotonic):
+        self.capacity = capacity or getattr(settings, 'TOKEN_REVOCATION_CAPACITY', DEFAULT_CAPACITY)
+        self.error_rate = error_rate or getattr(settings, 'TOKEN_REVOCATION_ERROR_RATE', DEFAULT_ERROR_RATE)
+        if sync_interval is None:
+            sync_interval = getattr(settings, 'TOKEN_REVOCATION_SYNC_INTERVAL', DEFAULT_SYNC_INTERVAL)
+        if prune_interval is None:
+            prune_interval = getattr(settings, 'TOKEN_REVOCATION_PRUNE_INTERVAL', DEFAULT_PRUNE_INTERVAL)
+        self.sync_interval = sync_interval
+        self.prune_interval = prune_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._last_id = 0
+        self._last_sync = None
+        self._last_prune = None
+        self.bloom_negatives = 0
+        self.db_checks = 0
+
+    def is_revoked(self, jti):
+        if not jti:
+            return False
+        self._sync_if_due()
+        if jti not in self._bloom:
+            self.bloom_negatives += 1
+            return False
+
+        from .models import RevokedToken
+
+        self.db_checks += 1
+        return RevokedToken.objects.filter(jti=jti, expires_at__gt=timezone.now()).exists()
+
+    def revoke(self, jti, expires_at):
+        from .models import RevokedToken
+
+        RevokedToken.objects.get_or_create(jti=jti, defaults={'expires_at': expires_at})
+        self._sync_if_due()
+        with self._lock:
+            self._bloom.add(jti)
+
+    def prune(self):
+        """Borra las revocaciones caducadas y reconstruye el filtro."""
+        from .models import RevokedToken
+
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        self._rebuild()
+        return deleted
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._last_id = 0
+            self._last_sync = None
+            self._last_prune = None
+            self.bloom_negatives = 0
+            self.db_checks = 0
+
+    def stats(self):
+        return {
+            'revoked': self._bloom.count if self._bloom is not None else None,
+            'bloom_bits': self._bloom.size if self._bloom is not None else None,
+            'bloom_negatives': self.bloom_negatives,
+            'db_checks': self.db_checks,
+        }
+
+    def _sync_if_due(self):
+        now = self.clock()
+        if self._bloom is None or self._last_prune is None or now - self._last_prune >= self.prune_interval:
+            try:
+                self.prune()
+            except Exception as e:
+                logger.error(f"Could not prune revoked tokens: {str(e)}")
+                if self._bloom is None:
+                    raise
+        elif now - self._last_sync >= self.sync_interval:
+            self._sync()
+
+    def _rebuild(self):
+        from .models import RevokedToken
+
+        rows = list(RevokedToken.objects.values_list('id', 'jti'))
+        bloom = BloomFilter(max(self.capacity, len(rows) * 2), self.error_rate)
+        for _, jti in rows:
+            bloom.add(jti)
+        with self._lock:
+            self._bloom = bloom
+            self._last_id = max((row_id for row_id, _ in rows), default=0)
+            self._last_sync = self._last_prune = self.clock()
+
+    def _sync(self):
+        from .models import RevokedToken
+
+        rows = list(RevokedToken.objects.filter(id__gt=self._last_id).values_list('id', 'jti'))
+        with self._lock:
+            for row_id, jti in rows:
+                self._bloom.add(jti)
+                self._last_id = max(self._last_id, row_id)
+            self._last_sync = self.clock()
+        if self._bloom.count > self._bloom.capacity:
+            # El filtro pierde precision por encima de su capacidad
+            self._rebuild()
+
+
+revocation_list = RevocationList()
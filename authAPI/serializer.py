@@ -10,6 +10,7 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'email', 'username', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser', 'date_joined', 'last_login', 'password']
+        read_only_fields = ['last_login']
 
     def create(self, validated_data):
         validated_data['password'] = make_password(validated_data['password'])
@@ -0,0 +1,24 @@
+import atexit
+
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import user_cache
+from .last_login import last_login_buffer
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(request_finished)
+def flush_last_login(sender, **kwargs):
+    # Se ejecuta cuando la respuesta ya se envio: el login no espera la escritura
+    last_login_buffer.flush_if_due()
+
+
+atexit.register(last_login_buffer.flush)
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+import jwt
+from django.conf import settings
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+
+from dishesAPI.models import Garrison
+from .. import authentication
+from ..authentication import JWTAuthentication
+from ..cache import user_cache
+from ..models import User
+
+
+def make_token(user_id, minutes=60, **claims):
+    token = jwt.encode({
+        'user_id': user_id,
+        'exp': datetime.utcnow() + timedelta(minutes=minutes),
+        'iat': datetime.utcnow(),
+        'type': 'access',
+        **claims,
+    }, settings.SECRET_KEY, algorithm='HS256')
+    return token
+
+
+class JWTAuthenticationTest(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(
+            email='auth@example.com',
+            username='authuser',
+            password='Testpassword123',
+            first_name='Auth',
+            last_name='User'
+        )
+        self.client = APIClient()
+        self.factory = APIRequestFactory()
+
+    def authenticate(self, token):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return JWTAuthentication().authenticate(request)
+
+    def test_returns_user_and_claims(self):
+        user, claims = self.authenticate(make_token(self.user.id))
+        self.assertEqual(user, self.user)
+        self.assertEqual(claims['type'], 'access')
+
+    def test_no_header_is_anonymous(self):
+        self.assertIsNone(JWTAuthentication().authenticate(self.factory.get('/')))
+
+    def test_invalid_tokens_rejected(self):
+        cases = {
+            'Token expired': make_token(self.user.id, minutes=-1),
+            'Invalid token': 'not-a-token',
+            'User not found': make_token(self.user.id + 100),
+        }
+        for message, token in cases.items():
+            with self.subTest(message):
+                with self.assertRaisesMessage(AuthenticationFailed, message):
+                    self.authenticate(token)
+
+    def test_inactive_user_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaisesMessage(AuthenticationFailed, 'User inactive'):
+            self.authenticate(make_token(self.user.id))
+
+    def test_token_decoded_once_per_write(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {make_token(self.user.id)}')
+        with mock.patch.object(authentication, 'decode_token', wraps=authentication.decode_token) as decode:
+            response = self.client.post('/api/category/', {'category_name': 'Entradas'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(decode.call_count, 1)
+
+    def test_reads_ignore_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        with mock.patch.object(authentication, 'decode_token') as decode:
+            response = self.client.get('/api/category/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        decode.assert_not_called()
+
+    def test_writes_require_token_on_every_protected_viewset(self):
+        response = self.client.post('/api/garrison/', {'garrison_name': 'Arroz'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+        self.assertFalse(Garrison.objects.exists())
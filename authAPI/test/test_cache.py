@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import jwt
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from dishesAPI.models import Category
+from ..cache import UserCache, user_cache
+from ..models import User
+
+
+class UserCacheTest(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(
+            email='cache@example.com',
+            username='cacheuser',
+            password='Testpassword123',
+            first_name='Cache',
+            last_name='User'
+        )
+        token = jwt.encode({
+            'user_id': self.user.id,
+            'exp': datetime.utcnow() + timedelta(minutes=60),
+            'iat': datetime.utcnow(),
+            'type': 'access',
+        }, settings.SECRET_KEY, algorithm='HS256')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def create_category(self, name):
+        return self.client.post('/api/category/', {'category_name': name}, format='json')
+
+    def test_repeated_writes_reuse_cached_user(self):
+        self.assertEqual(self.create_category('Entradas').status_code, status.HTTP_201_CREATED)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.create_category('Postres')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse([q for q in queries.captured_queries if 'authAPI_user' in q['sql']])
+        self.assertEqual(user_cache.stats()['hits'], 1)
+        self.assertEqual(user_cache.stats()['misses'], 1)
+
+    def test_deactivated_user_loses_access_immediately(self):
+        self.create_category('Entradas')
+        self.user.is_active = False
+        self.user.save()
+        response = self.create_category('Postres')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(Category.objects.count(), 1)
+
+    def test_deleted_user_loses_access_immediately(self):
+        self.create_category('Entradas')
+        self.user.delete()
+        response = self.create_category('Postres')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_entries_expire(self):
+        now = [0.0]
+        cache = UserCache(ttl=30, maxsize=10, clock=lambda: now[0])
+        cache.get(1, lambda user_id: 'user')
+        now[0] = 31.0
+        loads = []
+        cache.get(1, lambda user_id: loads.append(user_id) or 'user')
+        self.assertEqual(loads, [1])
+
+    def test_invalidation_during_load_is_not_overwritten(self):
+        cache = UserCache(ttl=60, maxsize=10)
+
+        def loader(user_id):
+            cache.invalidate(user_id)
+            return 'stale'
+        cache.get(1, loader)
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_zero_ttl_disables_cache(self):
+        cache = UserCache(ttl=0, maxsize=10)
+        loads = []
+        cache.get(1, loads.append)
+        cache.get(1, loads.append)
+        self.assertEqual(loads, [1, 1])
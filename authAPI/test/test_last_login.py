@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..last_login import LastLoginBuffer, last_login_buffer
+from ..models import User
+from ..throttling import login_ip_limiter, login_user_limiter
+
+
+class LastLoginBufferTest(TestCase):
+    def setUp(self):
+        last_login_buffer.reset()
+        login_ip_limiter.reset()
+        login_user_limiter.reset()
+        self.users = [
+            User.objects.create_user(
+                email=f'user{i}@example.com',
+                username=f'user{i}',
+                password='Testpassword123',
+                first_name='Test',
+                last_name='User'
+            )
+            for i in range(3)
+        ]
+
+    def test_login_does_not_write_last_login(self):
+        client = APIClient()
+        with self.assertNumQueries(1):
+            response = client.post(reverse('user-login'), {
+                'username': 'user0', 'password': 'Testpassword123'
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(User.objects.get(id=self.users[0].id).last_login)
+        self.assertEqual(last_login_buffer.pending(), 1)
+
+    def test_flush_coalesces_in_one_query(self):
+        buffer = LastLoginBuffer(flush_interval=60)
+        first = timezone.now() - timedelta(minutes=5)
+        latest = timezone.now()
+        buffer.record(self.users[0].id, first)
+        buffer.record(self.users[0].id, latest)
+        buffer.record(self.users[1].id, latest)
+        with self.assertNumQueries(1):
+            self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(User.objects.get(id=self.users[0].id).last_login, latest)
+        self.assertEqual(User.objects.get(id=self.users[1].id).last_login, latest)
+        self.assertIsNone(User.objects.get(id=self.users[2].id).last_login)
+
+    def test_flush_if_due_respects_interval(self):
+        now = [0.0]
+        buffer = LastLoginBuffer(flush_interval=5, clock=lambda: now[0])
+        buffer.record(self.users[0].id)
+        buffer.flush_if_due()
+        self.assertEqual(buffer.pending(), 1)
+        now[0] = 5.0
+        buffer.flush_if_due()
+        self.assertEqual(buffer.pending(), 0)
+        self.assertIsNotNone(User.objects.get(id=self.users[0].id).last_login)
+
+    def test_save_does_not_touch_last_login(self):
+        user = self.users[0]
+        user.first_name = 'Changed'
+        user.save()
+        self.assertIsNone(User.objects.get(id=user.id).last_login)
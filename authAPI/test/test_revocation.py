@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+import jwt
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import RevokedToken, User
+from ..revocation import BloomFilter, RevocationList, revocation_list
+from ..throttling import login_ip_limiter, login_user_limiter
+
+
+class BloomFilterTest(TestCase):
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TokenRevocationTest(TestCase):
+    def setUp(self):
+        revocation_list.reset()
+        login_ip_limiter.reset()
+        login_user_limiter.reset()
+        self.client = APIClient()
+        User.objects.create_user(
+            email='testuser@example.com',
+            username='testuser',
+            password='Testpassword123',
+            first_name='Test',
+            last_name='User'
+        )
+        response = self.client.post(reverse('user-login'), {
+            'username': 'testuser', 'password': 'Testpassword123'
+        }, format='json')
+        self.refresh = response.data['refresh']
+
+    def refresh_token(self, token):
+        return self.client.post(reverse('user-token-refresh'), {'refresh': token}, format='json')
+
+    def test_tokens_carry_jti(self):
+        payload = jwt.decode(self.refresh, options={'verify_signature': False})
+        self.assertEqual(len(payload['jti']), 32)
+
+    def test_revoked_token_cannot_refresh(self):
+        self.assertEqual(self.refresh_token(self.refresh).status_code, status.HTTP_200_OK)
+        response = self.client.post(reverse('user-token-revoke'), {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.refresh_token(self.refresh)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['error'], 'Refresh token revoked')
+
+    def test_not_revoked_check_needs_no_query(self):
+        self.refresh_token(self.refresh)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.refresh_token(self.refresh).status_code, status.HTTP_200_OK)
+        self.assertEqual(revocation_list.stats()['db_checks'], 0)
+
+    def test_revocations_from_other_processes_synced(self):
+        now = [0.0]
+        revocations = RevocationList(sync_interval=10, prune_interval=3600, clock=lambda: now[0])
+        self.assertFalse(revocations.is_revoked('abc'))
+        RevokedToken.objects.create(jti='abc', expires_at=timezone.now() + timedelta(days=1))
+        self.assertFalse(revocations.is_revoked('abc'))
+        now[0] = 10.0
+        self.assertTrue(revocations.is_revoked('abc'))
+
+    def test_expired_entries_pruned(self):
+        now = [0.0]
+        revocations = RevocationList(sync_interval=10, prune_interval=60, clock=lambda: now[0])
+        revocations.revoke('old', timezone.now() - timedelta(seconds=1))
+        revocations.revoke('new', timezone.now() + timedelta(days=1))
+        self.assertFalse(revocations.is_revoked('old'))
+        now[0] = 60.0
+        revocations.is_revoked('new')
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['new'])
+        self.assertEqual(revocations.stats()['revoked'], 1)
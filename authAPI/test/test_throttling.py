@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .. import views
+from ..models import User
+from ..throttling import TokenBucketLimiter, login_ip_limiter, login_user_limiter
+
+
+class TokenBucketLimiterTest(TestCase):
+    def setUp(self):
+        self.now = [0.0]
+        self.limiter = TokenBucketLimiter(capacity=2, rate=0.5, maxsize=2, clock=lambda: self.now[0])
+
+    def test_burst_then_refill(self):
+        self.assertEqual(self.limiter.consume('a'), 0)
+        self.assertEqual(self.limiter.consume('a'), 0)
+        self.assertEqual(self.limiter.consume('a'), 2.0)
+        self.now[0] = 2.0
+        self.assertEqual(self.limiter.consume('a'), 0)
+        self.assertGreater(self.limiter.consume('a'), 0)
+
+    def test_keys_are_independent_and_evicted(self):
+        self.limiter.consume('a')
+        self.limiter.consume('a')
+        self.assertEqual(self.limiter.consume('b'), 0)
+        self.limiter.consume('c')
+        self.assertEqual(len(self.limiter._buckets), 2)
+        self.assertEqual(self.limiter.consume('a'), 0)
+
+
+class LoginThrottleTest(TestCase):
+    def setUp(self):
+        login_ip_limiter.reset()
+        login_user_limiter.reset()
+        self.client = APIClient()
+        self.url = reverse('user-login')
+        User.objects.create_user(
+            email='victim@example.com',
+            username='victim',
+            password='Testpassword123',
+            first_name='Test',
+            last_name='User'
+        )
+
+    def login(self, username, password='wrong'):
+        return self.client.post(self.url, {'username': username, 'password': password}, format='json')
+
+    def test_brute_force_burst_rejected_before_password_check(self):
+        with mock.patch.object(views, 'check_password', wraps=views.check_password) as check:
+            responses = [self.login('victim') for _ in range(login_user_limiter.capacity + 3)]
+        codes = [response.status_code for response in responses]
+        self.assertEqual(codes[:login_user_limiter.capacity], [status.HTTP_400_BAD_REQUEST] * login_user_limiter.capacity)
+        self.assertEqual(set(codes[login_user_limiter.capacity:]), {status.HTTP_429_TOO_MANY_REQUESTS})
+        self.assertGreaterEqual(int(responses[-1]['Retry-After']), 1)
+        self.assertEqual(check.call_count, login_user_limiter.capacity)
+
+    def test_username_spraying_limited_per_ip(self):
+        codes = [self.login(f'user{i}').status_code for i in range(login_ip_limiter.capacity + 1)]
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertNotIn(status.HTTP_429_TOO_MANY_REQUESTS, codes[:-1])
+
+    def test_forwarded_for_header_does_not_bypass_limit(self):
+        with mock.patch.object(views, 'check_password', wraps=views.check_password) as check:
+            codes = [
+                self.client.post(
+                    self.url, {'username': 'victim', 'password': 'wrong'},
+                    format='json', HTTP_X_FORWARDED_FOR=f'203.0.113.{i}'
+                ).status_code
+                for i in range(login_user_limiter.capacity + 3)
+            ]
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(check.call_count, login_user_limiter.capacity)
+
+    @override_settings(REST_FRAMEWORK={'NUM_PROXIES': 1})
+    def test_trusted_proxy_uses_forwarded_address(self):
+        for _ in range(login_user_limiter.capacity + 1):
+            self.login('victim')
+        response = self.client.post(
+            self.url, {'username': 'victim', 'password': 'Testpassword123'},
+            format='json', HTTP_X_FORWARDED_FOR='198.51.100.7'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_other_ip_unaffected(self):
+        for _ in range(login_user_limiter.capacity + 1):
+            self.login('victim')
+        response = self.client.post(
+            self.url, {'username': 'victim', 'password': 'Testpassword123'},
+            format='json', REMOTE_ADDR='10.0.0.2'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -6,9 +6,12 @@ from rest_framework import status
 from django.urls import reverse
 
 from ..models import User
+from ..throttling import login_ip_limiter, login_user_limiter
 
 class UserViewSetTest(TestCase):
     def setUp(self):
+        login_ip_limiter.reset()
+        login_user_limiter.reset()
         self.client = APIClient()
         self.user = User.objects.create_user(
             email='testuser@example.com',
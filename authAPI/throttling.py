@@ -0,0 +1,75 @@
+import math
+import threading
+import time
+
+from cachetools import LRUCache
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+DEFAULT_LIMITER_SIZE = 10000
+
+
+class TokenBucketLimiter:
+    """
+    Limitador token bucket en memoria del proceso: cada clave tiene hasta
+    `capacity` intentos que se recargan a `rate` por segundo. Solo se guarda
+    [tokens, instante] por clave en un LRU acotado; las claves inactivas se
+    expulsan cuando se llena.
+    """
+
+    def __init__(self, capacity, rate, maxsize=DEFAULT_LIMITER_SIZE, clock=time.monotonic):
+        self.capacity = capacity
+        self.rate = rate
+        self.clock = clock
+        self._buckets = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def consume(self, key):
+        """Gasta un token de `key`; devuelve 0 o los segundos hasta el siguiente."""
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.capacity), now]
+            else:
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / self.rate
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+def _limiter(prefix, capacity, per_minute):
+    return TokenBucketLimiter(
+        capacity=getattr(settings, f'{prefix}_BURST', capacity),
+        rate=getattr(settings, f'{prefix}_PER_MINUTE', per_minute) / 60.0,
+        maxsize=getattr(settings, 'LOGIN_THROTTLE_SIZE', DEFAULT_LIMITER_SIZE),
+    )
+
+
+# Intentos por usuario desde una misma IP y, en total, por IP
+login_user_limiter = _limiter('LOGIN_THROTTLE', 5, 5)
+login_ip_limiter = _limiter('LOGIN_THROTTLE_IP', 20, 30)
+
+
+class LoginRateThrottle(BaseThrottle):
+    """
+    Limita los intentos de login antes de comprobar la contrasena. DRF
+    responde 429 con Retry-After cuando se agota alguno de los dos buckets.
+    """
+
+    def allow_request(self, request, view):
+        ip = self.get_ident(request)
+        self.wait_time = login_ip_limiter.consume(ip)
+        if not self.wait_time:
+            username = str(request.data.get('username') or '').strip().lower()
+            self.wait_time = login_user_limiter.consume(f'{username}:{ip}')
+        return not self.wait_time
+
+    def wait(self):
+        return math.ceil(self.wait_time)
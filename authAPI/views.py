@@ -3,15 +3,19 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.contrib.auth.hashers import check_password
-from django.contrib.auth.models import update_last_login
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 import jwt
 from django.conf import settings
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime, timedelta, timezone
 
+from .authentication import decode_token
+from .last_login import last_login_buffer
+from .revocation import revocation_list
 from .models import User
 from .serializer import UserSerializer
+from .throttling import LoginRateThrottle
 
 # Create your views here.
 class UserViewSet(viewsets.ModelViewSet):
@@ -26,7 +30,7 @@ class UserViewSet(viewsets.ModelViewSet):
             'password': openapi.Schema(type=openapi.TYPE_STRING),
         }
     ))
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], throttle_classes=[LoginRateThrottle])
     def login(self, request):
         try:
             username = request.data.get('username')
@@ -46,6 +50,7 @@ class UserViewSet(viewsets.ModelViewSet):
                 'exp': now + timedelta(minutes=60),
                 'iat': iat,
                 'type': 'access',
+                'jti': uuid.uuid4().hex,
             }, settings.SECRET_KEY, algorithm='HS256')
 
             refresh_token = jwt.encode({
@@ -53,9 +58,10 @@ class UserViewSet(viewsets.ModelViewSet):
                 'exp': now + timedelta(days=7),
                 'iat': iat,
                 'type': 'refresh',
+                'jti': uuid.uuid4().hex,
             }, settings.SECRET_KEY, algorithm='HS256')
 
-            update_last_login(None, user)
+            last_login_buffer.record(user.id)
             return Response({
                 'access': access_token,
                 'refresh': refresh_token,
@@ -75,7 +81,7 @@ class UserViewSet(viewsets.ModelViewSet):
         if not refresh_token:
             return Response({'error': 'Refresh token required'}, status=400)
         try:
-            payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=['HS256'], leeway=10)
+            payload = decode_token(refresh_token, leeway=10)
             if payload.get('type') != 'refresh':
                 return Response({'error': 'Invalid token type'}, status=400)
         except jwt.ExpiredSignatureError:
@@ -83,6 +89,9 @@ class UserViewSet(viewsets.ModelViewSet):
         except jwt.InvalidTokenError:
             return Response({'error': 'Invalid token'}, status=401)
 
+        if revocation_list.is_revoked(payload.get('jti')):
+            return Response({'error': 'Refresh token revoked'}, status=401)
+
         now = datetime.utcnow()
         iat = now - timedelta(seconds=10)
 
@@ -90,7 +99,36 @@ class UserViewSet(viewsets.ModelViewSet):
             'user_id': payload['user_id'],
             'exp': now + timedelta(minutes=60),
             'iat': iat,
-            'type': 'access'
+            'type': 'access',
+            'jti': uuid.uuid4().hex,
         }, settings.SECRET_KEY, algorithm='HS256')
 
         return Response({'access': access_token}, status=200)
+
+    @swagger_auto_schema(method='post', request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'refresh': openapi.Schema(type=openapi.TYPE_STRING),
+        }
+    ))
+    @action(detail=False, methods=['post'], url_path='token/revoke', authentication_classes=[], permission_classes=[AllowAny])
+    def token_revoke(self, request):
+        refresh_token = request.data.get('refresh')
+        if not refresh_token:
+            return Response({'error': 'Refresh token required'}, status=400)
+        try:
+            payload = decode_token(refresh_token, leeway=10)
+            if payload.get('type') != 'refresh':
+                return Response({'error': 'Invalid token type'}, status=400)
+        except jwt.ExpiredSignatureError:
+            # Un token caducado ya no sirve para refrescar
+            return Response({'detail': 'Refresh token revoked'}, status=200)
+        except jwt.InvalidTokenError:
+            return Response({'error': 'Invalid token'}, status=401)
+
+        if not payload.get('jti'):
+            return Response({'error': 'Token cannot be revoked'}, status=400)
+
+        expires_at = datetime.fromtimestamp(payload['exp'], tz=timezone.utc)
+        revocation_list.revoke(payload['jti'], expires_at)
+        return Response({'detail': 'Refresh token revoked'}, status=200)
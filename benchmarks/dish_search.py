@@ -0,0 +1,80 @@
+"""
+Benchmark: busqueda de platos sobre un catalogo sintetico grande.
+
+Compara lo que hacen hoy los clientes (descargar todos los platos y buscar
+subcadenas en nombre, descripcion e ingredientes) con el indice invertido de
+dishesAPI.search, que es el que se usa sin Postgres. Los platos se generan en
+memoria, asi que no necesita base de datos.
+
+    python benchmarks/dish_search.py --dishes 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'admincontroller.settings')
+
+import django
+
+django.setup()
+
+from dishesAPI.search import DishSearchIndex
+
+BASES = ['Pizza', 'Sopa', 'Ensalada', 'Tarta', 'Risotto', 'Milanesa', 'Empanada', 'Lasana', 'Crema', 'Guiso']
+STYLES = ['de la casa', 'casera', 'al horno', 'de temporada', 'especial', 'tradicional', 'picante']
+INGREDIENTS = [
+    'tomate', 'queso', 'albahaca', 'champinones', 'cebolla', 'pimiento', 'pollo', 'ternera',
+    'calabaza', 'espinaca', 'jamon', 'atun', 'huevo', 'patata', 'nata', 'ajo', 'limon', 'arroz',
+]
+QUERIES = ['tomate', 'pizza queso', 'risoto', 'champi', 'guiso ternera picante', 'calabza']
+
+
+def make_catalog(size, seed=1):
+    rng = random.Random(seed)
+    for dish_id in range(1, size + 1):
+        ingredients = rng.sample(INGREDIENTS, 4)
+        yield dish_id, {
+            'dish_name': f'{rng.choice(BASES)} {rng.choice(STYLES)} {dish_id}',
+            'description': f'Con {ingredients[0]} y {ingredients[1]}, {rng.choice(STYLES)}',
+            'search_ingredients': ' '.join(sorted(ingredients)),
+        }
+
+
+def linear_scan(catalog, query):
+    words = query.lower().split()
+    return [
+        dish_id for dish_id, fields in catalog
+        if all(any(word in text.lower() for text in fields.values()) for word in words)
+    ]
+
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - started) * 1000 / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--dishes', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    catalog = list(make_catalog(args.dishes))
+    index = DishSearchIndex()
+    build_ms, _ = timed(lambda: index.build(catalog), 1)
+    print(f"{args.dishes} dishes, index built in {build_ms:.0f} ms ({index.stats()['terms']} terms)")
+    print(f"{'query':>24} | {'scan ms':>8} {'hits':>6} | {'index ms':>8} {'top 20':>6} | {'speedup':>7}")
+    for query in QUERIES:
+        scan_ms, scan = timed(lambda: linear_scan(catalog, query), args.repeat)
+        index_ms, ranked = timed(lambda: index.search(query, 20), args.repeat)
+        print(f"{query:>24} | {scan_ms:8.1f} {len(scan):6d} | {index_ms:8.2f} {len(ranked):6d} | "
+              f"{scan_ms / max(index_ms, 1e-6):6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: serializacion de listados grandes con DRF y con FastSerializer.
+
+Crea una base de datos de pruebas (como `manage.py test`) con N platos y
+pedidos, y mide filas por segundo de los listados de platos, pedidos y lineas
+de pedido con el ModelSerializer de DRF (instancias + prefetch) y con
+FastSerializer (`.values()` + conversores precompilados). Ambos caminos
+incluyen las consultas. Comprueba ademas que las dos salidas son iguales.
+
+    python benchmarks/fast_serialization.py --rows 10000 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'admincontroller.settings')
+
+import django
+
+django.setup()
+
+from django.db import connection, transaction
+
+from dishesAPI.fast_serializer import FastSerializer
+from dishesAPI.models import Category, Desk, Dish, Ingredient, Order, OrderDish
+from dishesAPI.serializer import DishSerializer, OrderDishSerializer, OrderSerializer
+from dishesAPI.views import DishViewSet, OrderDishViewSet, OrderViewSet
+
+# Mismos querysets que DishViewSet, OrderViewSet y OrderDishViewSet
+CASES = [
+    ('dishes', DishSerializer, lambda: DishViewSet.queryset.order_by('-id')),
+    ('orders', OrderSerializer, lambda: OrderViewSet.queryset.order_by('-id')),
+    ('orderdish', OrderDishSerializer, lambda: OrderDishViewSet.queryset.order_by('-id')),
+]
+
+
+def populate(rows):
+    category = Category.objects.create(category_name='Principales')
+    desk = Desk.objects.create(desk_number=1, capacity=4)
+    ingredients = Ingredient.objects.bulk_create(Ingredient(ingredient_name=f'Ingrediente {i}') for i in range(20))
+    dishes = Dish.objects.bulk_create(
+        Dish(dish_name=f'Plato {i}', description='Plato de la casa con guarnicion', time_elaboration='00:20:00',
+             price=10 + i % 7, link_ar='http://example.com/ar', category=category, has_garrison=bool(i % 2))
+        for i in range(rows)
+    )
+    Dish.ingredient.through.objects.bulk_create(
+        Dish.ingredient.through(dish_id=dish.id, ingredient_id=ingredients[(dish.id + k) % 20].id)
+        for dish in dishes for k in range(3)
+    )
+    orders = Order.objects.bulk_create(
+        Order(desk=desk, date='2024-05-01', time='12:00:00', total_price=30.5, status='Paid')
+        for _ in range(rows)
+    )
+    OrderDish.objects.bulk_create(
+        OrderDish(order=order, dish=dishes[(order.id + k) % rows], quantity=k + 1)
+        for order in orders for k in range(2)
+    )
+
+
+def drf(serializer_class, queryset):
+    return serializer_class(queryset, many=True).data
+
+
+def fast(serializer_class, queryset):
+    serializer = FastSerializer.compile(serializer_class())
+    return serializer.serialize(serializer.values(queryset))
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 20000])
+    args = parser.parse_args()
+
+    print(f"{'list':>10} {'rows':>7} | {'DRF rows/s':>11} | {'fast rows/s':>11} | {'speedup':>7}")
+    name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        for rows in args.rows:
+            # Cada tamano se crea en una transaccion que se deshace al final
+            with transaction.atomic():
+                populate(rows)
+                for label, serializer_class, queryset in CASES:
+                    slow_s, expected = timed(drf, serializer_class, queryset())
+                    fast_s, data = timed(fast, serializer_class, queryset())
+                    assert data == expected, f'{label}: fast output differs from DRF'
+                    count = len(data)
+                    print(f"{label:>10} {count:7d} | {count / slow_s:11.0f} | {count / fast_s:11.0f} | "
+                          f"{slow_s / fast_s:6.1f}x")
+                transaction.set_rollback(True)
+    finally:
+        connection.creation.destroy_test_db(name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: coste de autenticacion por escritura protegida.
+
+Compara la ruta anterior (dispatch y el mixin llamaban cada uno a
+get_jwt_user: dos verificaciones HMAC y dos consultas del usuario) con
+JWTAuthentication (una verificacion por peticion y el usuario desde la cache).
+La consulta a la base de datos se simula con una espera fija, asi que no
+necesita base de datos.
+
+    python benchmarks/jwt_auth.py --query-ms 0.5
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'admincontroller.settings')
+
+import django
+
+django.setup()
+
+import jwt
+from django.conf import settings
+from rest_framework.test import APIRequestFactory
+
+from authAPI import authentication
+from authAPI.authentication import JWTAuthentication, decode_token
+from authAPI.cache import user_cache
+from authAPI.models import User
+
+
+def make_request(user_id):
+    token = jwt.encode({
+        'user_id': user_id,
+        'exp': datetime.utcnow() + timedelta(minutes=60),
+        'iat': datetime.utcnow(),
+        'type': 'access',
+    }, settings.SECRET_KEY, algorithm='HS256')
+    return APIRequestFactory().post('/api/category/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+class FakeUserManager:
+    def __init__(self, latency):
+        self.latency = latency
+        self.queries = 0
+
+    def get(self, id):
+        self.queries += 1
+        time.sleep(self.latency)
+        return User(id=id, username='bench', is_active=True)
+
+
+def old_path(request, users):
+    # get_jwt_user anterior, llamado desde dispatch y desde el mixin
+    for _ in range(2):
+        token = request.headers['Authorization'].split(' ')[1]
+        payload = decode_token(token)
+        user = users.get(id=payload['user_id'])
+        assert user.is_active
+
+
+def new_path(request, users):
+    JWTAuthentication().authenticate(request)
+
+
+def run(strategy, requests, latency, users_count):
+    users = FakeUserManager(latency)
+    authentication.User.objects = users
+    user_cache.clear()
+    batch = [make_request(i % users_count + 1) for i in range(requests)]
+    start = time.perf_counter()
+    for request in batch:
+        strategy(request, users)
+    elapsed = time.perf_counter() - start
+    return users.queries, elapsed * 1e6 / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--query-ms', type=float, default=0.5,
+                        help='Latencia simulada de la consulta del usuario')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=5,
+                        help='Usuarios distintos que escriben (back office)')
+    args = parser.parse_args()
+    latency = args.query_ms / 1000
+
+    manager = User.objects
+    try:
+        old_queries, old_us = run(old_path, args.requests, latency, args.users)
+        new_queries, new_us = run(new_path, args.requests, latency, args.users)
+    finally:
+        authentication.User.objects = manager
+
+    print(f"Simulated user query latency: {args.query_ms:.2f} ms, "
+          f"{args.requests} writes from {args.users} users")
+    print(f"{'path':>8} | {'queries':>8} {'us/request':>11}")
+    print(f"{'before':>8} | {old_queries:>8} {old_us:>11.1f}")
+    print(f"{'after':>8} | {new_queries:>8} {new_us:>11.1f}")
+    print(f"speedup: {old_us / new_us:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
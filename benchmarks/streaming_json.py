@@ -0,0 +1,95 @@
+"""
+Benchmark: memoria maxima y tiempo de listados grandes de lineas de pedido.
+
+Compara la respuesta normal (todas las filas serializadas en memoria y
+codificadas con el JSONRenderer de DRF) con el listado en streaming de
+dishesAPI.streaming, con orjson (si esta instalado) y con json de la libreria
+estandar. Crea una base de datos de pruebas como `manage.py test`. La memoria
+se mide con tracemalloc, asi que los tiempos son mas lentos que sin medir.
+
+    python benchmarks/streaming_json.py --rows 10000 50000 100000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'admincontroller.settings')
+
+import django
+
+django.setup()
+
+from django.db import connection, transaction
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from dishesAPI import streaming
+from dishesAPI.fast_serializer import FastSerializer
+from dishesAPI.models import Category, Desk, Dish, Order, OrderDish
+from dishesAPI.serializer import OrderDishSerializer
+
+
+def populate(rows):
+    category = Category.objects.create(category_name='Principales')
+    desk = Desk.objects.create(desk_number=1, capacity=4)
+    dish = Dish.objects.create(
+        dish_name='Plato', description='Plato de la casa', time_elaboration='00:20:00',
+        price=10, link_ar='http://example.com/ar', category=category,
+    )
+    order = Order.objects.create(desk=desk, date='2024-05-01', time='12:00:00', total_price=30.5, status='Paid')
+    OrderDish.objects.bulk_create(
+        (OrderDish(order=order, dish=dish, quantity=i % 5 + 1) for i in range(rows)), batch_size=5000
+    )
+
+
+def in_memory():
+    data = OrderDishSerializer(OrderDish.objects.order_by('-id'), many=True).data
+    return len(JSONRenderer().render(data))
+
+
+def streamed():
+    fast = FastSerializer.compile(OrderDishSerializer())
+    chunk_size = streaming.DEFAULT_CHUNK_SIZE
+    rows = fast.values(OrderDish.objects.order_by('-id')).iterator(chunk_size=chunk_size)
+    return sum(len(chunk) for chunk in streaming.stream_json_array(streaming.batches(rows, chunk_size), fast.serialize))
+
+
+def measure(function):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = function()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, elapsed, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 50000, 100000])
+    args = parser.parse_args()
+
+    modes = [('DRF in memory', in_memory, True), ('stream stdlib', streamed, False)]
+    if streaming.orjson is not None:
+        modes.append(('stream orjson', streamed, True))
+
+    name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        print(f"{'rows':>7} | {'mode':>14} | {'bytes':>10} | {'seconds':>7} | {'peak MiB':>8}")
+        for rows in args.rows:
+            with transaction.atomic():
+                populate(rows)
+                for label, function, use_orjson in modes:
+                    with override_settings(STREAMING_USE_ORJSON=use_orjson):
+                        size, elapsed, peak = measure(function)
+                    print(f"{rows:7d} | {label:>14} | {size:10d} | {elapsed:7.2f} | {peak:8.1f}")
+                transaction.set_rollback(True)
+    finally:
+        connection.creation.destroy_test_db(name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: peticiones a DeepL y latencia de traducir un menu completo.
+
+Compara la estrategia anterior (una llamada a translate_text por fila) con el
+BatchTranslator (todos los textos del payload, sin duplicados, en lotes).
+Usa un traductor falso local que simula la latencia de red por peticion, asi
+que no consume cuota de DeepL.
+
+    python benchmarks/translation_batching.py --latency-ms 20
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'admincontroller.settings')
+
+import django
+
+django.setup()
+
+from dishesAPI.translation import BatchTranslator
+
+FIELDS = ['dish_name', 'description']
+SIDES = ['con papas fritas', 'con ensalada', 'con arroz', 'salsa de la casa']
+
+
+class FakeResult:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeTranslator:
+    def __init__(self, latency):
+        self.latency = latency
+        self.round_trips = 0
+
+    def translate_text(self, texts, target_lang=None):
+        self.round_trips += 1
+        time.sleep(self.latency)
+        return [FakeResult(text.upper()) for text in texts]
+
+
+def build_menu(size):
+    return [
+        {
+            'id': i,
+            'dish_name': f'Plato {i}',
+            'description': f'Plato de la casa {SIDES[i % len(SIDES)]}',
+        }
+        for i in range(size)
+    ]
+
+
+def per_row(menu, translator):
+    for item in menu:
+        texts = [item[field] for field in FIELDS if item.get(field)]
+        results = translator.translate_text(texts, target_lang='EN-GB')
+        for field, result in zip(FIELDS, results):
+            item[field] = result.text
+
+
+def batched(menu, translator):
+    BatchTranslator(lambda: translator).translate_payload(menu, FIELDS, 'EN-GB')
+
+
+def run(strategy, size, latency):
+    translator = FakeTranslator(latency)
+    menu = build_menu(size)
+    start = time.perf_counter()
+    strategy(menu, translator)
+    return translator.round_trips, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--latency-ms', type=float, default=20.0,
+                        help='Latencia simulada por peticion a DeepL')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 120, 500, 1000])
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    print(f"Simulated DeepL latency: {args.latency_ms:.1f} ms per request")
+    print(f"{'dishes':>7} | {'per-row calls':>13} {'per-row ms':>11} | "
+          f"{'batched calls':>13} {'batched ms':>11} | {'speedup':>7}")
+    for size in args.sizes:
+        row_calls, row_ms = run(per_row, size, latency)
+        batch_calls, batch_ms = run(batched, size, latency)
+        print(f"{size:>7} | {row_calls:>13} {row_ms:>11.1f} | "
+              f"{batch_calls:>13} {batch_ms:>11.1f} | {row_ms / batch_ms:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
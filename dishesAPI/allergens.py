@@ -0,0 +1,74 @@
+from django.db.models import F
+
+from .models import Allergens, Dish
+
+# BigIntegerField con signo: los bits 0..62 son utilizables
+MAX_ALLERGEN_BITS = 63
+
+
+def next_free_bit():
+    used = set(Allergens.objects.exclude(bit=None).values_list('bit', flat=True))
+    for bit in range(MAX_ALLERGEN_BITS):
+        if bit not in used:
+            return bit
+    raise ValueError(f'No more than {MAX_ALLERGEN_BITS} allergens are supported.')
+
+
+def mask_for(bits):
+    mask = 0
+    for bit in bits:
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+
+def refresh_dish_masks(dish_ids):
+    """
+    Recalcula Dish.allergen_mask de `dish_ids` con una consulta y guarda solo
+    los que cambiaron. Devuelve el numero de platos actualizados.
+    """
+    dish_ids = set(dish_ids)
+    if not dish_ids:
+        return 0
+    bits = {dish_id: [] for dish_id in dish_ids}
+    current = {}
+    rows = Dish.objects.filter(id__in=dish_ids).values_list(
+        'id', 'allergen_mask', 'ingredient__allergen__bit'
+    )
+    for dish_id, mask, bit in rows:
+        current[dish_id] = mask
+        bits[dish_id].append(bit)
+
+    changed = [
+        Dish(id=dish_id, allergen_mask=mask_for(bits[dish_id]))
+        for dish_id, mask in current.items() if mask != mask_for(bits[dish_id])
+    ]
+    if changed:
+        Dish.objects.bulk_update(changed, ['allergen_mask'])
+    return len(changed)
+
+
+def dishes_with_ingredients(ingredient_ids):
+    return Dish.objects.filter(ingredient__in=ingredient_ids).values_list('id', flat=True).distinct()
+
+
+def exclude_allergens(queryset, allergen_ids):
+    """
+    Platos sin ninguno de los alergenos `allergen_ids`. Los que tienen bit se
+    filtran con un solo predicado sobre la mascara; los que no (creados sin
+    senales, p. ej. con bulk_create) se excluyen con el join de ingredientes
+    para que el filtro nunca deje pasar un plato con el alergeno.
+    """
+    bits = []
+    unmasked = []
+    for allergen_id, bit in Allergens.objects.filter(id__in=allergen_ids).values_list('id', 'bit'):
+        if bit is None:
+            unmasked.append(allergen_id)
+        else:
+            bits.append(bit)
+    mask = mask_for(bits)
+    if mask:
+        queryset = queryset.alias(blocked=F('allergen_mask').bitand(mask)).filter(blocked=0)
+    if unmasked:
+        queryset = queryset.exclude(ingredient__allergen__in=unmasked)
+    return queryset
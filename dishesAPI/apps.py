@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DishesapiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dishesAPI'
+
+    def ready(self):
+        from . import signals  # noqa: F401
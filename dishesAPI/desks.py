@@ -0,0 +1,108 @@
+import threading
+import time
+
+from django.conf import settings
+
+from .models import Desk
+from .versioning import get_versions
+
+DEFAULT_DESK_MAP_TTL = 300.0
+DEFAULT_DESK_MAP_VERSION_INTERVAL = 5.0
+
+
+class DeskMap:
+    """
+    Mapa numero de mesa -> Desk de todo el proceso, para las paginas de mesa
+    que se abren desde el codigo QR. Se carga entero con una consulta y en
+    cada uso, como mucho cada `version_interval` segundos, se compara con la
+    version de Desk (ModelVersion), que las senales incrementan al guardar o
+    borrar en cualquier proceso: si cambio, se vuelve a cargar. Dentro de esa
+    ventana las consultas no tocan la base de datos; las escrituras de este
+    proceso invalidan el mapa al momento y las de otros procesos se ven con
+    hasta `version_interval` segundos de retraso. Como red para las escrituras que no pasan por las
+    senales (update(), bulk_create...) el mapa caduca a los `ttl` segundos y
+    un numero que no esta en el mapa se busca en la base de datos.
+    """
+
+    def __init__(self, ttl=None, version_interval=None, clock=time.monotonic):
+        if ttl is None:
+            ttl = getattr(settings, 'DESK_MAP_TTL', DEFAULT_DESK_MAP_TTL)
+        if version_interval is None:
+            version_interval = getattr(settings, 'DESK_MAP_VERSION_INTERVAL',
+                                       DEFAULT_DESK_MAP_VERSION_INTERVAL)
+        self.ttl = ttl
+        self.version_interval = version_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._desks = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, desk_number):
+        """Mesa con `desk_number` o None si no existe."""
+        if self.ttl <= 0:
+            return Desk.objects.filter(desk_number=desk_number).first()
+
+        desks = self._current()
+        desk = desks.get(desk_number)
+        if desk is not None:
+            with self._lock:
+                self.hits += 1
+            return desk
+
+        with self._lock:
+            self.misses += 1
+        desk = Desk.objects.filter(desk_number=desk_number).first()
+        if desk is not None:
+            self.invalidate()
+        return desk
+
+    def invalidate(self):
+        with self._lock:
+            self._desks = None
+
+    def clear(self):
+        with self._lock:
+            self._desks = None
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._desks) if self._desks is not None else 0,
+                'ttl': self.ttl,
+                'version_interval': self.version_interval,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def _current(self):
+        with self._lock:
+            now = self.clock()
+            if (self._desks is not None and now - self._loaded_at < self.ttl
+                    and now - self._checked_at < self.version_interval):
+                return self._desks
+
+        # La version se lee antes que las mesas: si una escritura se cuela
+        # entre las dos consultas, la siguiente comprobacion vuelve a cargar
+        version = get_versions([Desk]).get(Desk._meta.model_name)
+        with self._lock:
+            now = self.clock()
+            if (self._desks is not None and self._version == version
+                    and now - self._loaded_at < self.ttl):
+                self._checked_at = now
+                return self._desks
+
+        desks = {desk.desk_number: desk for desk in Desk.objects.all()}
+        with self._lock:
+            self._desks = desks
+            self._version = version
+            self._loaded_at = self._checked_at = self.clock()
+        return desks
+
+
+desk_map = DeskMap()
@@ -0,0 +1,119 @@
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+
+# Conversiones equivalentes a to_representation de DRF para estos campos
+SIMPLE_CONVERTERS = {
+    serializers.CharField: str,
+    serializers.IntegerField: int,
+    serializers.FloatField: float,
+    serializers.BooleanField: bool,
+}
+
+
+def identity(value):
+    return value
+
+
+class FastSerializer:
+    """
+    Serializacion de solo lectura a partir de `.values()`.
+
+    Se compila desde un serializer de DRF ya construido (con `?fields=` y
+    `?omit=` aplicados): cada campo se traduce a una columna y un conversor, y
+    cada relacion M2M de ids a una consulta sobre la tabla intermedia para
+    toda la pagina (ordenados por id, como los Prefetch de las vistas). La
+    salida es la misma que la de `serializer.data` sin
+    crear instancias del modelo ni pasar por la maquinaria de campos de DRF
+    en cada fila. `compile()` devuelve None si el serializer tiene campos que
+    no sabe reproducir (anidados, de metodo, con `source` compuesto...).
+    """
+
+    def __init__(self, model, fields, many_to_many):
+        self.model = model
+        # (nombre, columna, conversor) en el orden de la salida; las M2M
+        # llevan conversor None y se rellenan desde la tabla intermedia
+        self.fields = fields
+        self.many_to_many = many_to_many
+
+    @classmethod
+    def compile(cls, serializer):
+        model = serializer.Meta.model
+        fields = []
+        many_to_many = {}
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            source = field.source
+            if '.' in source or source == '*':
+                return None
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                if hasattr(model, source):
+                    return None
+                # DRF omite los campos de solo lectura sin atributo en el modelo
+                continue
+
+            if isinstance(field, ManyRelatedField):
+                if not (isinstance(model_field, models.ManyToManyField)
+                        and type(field.child_relation) is PrimaryKeyRelatedField
+                        and field.child_relation.pk_field is None):
+                    return None
+                many_to_many[name] = model_field
+                fields.append((name, source, None))
+            elif isinstance(field, PrimaryKeyRelatedField):
+                if field.pk_field is not None or not model_field.many_to_one:
+                    return None
+                fields.append((name, source, identity))
+            elif isinstance(field, serializers.RelatedField) or isinstance(field, serializers.BaseSerializer):
+                return None
+            elif model_field.is_relation or not model_field.concrete:
+                return None
+            else:
+                fields.append((name, source, SIMPLE_CONVERTERS.get(type(field), field.to_representation)))
+        return cls(model, fields, many_to_many)
+
+    def values(self, queryset, extra=()):
+        """Queryset de dicts con las columnas de la salida y las de `extra`."""
+        names = [source for _, source, convert in self.fields if convert is not None]
+        names += [name for name in extra if name not in names]
+        if 'pk' not in names and self.model._meta.pk.name not in names:
+            names.append(self.model._meta.pk.name)
+        return queryset.prefetch_related(None).values(*names)
+
+    def serialize(self, rows):
+        rows = list(rows)
+        related = {
+            name: self._related_ids(model_field, rows) if rows else {}
+            for name, model_field in self.many_to_many.items()
+        }
+        pk_name = self.model._meta.pk.name
+        fields = self.fields
+        data = []
+        for row in rows:
+            item = {}
+            for name, source, convert in fields:
+                if convert is None:
+                    item[name] = related[name].get(row[pk_name], [])
+                    continue
+                value = row[source]
+                item[name] = None if value is None else convert(value)
+            data.append(item)
+        return data
+
+    def _related_ids(self, model_field, rows):
+        through = model_field.remote_field.through
+        source = through._meta.get_field(model_field.m2m_field_name()).attname
+        target = through._meta.get_field(model_field.m2m_reverse_field_name()).attname
+        pk_name = self.model._meta.pk.name
+        ids = defaultdict(list)
+        pairs = through.objects.filter(
+            **{f'{source}__in': [row[pk_name] for row in rows]}
+        ).order_by(target, 'pk').values_list(source, target)
+        for object_id, related_id in pairs:
+            ids[object_id].append(related_id)
+        return ids
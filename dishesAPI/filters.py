@@ -0,0 +1,18 @@
+from rest_framework.filters import BaseFilterBackend
+
+from .allergens import exclude_allergens
+
+
+class AllergenExclusionFilter(BaseFilterBackend):
+    """`?exclude_allergens=1,4`: platos sin los alergenos con esos ids."""
+    query_param = 'exclude_allergens'
+
+    def filter_queryset(self, request, queryset, view):
+        value = getattr(request, 'query_params', {}).get(self.query_param)
+        if not value:
+            return queryset
+        try:
+            allergen_ids = [int(part) for part in value.split(',') if part.strip()]
+        except ValueError:
+            raise ValueError(f"Invalid value for {self.query_param}: '{value}'.")
+        return exclude_allergens(queryset, allergen_ids)
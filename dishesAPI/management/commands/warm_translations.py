@@ -0,0 +1,121 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import deepl
+from django.core.management.base import BaseCommand, CommandError
+
+from dishesAPI.translation import (
+    BatchTranslator, CircuitOpenError, QuotaExceededError, target_languages,
+    translation_cache, translator_service, usage_tracker
+)
+from dishesAPI.translation.store import TRANSLATABLE_FIELDS, store_translations
+
+
+class MeteredTranslator:
+    """
+    Envuelve el cliente de DeepL para limitar las peticiones por segundo y
+    contar las peticiones y caracteres enviados.
+    """
+
+    def __init__(self, translator, rate=None):
+        self.translator = translator
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+        self.requests = 0
+        self.characters = 0
+
+    def translate_text(self, texts, **kwargs):
+        self._wait_for_slot()
+        results = self.translator.translate_text(texts, **kwargs)
+        with self._lock:
+            self.requests += 1
+            self.characters += sum(len(text) for text in texts)
+        return results
+
+    def _wait_for_slot(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Command(BaseCommand):
+    help = 'Pre-translate every dish, category and garrison into the supported languages.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--languages', nargs='+', choices=target_languages(),
+            help='Target languages (default: every supported language except the source one).'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=200,
+            help='Rows loaded and translated per step.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=2,
+            help='Concurrent DeepL requests.'
+        )
+        parser.add_argument(
+            '--rate', type=float, default=5.0,
+            help='Maximum DeepL requests per second (0 disables the limit).'
+        )
+
+    def handle(self, *args, **options):
+        languages = options['languages'] or target_languages()
+        chunk_size = options['chunk_size']
+        concurrency = options['concurrency']
+        if chunk_size < 1 or concurrency < 1:
+            raise CommandError('--chunk-size and --concurrency must be at least 1.')
+
+        try:
+            translator = MeteredTranslator(translator_service.get_translator(), options['rate'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        started = time.monotonic()
+        objects = stored = 0
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='warm-translations') as executor:
+            engine = BatchTranslator(
+                lambda: translator,
+                cache=translation_cache,
+                executor=executor,
+                breaker=translator_service.breaker,
+                usage=usage_tracker,
+                endpoint='warm_translations',
+            )
+            for model in TRANSLATABLE_FIELDS:
+                model_objects = model_stored = 0
+                last_pk = 0
+                while True:
+                    chunk = list(model.objects.filter(pk__gt=last_pk).order_by('pk')[:chunk_size])
+                    if not chunk:
+                        break
+                    last_pk = chunk[-1].pk
+                    try:
+                        model_stored += store_translations(model, chunk, engine, languages)
+                    except (deepl.exceptions.DeepLException, CircuitOpenError, QuotaExceededError) as e:
+                        raise CommandError(
+                            f'DeepL error after {objects + model_objects} objects: {str(e)}'
+                        )
+                    model_objects += len(chunk)
+                objects += model_objects
+                stored += model_stored
+                self.stdout.write(
+                    f'{model._meta.verbose_name_plural}: {model_objects} objects, '
+                    f'{model_stored} translations stored'
+                )
+
+        usage_tracker.flush()
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f'Warmed {stored} translations for {objects} objects in {", ".join(languages)} '
+            f'in {elapsed:.2f}s ({objects / elapsed:.1f} objects/s). '
+            f'DeepL requests: {translator.requests}, characters used: {translator.characters} '
+            f'({translator.characters / elapsed:.0f} chars/s).'
+        ))
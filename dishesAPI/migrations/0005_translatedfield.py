@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dishesAPI', '0004_translationcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslatedField',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('field_name', models.CharField(max_length=50)),
+                ('language', models.CharField(max_length=10)),
+                ('source_hash', models.CharField(max_length=64)),
+                ('text', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('model_name', 'object_id', 'language', 'field_name'), name='unique_translated_field')],
+            },
+        ),
+    ]
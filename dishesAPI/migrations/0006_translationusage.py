@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dishesAPI', '0005_translatedfield'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('endpoint', models.CharField(max_length=100)),
+                ('characters', models.BigIntegerField(default=0)),
+                ('deepl_requests', models.IntegerField(default=0)),
+                ('cache_hits', models.IntegerField(default=0)),
+                ('cache_misses', models.IntegerField(default=0)),
+                ('latency_ms', models.FloatField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'endpoint'), name='unique_translation_usage')],
+            },
+        ),
+    ]
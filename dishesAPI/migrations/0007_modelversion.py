@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:38
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def create_versions(apps, schema_editor):
+    ModelVersion = apps.get_model('dishesAPI', 'ModelVersion')
+    now = timezone.now()
+    ModelVersion.objects.bulk_create([
+        ModelVersion(model_name=name, version=1, updated_at=now)
+        for name in ('allergens', 'category', 'dish', 'garrison', 'ingredient')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dishesAPI', '0006_translationusage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=50, unique=True)),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
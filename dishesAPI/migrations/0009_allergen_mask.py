@@ -0,0 +1,45 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:52
+
+from django.db import migrations, models
+
+
+def assign_bits(apps, schema_editor):
+    Allergens = apps.get_model('dishesAPI', 'Allergens')
+    Dish = apps.get_model('dishesAPI', 'Dish')
+
+    bits = {}
+    for bit, allergen in enumerate(Allergens.objects.order_by('id')[:63]):
+        allergen.bit = bit
+        allergen.save(update_fields=['bit'])
+        bits[allergen.id] = bit
+
+    masks = {}
+    for dish_id, allergen_id in Dish.objects.values_list('id', 'ingredient__allergen'):
+        mask = masks.setdefault(dish_id, 0)
+        if allergen_id in bits:
+            masks[dish_id] = mask | (1 << bits[allergen_id])
+    Dish.objects.bulk_update(
+        [Dish(id=dish_id, allergen_mask=mask) for dish_id, mask in masks.items() if mask],
+        ['allergen_mask'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dishesAPI', '0008_order_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='allergens',
+            name='bit',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='dish',
+            name='allergen_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(assign_bits, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:56
+
+from django.db import migrations, models
+
+# Expresiones de los indices hasta la migracion 0013, que les quita los acentos
+SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('spanish', coalesce(dish_name, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(search_ingredients, '')), 'B') || "
+    "setweight(to_tsvector('spanish', coalesce(description, '')), 'C')"
+)
+SEARCH_TRIGRAM_TEXT = "(coalesce(dish_name, '') || ' ' || coalesce(search_ingredients, ''))"
+
+
+def fill_search_ingredients(apps, schema_editor):
+    Dish = apps.get_model('dishesAPI', 'Dish')
+
+    names = {}
+    for dish_id, name in Dish.objects.values_list('id', 'ingredient__ingredient_name'):
+        names.setdefault(dish_id, [])
+        if name:
+            names[dish_id].append(name)
+    Dish.objects.bulk_update(
+        [Dish(id=dish_id, search_ingredients=' '.join(sorted(values))) for dish_id, values in names.items() if values],
+        ['search_ingredients'], batch_size=1000
+    )
+
+
+def create_search_indexes(apps, schema_editor):
+    # tsvector y trigramas solo existen en Postgres; en el resto se usa el
+    # indice en memoria de dishesAPI.search
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS dish_search_document_idx ON "dishesAPI_dish" USING gin (({SEARCH_DOCUMENT}))'
+    )
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS dish_search_trigram_idx ON "dishesAPI_dish" '
+        f'USING gin ({SEARCH_TRIGRAM_TEXT} gin_trgm_ops)'
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS dish_search_document_idx')
+    schema_editor.execute('DROP INDEX IF EXISTS dish_search_trigram_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dishesAPI', '0009_allergen_mask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dish',
+            name='search_ingredients',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_ingredients, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:59
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def check_duplicate_desks(apps, schema_editor):
+    # Los pedidos cuelgan de la mesa: no se decide aqui cual conserva el
+    # numero, se para la migracion para corregirlo a mano
+    Desk = apps.get_model('dishesAPI', 'Desk')
+
+    numbers = (
+        Desk.objects.values('desk_number').annotate(total=Count('id'))
+        .filter(total__gt=1).values_list('desk_number', flat=True)
+    )
+    duplicates = {}
+    for desk_number, desk_id in Desk.objects.filter(desk_number__in=list(numbers)).order_by(
+            'desk_number', 'id').values_list('desk_number', 'id'):
+        duplicates.setdefault(desk_number, []).append(desk_id)
+    if duplicates:
+        details = '; '.join(
+            f"desk_number {desk_number}: ids {', '.join(str(desk_id) for desk_id in ids)}"
+            for desk_number, ids in duplicates.items()
+        )
+        raise RuntimeError(
+            f"Cannot make desk_number unique, renumber or merge these desks first: {details}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dishesAPI', '0010_dish_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_desks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dishesAPI', '0011_check_duplicate_desks'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='desk',
+            name='desk_number',
+            field=models.IntegerField(unique=True),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.6 on 2026-10-18 14:10
+
+from django.db import migrations
+
+# Mismas expresiones que dishesAPI.search.SEARCH_DOCUMENT y SEARCH_TRIGRAM_TEXT
+SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('spanish', search_unaccent(coalesce(dish_name, ''))), 'A') || "
+    "setweight(to_tsvector('spanish', search_unaccent(coalesce(search_ingredients, ''))), 'B') || "
+    "setweight(to_tsvector('spanish', search_unaccent(coalesce(description, ''))), 'C')"
+)
+SEARCH_TRIGRAM_TEXT = "search_unaccent(coalesce(dish_name, '') || ' ' || coalesce(search_ingredients, ''))"
+
+# Expresiones de la migracion 0010, para deshacer esta
+OLD_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('spanish', coalesce(dish_name, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(search_ingredients, '')), 'B') || "
+    "setweight(to_tsvector('spanish', coalesce(description, '')), 'C')"
+)
+OLD_SEARCH_TRIGRAM_TEXT = "(coalesce(dish_name, '') || ' ' || coalesce(search_ingredients, ''))"
+
+
+def create_indexes(schema_editor, document, trigram_text):
+    schema_editor.execute('DROP INDEX IF EXISTS dish_search_document_idx')
+    schema_editor.execute('DROP INDEX IF EXISTS dish_search_trigram_idx')
+    schema_editor.execute(
+        f'CREATE INDEX dish_search_document_idx ON "dishesAPI_dish" USING gin (({document}))'
+    )
+    schema_editor.execute(
+        f'CREATE INDEX dish_search_trigram_idx ON "dishesAPI_dish" USING gin ({trigram_text} gin_trgm_ops)'
+    )
+
+
+def unaccent_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+    # unaccent() no es IMMUTABLE y no se puede usar en un indice; con el
+    # diccionario explicito el resultado solo depende del texto
+    schema_editor.execute(
+        "CREATE OR REPLACE FUNCTION search_unaccent(text) RETURNS text "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+        "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+    )
+    create_indexes(schema_editor, SEARCH_DOCUMENT, SEARCH_TRIGRAM_TEXT)
+
+
+def restore_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    create_indexes(schema_editor, OLD_SEARCH_DOCUMENT, OLD_SEARCH_TRIGRAM_TEXT)
+    schema_editor.execute('DROP FUNCTION IF EXISTS search_unaccent(text)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dishesAPI', '0012_desk_number_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(unaccent_search_indexes, restore_search_indexes),
+    ]
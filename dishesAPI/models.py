@@ -5,11 +5,13 @@ class Category(models.Model):
     category_name = models.CharField(max_length=100)
 
 class Desk(models.Model):
-    desk_number = models.IntegerField()
+    desk_number = models.IntegerField(unique=True)
     capacity = models.IntegerField()
 
 class Allergens(models.Model):
     allergen_name = models.CharField(max_length=100)
+    # Posicion del alergeno en Dish.allergen_mask; se asigna al crearlo
+    bit = models.PositiveSmallIntegerField(unique=True, null=True, blank=True, editable=False)
 
 class Ingredient(models.Model):
     ingredient_name = models.CharField(max_length=100)
@@ -24,6 +26,10 @@ class Dish(models.Model):
     link_ar = models.CharField(max_length=1000)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     has_garrison = models.BooleanField(default=False)
+    # Un bit por alergeno (Allergens.bit) de cualquiera de sus ingredientes
+    allergen_mask = models.BigIntegerField(default=0, editable=False)
+    # Nombres de sus ingredientes, para el indice de busqueda (dishesAPI.search)
+    search_ingredients = models.TextField(default='', blank=True, editable=False)
 
 class Garrison(models.Model):
     garrison_name = models.CharField(max_length=100)
@@ -37,6 +43,12 @@ class Order(models.Model):
     status = models.CharField(max_length=100)
     order_dish = models.ManyToManyField(Dish, through='OrderDish')
 
+    class Meta:
+        indexes = [
+            # Orden de la paginacion por cursor de los pedidos
+            models.Index(fields=['date', 'time', 'id'], name='order_date_time_id_idx'),
+        ]
+
 class OrderDish(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE)
     dish = models.ForeignKey(Dish, on_delete=models.CASCADE)
@@ -50,4 +62,61 @@ class Invoice(models.Model):
 class InvoiceDish(models.Model):
     invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE)
     dish = models.ForeignKey(Dish, on_delete=models.CASCADE)
-    quantity = models.IntegerField(default=1)
\ No newline at end of file
+    quantity = models.IntegerField(default=1)
+
+class TranslationCacheEntry(models.Model):
+    source_hash = models.CharField(max_length=64)
+    target_lang = models.CharField(max_length=10)
+    source_text = models.TextField()
+    translated_text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source_hash', 'target_lang'],
+                name='unique_translation_cache_entry'
+            )
+        ]
+
+
+class TranslatedField(models.Model):
+    model_name = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    field_name = models.CharField(max_length=50)
+    language = models.CharField(max_length=10)
+    source_hash = models.CharField(max_length=64)
+    text = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model_name', 'object_id', 'language', 'field_name'],
+                name='unique_translated_field'
+            )
+        ]
+
+
+class TranslationUsage(models.Model):
+    date = models.DateField()
+    endpoint = models.CharField(max_length=100)
+    characters = models.BigIntegerField(default=0)
+    deepl_requests = models.IntegerField(default=0)
+    cache_hits = models.IntegerField(default=0)
+    cache_misses = models.IntegerField(default=0)
+    latency_ms = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'endpoint'],
+                name='unique_translation_usage'
+            )
+        ]
+
+
+class ModelVersion(models.Model):
+    model_name = models.CharField(max_length=50, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField()
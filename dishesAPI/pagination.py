@@ -0,0 +1,120 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_MAX_PAGE_SIZE = 500
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginacion por cursor sobre columnas indexadas.
+
+    El cursor guarda los valores de `ordering` (p. ej. fecha, hora e id) de la
+    ultima fila devuelta y la pagina siguiente se pide con
+    `WHERE date <= d AND (date < d OR (date = d AND time < t) OR (...))`. La
+    cota sobre la primera columna, fuera del OR, es la que el indice usa para
+    empezar a leer en el cursor, de modo que el coste es el mismo en la
+    primera pagina que en la pagina mil, a diferencia de OFFSET. El orden debe
+    terminar en una columna unica (el id) para que no haya empates.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('-id',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = getattr(view, 'ordering', None) or self.ordering
+        self.page_size = self.get_page_size(request)
+        fields = [field.lstrip('-') for field in self.ordering]
+
+        position = self.decode_cursor(request, queryset.model, fields)
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = [self.row_value(rows[-1], field) for field in fields] if self.has_next else None
+        return rows
+
+    @staticmethod
+    def row_value(row, field):
+        # Las filas pueden ser instancias o dicts de .values() (FastSerializer)
+        return row[field] if isinstance(row, dict) else getattr(row, field)
+
+    def get_page_size(self, request):
+        page_size = getattr(settings, 'KEYSET_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+        max_page_size = getattr(settings, 'KEYSET_MAX_PAGE_SIZE', DEFAULT_MAX_PAGE_SIZE)
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+            if requested > 0:
+                page_size = requested
+        except (KeyError, ValueError):
+            pass
+        return min(page_size, max_page_size)
+
+    def after(self, position):
+        """Filas estrictamente posteriores a `position` en el orden actual."""
+        conditions = []
+        for i, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {previous.lstrip('-'): position[j] for j, previous in enumerate(self.ordering[:i])}
+            conditions.append(Q(**equal, **{f'{name}__{lookup}': position[i]}))
+        after = reduce(or_, conditions)
+        if len(self.ordering) > 1:
+            first = self.ordering[0]
+            lookup = 'lte' if first.startswith('-') else 'gte'
+            after = Q(**{f"{first.lstrip('-')}__{lookup}": position[0]}) & after
+        return after
+
+    def decode_cursor(self, request, model, fields):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [model._meta.get_field(field).to_python(value) for field, value in zip(fields, values)]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in position]
+        return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,102 @@
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from functools import wraps
+
+from django.core.cache import caches
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = 'responses'
+
+
+class ResponseCache:
+    """
+    Cache de respuestas de los listados traducidos sobre un alias de CACHES
+    (memoria local por defecto, o ficheros u otro backend via settings).
+
+    La clave incluye las versiones de los modelos de los que depende la
+    respuesta (ver versioning), asi que cualquier escritura, tambien en las
+    relaciones M2M, la invalida sin borrar nada: las entradas viejas dejan de
+    usarse y caducan solas.
+    """
+
+    def __init__(self, alias=CACHE_ALIAS):
+        self.alias = alias
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def make_key(self, endpoint, versions, params):
+        parts = [f'{name}:{version}:{updated_at.isoformat()}' for name, (version, updated_at) in sorted(versions.items())]
+        parts += [f'{name}={value}' for name, values in sorted(params.lists()) for value in values]
+        digest = hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+        return f'{endpoint}:{digest}'
+
+    def get(self, endpoint, key):
+        try:
+            data = self.backend.get(key)
+        except Exception as e:
+            logger.error(f"Response cache read failed: {str(e)}")
+            data = None
+        with self._lock:
+            self._counters[endpoint]['hits' if data is not None else 'misses'] += 1
+        return data
+
+    def set(self, key, data):
+        try:
+            self.backend.set(key, data)
+        except Exception as e:
+            logger.error(f"Response cache write failed: {str(e)}")
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            self._counters.clear()
+
+    def stats(self):
+        with self._lock:
+            endpoints = {}
+            for endpoint, counters in self._counters.items():
+                total = counters['hits'] + counters['misses']
+                endpoints[endpoint] = {**counters, 'hit_ratio': counters['hits'] / total if total else None}
+        return {
+            'backend': type(self.backend).__name__,
+            'endpoints': endpoints,
+        }
+
+
+response_cache = ResponseCache()
+
+
+def cache_response(view_method):
+    """
+    Sirve la respuesta desde `response_cache` si la version de los datos y los
+    parametros coinciden. Solo se guardan respuestas 200 completas (las que
+    tienen traducciones pendientes se recalculan).
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        versions = getattr(self, 'versions', None)
+        if not versions:
+            return view_method(self, request, *args, **kwargs)
+
+        endpoint = f"{self.basename}-{self.action}"
+        key = response_cache.make_key(endpoint, versions, request.query_params)
+        data = response_cache.get(endpoint, key)
+        if data is not None:
+            response = Response(data)
+            response['X-Response-Cache'] = 'hit'
+            return response
+
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == 200 and not getattr(self, 'translation_partial', False):
+            response_cache.set(key, response.data)
+        response['X-Response-Cache'] = 'miss'
+        return response
+    return wrapper
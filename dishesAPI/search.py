@@ -0,0 +1,242 @@
+import heapq
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+from .models import Dish, Ingredient
+from .translation.memory import WORD, fuzzy_key, trigrams
+from .versioning import get_versions
+
+DEFAULT_SIMILARITY = 0.4
+DEFAULT_LIMIT = 20
+
+# Peso de cada campo en el ranking: nombre > ingredientes > descripcion
+FIELD_WEIGHTS = {'dish_name': 3.0, 'search_ingredients': 2.0, 'description': 1.0}
+
+# Expresiones de los indices creados en la migracion 0013 (solo Postgres);
+# las consultas deben repetirlas tal cual para que el planificador los use.
+# search_unaccent quita los acentos como fuzzy_key lo hace con la consulta
+SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('spanish', search_unaccent(coalesce(dish_name, ''))), 'A') || "
+    "setweight(to_tsvector('spanish', search_unaccent(coalesce(search_ingredients, ''))), 'B') || "
+    "setweight(to_tsvector('spanish', search_unaccent(coalesce(description, ''))), 'C')"
+)
+SEARCH_TRIGRAM_TEXT = "search_unaccent(coalesce(dish_name, '') || ' ' || coalesce(search_ingredients, ''))"
+
+
+def tokenize(text):
+    return WORD.findall(fuzzy_key(text or ''))
+
+
+def ingredient_text(names):
+    return ' '.join(sorted(name for name in names if name))
+
+
+def refresh_search_ingredients(dish_ids):
+    """
+    Recalcula Dish.search_ingredients (nombres de sus ingredientes) de
+    `dish_ids` y guarda solo los que cambiaron. Devuelve el numero de platos
+    actualizados.
+    """
+    dish_ids = set(dish_ids)
+    if not dish_ids:
+        return 0
+    names = {dish_id: [] for dish_id in dish_ids}
+    current = {}
+    rows = Dish.objects.filter(id__in=dish_ids).values_list(
+        'id', 'search_ingredients', 'ingredient__ingredient_name'
+    )
+    for dish_id, text, name in rows:
+        current[dish_id] = text
+        names[dish_id].append(name)
+
+    changed = [
+        Dish(id=dish_id, search_ingredients=ingredient_text(names[dish_id]))
+        for dish_id, text in current.items() if text != ingredient_text(names[dish_id])
+    ]
+    if changed:
+        Dish.objects.bulk_update(changed, ['search_ingredients'])
+    return len(changed)
+
+
+class DishSearchIndex:
+    """
+    Indice invertido en memoria para bases de datos sin tsvector (SQLite).
+
+    Cada palabra (sin acentos ni mayusculas) apunta a los platos que la
+    contienen con el peso del campo mas relevante en el que aparece. Las
+    palabras de la consulta que no estan en el vocabulario se buscan en un
+    indice de trigramas, lo que admite prefijos y erratas. El indice se
+    reconstruye cuando cambia la version de Dish o de Ingredient.
+    """
+
+    def __init__(self, similarity=None):
+        if similarity is None:
+            similarity = getattr(settings, 'DISH_SEARCH_SIMILARITY', DEFAULT_SIMILARITY)
+        self.similarity = similarity
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._grams = {}
+        self._versions = None
+
+    def build(self, documents):
+        """`documents` es un iterable de (id, {campo: texto})."""
+        postings = defaultdict(dict)
+        for dish_id, fields in documents:
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for token in tokenize(text):
+                    if postings[token].get(dish_id, 0) < weight:
+                        postings[token][dish_id] = weight
+        grams = defaultdict(set)
+        for token in postings:
+            for gram in trigrams(token):
+                grams[gram].add(token)
+        with self._lock:
+            self._postings = dict(postings)
+            self._grams = dict(grams)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """
+        Devuelve [(id, puntuacion)] de los platos que casan con todas las
+        palabras, los `limit` mejores o todos ordenados si `limit` es None.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            postings = self._postings
+            grams = self._grams
+
+        scores = None
+        for token in tokens:
+            token_scores = {}
+            for term, similarity in self._expand(token, postings, grams):
+                for dish_id, weight in postings[term].items():
+                    score = weight * similarity
+                    if score > token_scores.get(dish_id, 0):
+                        token_scores[dish_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    dish_id: score + token_scores[dish_id]
+                    for dish_id, score in scores.items() if dish_id in token_scores
+                }
+            if not scores:
+                return []
+        if limit is None:
+            return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def ensure_current(self):
+        versions = get_versions([Dish, Ingredient])
+        if versions == self._versions:
+            return
+        self.build(self._load())
+        self._versions = versions
+
+    def clear(self):
+        with self._lock:
+            self._postings = {}
+            self._grams = {}
+            self._versions = None
+
+    def stats(self):
+        with self._lock:
+            return {'terms': len(self._postings)}
+
+    def _expand(self, token, postings, grams):
+        """Palabras del vocabulario equivalentes a `token` con su similitud."""
+        if token in postings:
+            return [(token, 1.0)]
+        token_grams = trigrams(token)
+        shared = defaultdict(int)
+        for gram in token_grams:
+            for term in grams.get(gram, ()):
+                shared[term] += 1
+        matches = []
+        for term, common in shared.items():
+            score = common / (len(token_grams) + len(trigrams(term)) - common)
+            if len(token) >= 3 and term.startswith(token):
+                # Busqueda mientras se escribe: "tom" -> "tomate"
+                score = max(score, 0.9)
+            if score >= self.similarity:
+                matches.append((term, score))
+        return matches
+
+    def _load(self):
+        rows = Dish.objects.values_list('id', 'dish_name', 'description', 'search_ingredients')
+        for dish_id, dish_name, description, ingredients in rows.iterator(chunk_size=2000):
+            yield dish_id, {
+                'dish_name': dish_name,
+                'description': description,
+                'search_ingredients': ingredients,
+            }
+
+
+dish_search_index = DishSearchIndex()
+
+
+def uses_postgres_search():
+    return connection.vendor == 'postgresql'
+
+
+def postgres_queryset(queryset, query):
+    """
+    Platos de `queryset` en los que cada palabra de `query` aparece como
+    lexema o, con erratas y prefijos, por similitud de trigramas (operador
+    <%, con el umbral DISH_SEARCH_SIMILARITY), anotados con `search_rank`.
+    """
+    words = tokenize(query)
+    conditions = []
+    params = []
+    for word in words:
+        conditions.append(
+            f"(({SEARCH_DOCUMENT}) @@ plainto_tsquery('spanish', %s) OR %s <%% {SEARCH_TRIGRAM_TEXT})"
+        )
+        params += [word, word]
+    text = ' '.join(words)
+    matches = RawSQL(' AND '.join(conditions), params, output_field=BooleanField())
+    rank = RawSQL(
+        f"ts_rank({SEARCH_DOCUMENT}, plainto_tsquery('spanish', %s)) + word_similarity(%s, {SEARCH_TRIGRAM_TEXT})",
+        (text, text), output_field=FloatField()
+    )
+    return queryset.filter(matches).annotate(search_rank=rank).order_by('-search_rank', 'id')
+
+
+def postgres_search(queryset, query, limit):
+    if not tokenize(query):
+        return []
+    return list(postgres_queryset(queryset, query)[:limit])
+
+
+def set_similarity_threshold(connection):
+    """Umbral de pg_trgm para `<%` en la sesion, el mismo que el del indice en memoria."""
+    similarity = getattr(settings, 'DISH_SEARCH_SIMILARITY', DEFAULT_SIMILARITY)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)", [str(similarity)])
+
+
+def search_dishes(queryset, query, limit=DEFAULT_LIMIT):
+    """Platos de `queryset` que casan con `query`, del mas al menos relevante."""
+    if uses_postgres_search():
+        return postgres_search(queryset, query, limit)
+
+    dish_search_index.ensure_current()
+    # `queryset` puede descartar platos (p. ej. ?exclude_allergens=): se
+    # recorre el ranking por tramos hasta reunir `limit` platos
+    ranked = [dish_id for dish_id, _ in dish_search_index.search(query, None)]
+    results = []
+    step = limit * 2
+    for start in range(0, len(ranked), step):
+        ids = ranked[start:start + step]
+        dishes = queryset.in_bulk(ids)
+        results += [dishes[dish_id] for dish_id in ids if dish_id in dishes]
+        if len(results) >= limit:
+            break
+    return results[:limit]
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from .models import (
     Desk,
     Allergens,
@@ -12,54 +13,111 @@ from .models import (
     InvoiceDish
 )
 
-class CategorySerializer(serializers.ModelSerializer):
+def split_param(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+class SparseFieldsMixin:
+    """
+    Permite pedir solo algunos campos en las lecturas: `?fields=id,dish_name`
+    devuelve solo esos y `?omit=description` los quita. Se aplica al
+    serializer principal de la respuesta, no a los anidados.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        params = getattr(request, 'query_params', None)
+        if not params or request.method not in SAFE_METHODS or not self.is_root_serializer():
+            return fields
+
+        only = split_param(params.get('fields'))
+        if only:
+            fields = {name: field for name, field in fields.items() if name in only}
+        for name in split_param(params.get('omit')):
+            fields.pop(name, None)
+        return fields
+
+    def is_root_serializer(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = '__all__'
 
-class DeskSerializer(serializers.ModelSerializer):
+class DeskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Desk
         fields = '__all__'
 
-class AllergensSerializer(serializers.ModelSerializer):
+class AllergensSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Allergens
-        fields = '__all__'
+        exclude = ['bit']
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Ingredient
         fields = '__all__'
 
-class DishSerializer(serializers.ModelSerializer):
+class DishSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Dish
-        fields = '__all__'
+        exclude = ['allergen_mask', 'search_ingredients']
 
-class GarrisonSerializer(serializers.ModelSerializer):
+class GarrisonSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Garrison
         fields = '__all__'
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     dishes = DishSerializer(many=True, read_only=True)
 
     class Meta:
         model = Order
         fields = '__all__'
 
-class OrderDishSerializer(serializers.ModelSerializer):
+class OrderDishSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = OrderDish
         fields = '__all__'
 
-class InvoiceSerializer(serializers.ModelSerializer):
+class InvoiceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Invoice
         fields = '__all__'
 
-class InvoiceDishSerializer(serializers.ModelSerializer):
+class InvoiceDishSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = InvoiceDish
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class MenuIngredientSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    allergen = AllergensSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Ingredient
+        fields = '__all__'
+
+class MenuGarrisonSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Garrison
+        fields = ['id', 'garrison_name']
+
+class MenuDishSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    ingredient = MenuIngredientSerializer(many=True, read_only=True)
+    garrisons = MenuGarrisonSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Dish
+        exclude = ['allergen_mask', 'search_ingredients']
+
+class MenuSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    dishes = MenuDishSerializer(many=True, read_only=True, source='dish_set')
+
+    class Meta:
+        model = Category
+        fields = ['id', 'category_name', 'dishes']
@@ -0,0 +1,181 @@
+import atexit
+import logging
+from functools import partial
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .allergens import dishes_with_ingredients, next_free_bit, refresh_dish_masks
+from .desks import desk_map
+from .models import Allergens, Category, Desk, Dish, Garrison, Ingredient
+from .search import refresh_search_ingredients, set_similarity_threshold
+from .translation import default_engine, usage_tracker
+from .translation.store import delete_instance_translations, store_instance_translations
+from .versioning import bump_version
+
+logger = logging.getLogger(__name__)
+
+
+def translate_instance(instance):
+    try:
+        store_instance_translations(instance, default_engine(f'write:{instance._meta.model_name}'))
+    except Exception as e:
+        # La escritura ya se confirmo; la lectura traducira lo que falte
+        logger.error(f"Could not store translations for {instance._meta.model_name} {instance.pk}: {str(e)}")
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Dish)
+@receiver(post_save, sender=Garrison)
+def translate_on_write(sender, instance, raw=False, **kwargs):
+    if raw or not getattr(settings, 'DEEPL_AUTH_KEY', None):
+        return
+    transaction.on_commit(partial(translate_instance, instance))
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Dish)
+@receiver(post_delete, sender=Garrison)
+def delete_translations(sender, instance, **kwargs):
+    delete_instance_translations(instance)
+
+
+@receiver(post_save, sender=Allergens)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Dish)
+@receiver(post_save, sender=Garrison)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Allergens)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Dish)
+@receiver(post_delete, sender=Garrison)
+@receiver(post_delete, sender=Ingredient)
+def bump_model_version(sender, raw=False, **kwargs):
+    if not raw:
+        bump_version(sender)
+
+
+# Modelos que muestran una relacion M2M con el modelo borrado: el borrado
+# elimina las filas de la tabla intermedia sin enviar m2m_changed
+M2M_DEPENDENTS = {
+    Allergens: [Ingredient],
+    Dish: [Garrison],
+    Ingredient: [Dish],
+}
+
+
+@receiver(post_delete, sender=Allergens)
+@receiver(post_delete, sender=Dish)
+@receiver(post_delete, sender=Ingredient)
+def bump_dependent_versions(sender, **kwargs):
+    for model in M2M_DEPENDENTS[sender]:
+        bump_version(model)
+
+
+@receiver(m2m_changed, sender=Dish.ingredient.through)
+@receiver(m2m_changed, sender=Ingredient.allergen.through)
+@receiver(m2m_changed, sender=Garrison.dish.through)
+def bump_relation_version(sender, instance, action, model, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    # La relacion se ve desde ambos lados (p. ej. Garrison.dish en el menu)
+    bump_version(type(instance))
+    bump_version(model)
+
+
+@receiver(pre_save, sender=Allergens)
+def assign_allergen_bit(sender, instance, raw=False, **kwargs):
+    if instance.bit is None and not raw:
+        instance.bit = next_free_bit()
+
+
+def refresh_allergen_masks(dish_ids):
+    if refresh_dish_masks(dish_ids):
+        bump_version(Dish)
+
+
+def refresh_ingredient_fields(dish_ids):
+    # Mascara de alergenos y texto de busqueda dependen de los ingredientes
+    dish_ids = set(dish_ids)
+    if refresh_dish_masks(dish_ids) + refresh_search_ingredients(dish_ids):
+        bump_version(Dish)
+
+
+@receiver(m2m_changed, sender=Dish.ingredient.through)
+def update_dishes_on_ingredients(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # Tras el clear ya no se sabe que platos tenian este ingrediente
+        instance._allergen_dishes = list(instance.dish_set.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        refresh_ingredient_fields(pk_set if reverse else [instance.pk])
+    elif action == 'post_clear':
+        refresh_ingredient_fields(getattr(instance, '_allergen_dishes', []) if reverse else [instance.pk])
+
+
+@receiver(post_save, sender=Ingredient)
+def update_search_on_ingredient_rename(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    if refresh_search_ingredients(dishes_with_ingredients([instance.pk])):
+        bump_version(Dish)
+
+
+@receiver(m2m_changed, sender=Ingredient.allergen.through)
+def update_masks_on_ingredient_allergens(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._allergen_ingredients = list(instance.ingredient_set.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            ingredient_ids = [instance.pk]
+        elif action == 'post_clear':
+            ingredient_ids = getattr(instance, '_allergen_ingredients', [])
+        else:
+            ingredient_ids = pk_set
+        refresh_allergen_masks(dishes_with_ingredients(ingredient_ids))
+
+
+@receiver(pre_delete, sender=Ingredient)
+@receiver(pre_delete, sender=Allergens)
+def remember_masked_dishes(sender, instance, **kwargs):
+    # Al borrar se eliminan las filas M2M sin enviar m2m_changed
+    lookup = 'ingredient' if sender is Ingredient else 'ingredient__allergen'
+    instance._allergen_dishes = list(
+        Dish.objects.filter(**{lookup: instance}).values_list('id', flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_delete, sender=Allergens)
+def update_masks_after_delete(sender, instance, **kwargs):
+    if sender is Ingredient:
+        refresh_ingredient_fields(getattr(instance, '_allergen_dishes', []))
+    else:
+        refresh_allergen_masks(getattr(instance, '_allergen_dishes', []))
+
+
+@receiver(post_save, sender=Desk)
+@receiver(post_delete, sender=Desk)
+def invalidate_desk_map(sender, raw=False, **kwargs):
+    # La version avisa a los mapas de los demas procesos
+    if not raw:
+        bump_version(Desk)
+    desk_map.invalidate()
+
+
+@receiver(connection_created)
+def configure_search_connection(sender, connection, **kwargs):
+    if connection.vendor == 'postgresql':
+        set_similarity_threshold(connection)
+
+
+@receiver(request_finished)
+def flush_translation_usage(sender, **kwargs):
+    # Se ejecuta cuando la respuesta ya se envio: el volcado no suma latencia
+    usage_tracker.flush_if_due()
+
+
+atexit.register(usage_tracker.flush)
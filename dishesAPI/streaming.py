@@ -0,0 +1,83 @@
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .fast_serializer import FastSerializer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def encode_rows(rows):
+    """Filas ya serializadas como elementos de un array JSON, separados por comas."""
+    if orjson is not None and getattr(settings, 'STREAMING_USE_ORJSON', True):
+        return b','.join(orjson.dumps(row) for row in rows)
+    # Mismo formato que el JSONRenderer de DRF (compacto, UTF-8 sin escapar)
+    return ','.join(
+        json.dumps(row, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+        for row in rows
+    ).encode('utf-8')
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def stream_json_array(chunks, serialize):
+    """Genera `[`, los lotes codificados con `serialize(lote)` y `]`."""
+    yield b'['
+    first = True
+    for batch in chunks:
+        data = serialize(batch)
+        if not data:
+            continue
+        if not first:
+            yield b','
+        yield encode_rows(data)
+        first = False
+    yield b']'
+
+
+class StreamingListMixin:
+    """
+    `?stream=1` en los listados devuelve todas las filas (sin paginar) como
+    un array JSON que se va generando mientras se lee el queryset con
+    `.iterator(chunk_size=...)`; en memoria solo hay un lote a la vez. Si el
+    serializer se puede compilar se usa FastSerializer sobre `.values()`.
+    """
+    stream_query_param = 'stream'
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(self.stream_query_param) not in ('1', 'true', 'True'):
+            return super().list(request, *args, **kwargs)
+
+        chunk_size = getattr(settings, 'STREAMING_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = getattr(self, 'ordering', None)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+
+        fast = FastSerializer.compile(self.get_serializer())
+        if fast is not None:
+            rows = fast.values(queryset).iterator(chunk_size=chunk_size)
+            serialize = fast.serialize
+        else:
+            rows = queryset.iterator(chunk_size=chunk_size)
+            serialize = lambda batch: self.get_serializer(batch, many=True).data
+
+        return StreamingHttpResponse(
+            stream_json_array(batches(rows, chunk_size), serialize),
+            content_type='application/json',
+        )
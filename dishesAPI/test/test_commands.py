@@ -0,0 +1,92 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ..models import Category, Dish, Garrison, TranslatedField
+from ..translation import translation_cache, translation_memory, translator_service
+from dishesAPI import views
+
+
+class FakeTranslation:
+    def __init__(self, text):
+        self.text = text
+
+
+class WarmTranslationsCommandTest(TestCase):
+    def setUp(self):
+        translation_cache.clear()
+        translation_memory.clear()
+        translator_service.reset()
+        translator_service.breaker.reset()
+        self.calls = []
+        calls = self.calls
+
+        class FakeTranslator:
+            def __init__(self, key):
+                pass
+            def translate_text(self, texts, target_lang=None):
+                calls.append(list(texts))
+                return [FakeTranslation(f'{text} ({target_lang})') for text in texts]
+
+        self.original_translator = views.deepl.Translator
+        views.deepl.Translator = FakeTranslator
+
+        self.category = Category.objects.create(category_name="Entradas")
+        for i in range(5):
+            dish = Dish.objects.create(
+                dish_name=f"Plato {i}",
+                description="Con papas fritas",
+                time_elaboration="00:10:00",
+                price=5,
+                link_ar="http://example.com",
+                category=self.category,
+            )
+        self.garrison = Garrison.objects.create(garrison_name="Arroz")
+        self.garrison.dish.add(dish)
+
+    def tearDown(self):
+        views.deepl.Translator = self.original_translator
+        translator_service.reset()
+
+    def warm(self, *args):
+        out = StringIO()
+        with self.settings(DEEPL_AUTH_KEY='fake-key'):
+            call_command('warm_translations', *args, stdout=out)
+        return out.getvalue()
+
+    def test_fills_translation_store(self):
+        output = self.warm('--chunk-size', '2', '--rate', '0')
+        # 5 platos x 2 campos + 1 categoria + 1 guarnicion
+        self.assertEqual(TranslatedField.objects.filter(language='EN-GB').count(), 12)
+        self.assertIn('Warmed 12 translations for 7 objects', output)
+        self.assertIn('characters used', output)
+        dish = Dish.objects.get(dish_name='Plato 3')
+        self.assertEqual(
+            TranslatedField.objects.get(object_id=dish.id, model_name='dish', field_name='description').text,
+            'Con papas fritas (EN-GB)'
+        )
+
+    def test_repeated_phrases_sent_once(self):
+        self.warm('--rate', '0')
+        sent = [text for call in self.calls for text in call]
+        self.assertEqual(sent.count('Con papas fritas'), 1)
+
+    def test_second_run_sends_nothing(self):
+        self.warm('--rate', '0')
+        calls = len(self.calls)
+        output = self.warm('--rate', '0')
+        self.assertEqual(len(self.calls), calls)
+        self.assertIn('Warmed 0 translations', output)
+
+    def test_rejects_source_language(self):
+        # El menu ya esta en ES: no hay nada que traducir a ese idioma
+        with self.assertRaises(CommandError):
+            self.warm('--languages', 'ES')
+        self.assertEqual(self.calls, [])
+
+    def test_requires_api_key(self):
+        with self.settings(DEEPL_AUTH_KEY=None):
+            with self.assertRaises(CommandError):
+                call_command('warm_translations', stdout=StringIO())
@@ -1,6 +1,12 @@
-from rest_framework.test import APITestCase
+import json
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
 from ..models import Desk, Allergens, Ingredient, Dish, Order, OrderDish, Category, Garrison, Invoice
-from ..serializer import DeskSerializer, AllergensSerializer, IngredientSerializer, DishSerializer, OrderSerializer, OrderDishSerializer, CategorySerializer, GarrisonSerializer, InvoiceSerializer, InvoiceDishSerializer
+from ..serializer import DeskSerializer, AllergensSerializer, IngredientSerializer, DishSerializer, OrderSerializer, OrderDishSerializer, CategorySerializer, GarrisonSerializer, InvoiceSerializer, InvoiceDishSerializer, MenuSerializer
+from ..fast_serializer import FastSerializer
+from ..response_cache import response_cache
+from ..views import DishViewSet, OrderDishViewSet, OrderViewSet
 
 class SerializerTestCase(APITestCase):
 
@@ -11,7 +17,7 @@ class SerializerTestCase(APITestCase):
         self.ingredient.allergen.set([self.allergen])
         self.category = Category.objects.create(category_name="Main Course")  # Add category
 
-        self.desk_data = {'desk_number': 1, 'capacity': 4}
+        self.desk_data = {'desk_number': 2, 'capacity': 4}
         self.allergens_data = {'allergen_name': 'Peanuts'}
         self.ingredient_data = {'ingredient_name': 'Tomato', 'allergen': [self.allergen.id]}
         self.dish_data = {
@@ -141,3 +147,59 @@ class SerializerTestCase(APITestCase):
         self.assertEqual(serializer.validated_data['invoice'].id, self.invoice.id)
         self.assertEqual(serializer.validated_data['dish'].id, self.dish.id)
         self.assertEqual(serializer.validated_data['quantity'], 2)
+
+
+class FastSerializerParityTest(APITestCase):
+    def setUp(self):
+        self.desk = Desk.objects.create(desk_number=1, capacity=4)
+        self.category = Category.objects.create(category_name="Main Course")
+        self.ingredients = [Ingredient.objects.create(ingredient_name=f"Ingredient {i}") for i in range(3)]
+        self.dishes = []
+        for i in range(4):
+            dish = Dish.objects.create(
+                dish_name=f"Dish {i}", description="Déjà vu " * i, time_elaboration=f'00:{10 + i}:30',
+                price=9.5 + i, link_ar='http://example.com/ar', category=self.category, has_garrison=bool(i % 2)
+            )
+            dish.ingredient.set(self.ingredients[:i][::-1])
+            self.dishes.append(dish)
+        for i in range(3):
+            order = Order.objects.create(
+                desk=self.desk, date=f'2024-05-0{i + 1}', time='12:30:15', total_price=20.25 * i, status='Pending'
+            )
+            for dish in self.dishes[:i + 1][::-1]:
+                OrderDish.objects.create(order=order, dish=dish, quantity=i + 1)
+
+    def assert_parity(self, serializer_class, queryset, context=None):
+        expected = serializer_class(queryset, many=True, context=context or {}).data
+        fast = FastSerializer.compile(serializer_class(context=context or {}))
+        self.assertIsNotNone(fast)
+        data = fast.serialize(fast.values(queryset))
+        self.assertEqual(json.dumps(data), json.dumps(expected))
+
+    def test_dish_parity(self):
+        self.assert_parity(DishSerializer, DishViewSet.queryset.order_by('id'))
+
+    def test_order_parity(self):
+        self.assert_parity(OrderSerializer, OrderViewSet.queryset.order_by('-date'))
+
+    def test_order_dish_parity(self):
+        self.assert_parity(OrderDishSerializer, OrderDishViewSet.queryset.order_by('id'))
+
+    def test_sparse_fields_parity(self):
+        request = APIRequestFactory().get('/api/dish/', {'fields': 'id,ingredient,price'})
+        self.assert_parity(DishSerializer, Dish.objects.order_by('id'), {'request': Request(request)})
+
+    def test_empty_queryset(self):
+        self.assert_parity(OrderSerializer, Order.objects.none())
+
+    def test_nested_serializer_not_compiled(self):
+        self.assertIsNone(FastSerializer.compile(MenuSerializer()))
+
+    def test_list_endpoints_match_drf(self):
+        for url in ('/api/order/', '/api/orderdish/', '/api/dish/', '/api/order/?fields=id,order_dish&page_size=2'):
+            fast = self.client.get(url)
+            with self.settings(FAST_READ_SERIALIZATION=False):
+                response_cache.clear()
+                slow = self.client.get(url)
+            self.assertEqual(fast.status_code, 200)
+            self.assertEqual(fast.content, slow.content, url)
@@ -1,6 +1,6 @@
 from django.test import TestCase
 from django.urls import resolve, reverse
-from ..views import DeskViewSet, AllergensViewSet, IngredientViewSet, DishViewSet, OrderViewSet, OrderDishViewSet, CategoryViewSet, InvoiceViewSet, InvoiceDishViewSet
+from ..views import DeskViewSet, AllergensViewSet, IngredientViewSet, DishViewSet, OrderViewSet, OrderDishViewSet, CategoryViewSet, InvoiceViewSet, InvoiceDishViewSet, MenuViewSet
 
 class URLTests(TestCase):
     def test_desk_list_url_resolves(self):
@@ -182,3 +182,8 @@ class URLTests(TestCase):
     def test_invoicedish_delete_url_resolves(self):
         url = reverse('invoicedish-detail', args=[1])
         self.assertEqual(resolve(url).func.__name__, InvoiceDishViewSet.as_view({'delete': 'destroy'}).__name__)
+
+    def test_menu_list_url_resolves(self):
+        url = reverse('menu-list')
+        self.assertEqual(url, '/api/menu/')
+        self.assertEqual(resolve(url).func.__name__, MenuViewSet.as_view({'get': 'list'}).__name__)
@@ -1,4 +1,7 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from unittest import skipUnless
 from datetime import time, timedelta, datetime
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -8,7 +11,17 @@ from authAPI.models import User
 from ..models import Desk, Allergens, Ingredient, Dish, Order, OrderDish, Category, Garrison, Invoice, InvoiceDish
 from ..serializer import DeskSerializer, AllergensSerializer, IngredientSerializer, DishSerializer, OrderSerializer, OrderDishSerializer, CategorySerializer
 from dishesAPI import views
+from dishesAPI.translation import BatchTranslator, CircuitBreaker, CircuitOpenError, TranslationCache, TranslationMemory, TranslatorService, QuotaExceededError, UsageTracker, chunk_texts, translation_cache, translation_memory, translator_service, usage_tracker
+from ..models import TranslationCacheEntry, TranslatedField, TranslationUsage
+from ..response_cache import response_cache
+from ..signals import configure_search_connection
+from ..search import SEARCH_DOCUMENT, SEARCH_TRIGRAM_TEXT, dish_search_index, postgres_queryset, uses_postgres_search
+from ..desks import DeskMap, desk_map
+import importlib
+import json
 import os
+import time as time_module
+import tempfile
 
 class BaseTestCase(TestCase):
     def setUp(self):
@@ -68,6 +81,78 @@ class DeskViewSetTest(BaseTestCase):
         response = self.client.delete(f'/api/desk/{self.desk.id}/')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_duplicate_desk_number_rejected(self):
+        response = self.client.post('/api/desk/', {'desk_number': 1, 'capacity': 2})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DeskByNumberTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        desk_map.clear()
+        self.desk = Desk.objects.create(desk_number=7, capacity=4)
+
+    def test_lookup_served_from_map(self):
+        response = self.client.get('/api/desk/by-number/7/')
+        self.assertEqual(response.data, DeskSerializer(self.desk).data)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/desk/by-number/7/')
+        self.assertEqual(response.data['capacity'], 4)
+
+    def test_version_checked_after_interval(self):
+        now = [0.0]
+        desks = DeskMap(ttl=300, version_interval=5, clock=lambda: now[0])
+        desks.get(7)
+        now[0] = 4
+        with self.assertNumQueries(0):
+            desks.get(7)
+        # Pasada la ventana solo se consulta la version de Desk
+        now[0] = 6
+        with self.assertNumQueries(1):
+            desks.get(7)
+        with self.assertNumQueries(0):
+            desks.get(7)
+
+    def test_missing_desk(self):
+        response = self.client.get('/api/desk/by-number/99/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, {'error': 'Desk with number 99 does not exist.'})
+
+    def test_writes_invalidate_map(self):
+        self.client.get('/api/desk/by-number/7/')
+        self.client.put(f'/api/desk/{self.desk.id}/', {'desk_number': 8, 'capacity': 6})
+        self.assertEqual(self.client.get('/api/desk/by-number/7/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/api/desk/by-number/8/').data['capacity'], 6)
+        self.desk.delete()
+        self.assertEqual(self.client.get('/api/desk/by-number/8/').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_desk_created_without_signals_found(self):
+        self.client.get('/api/desk/by-number/7/')
+        Desk.objects.bulk_create([Desk(desk_number=9, capacity=2)])
+        self.assertEqual(self.client.get('/api/desk/by-number/9/').data['capacity'], 2)
+
+    def test_writes_from_other_process_invalidate_map(self):
+        # Mapa de otro proceso: las senales de este solo invalidan desk_map
+        now = [0.0]
+        desks = DeskMap(ttl=300, version_interval=5, clock=lambda: now[0])
+        self.assertEqual(desks.get(7).capacity, 4)
+        self.client.put(f'/api/desk/{self.desk.id}/', {'desk_number': 7, 'capacity': 6})
+        self.assertEqual(desks.get(7).capacity, 4)
+        now[0] = 5
+        self.assertEqual(desks.get(7).capacity, 6)
+        Desk.objects.get(id=self.desk.id).delete()
+        now[0] = 10
+        self.assertIsNone(desks.get(7))
+
+    def test_map_expires(self):
+        now = [0.0]
+        desks = DeskMap(ttl=10, clock=lambda: now[0])
+        self.assertEqual(desks.get(7), self.desk)
+        Desk.objects.filter(id=self.desk.id).update(capacity=10)
+        self.assertEqual(desks.get(7).capacity, 4)
+        now[0] = 11
+        self.assertEqual(desks.get(7).capacity, 10)
+
 class AllergensViewSetTest(BaseTestCase):
     def setUp(self):
         super().setUp()
@@ -562,7 +647,599 @@ class UnifiedStatisticsTest(BaseTestCase):
         self.assertEqual(dashboard_statistics['categories'][0]['dish__category__category_name'], "Entradas")
         self.assertEqual(dashboard_statistics['categories'][0]['count'], 1)
 
+class MenuViewSetTest(BaseTestCase):
+    def build_menu(self, categories, dishes_per_category):
+        allergen = Allergens.objects.create(allergen_name="Gluten")
+        ingredient = Ingredient.objects.create(ingredient_name="Harina")
+        ingredient.allergen.add(allergen)
+        garrison = Garrison.objects.create(garrison_name="Papas")
+        for c in range(categories):
+            category = Category.objects.create(category_name=f"Categoria {c}")
+            for d in range(dishes_per_category):
+                dish = Dish.objects.create(
+                    dish_name=f"Plato {c}-{d}",
+                    description="Plato de la casa",
+                    time_elaboration="00:10:00",
+                    price=8,
+                    link_ar="http://example.com",
+                    category=category,
+                    has_garrison=True,
+                )
+                dish.ingredient.add(ingredient)
+                garrison.dish.add(dish)
+
+    def test_menu_is_nested(self):
+        self.build_menu(1, 1)
+        response = self.client.get('/api/menu/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        category = response.data[0]
+        self.assertEqual(category['category_name'], "Categoria 0")
+        dish = category['dishes'][0]
+        self.assertEqual(dish['dish_name'], "Plato 0-0")
+        self.assertEqual(dish['ingredient'][0]['ingredient_name'], "Harina")
+        self.assertEqual(dish['ingredient'][0]['allergen'][0]['allergen_name'], "Gluten")
+        self.assertEqual(dish['garrisons'], [{'id': dish['garrisons'][0]['id'], 'garrison_name': "Papas"}])
+
+    def test_query_count_does_not_grow_with_menu(self):
+        # Versiones de los modelos (ETag), categorias, platos, ingredientes,
+        # alergenos y guarniciones
+        self.build_menu(2, 2)
+        with self.assertNumQueries(6):
+            self.client.get('/api/menu/')
+        self.build_menu(10, 10)
+        with self.assertNumQueries(6):
+            response = self.client.get('/api/menu/')
+        self.assertEqual(len(response.data), 12)
+
+    def test_menu_is_read_only(self):
+        response = self.client.post('/api/menu/', {'category_name': 'Postres'})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_unsupported_language(self):
+        response = self.client.get('/api/menu/?lang=FR')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class ConditionalGetTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(category_name="Entradas")
+        self.ingredient = Ingredient.objects.create(ingredient_name="Harina")
+        self.dish = Dish.objects.create(
+            dish_name="Pizza",
+            description="Pizza de la casa",
+            time_elaboration="00:30:00",
+            price=10,
+            link_ar="http://example.com",
+            category=self.category,
+        )
+
+    def test_matching_etag_returns_304_without_serializing(self):
+        response = self.client.get('/api/category/')
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn('Last-Modified', response)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/category/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_write_through_viewset_changes_etag(self):
+        etag = self.client.get(f'/api/category/{self.category.id}/')['ETag']
+        self.client.put(f'/api/category/{self.category.id}/', {'category_name': 'Postres'})
+        response = self.client.get(f'/api/category/{self.category.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_m2m_change_changes_etag(self):
+        etag = self.client.get('/api/dish/')['ETag']
+        self.dish.ingredient.add(self.ingredient)
+        response = self.client.get('/api/dish/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_dish_delete_changes_garrison_etag(self):
+        garrison = Garrison.objects.create(garrison_name="Papas")
+        garrison.dish.add(self.dish)
+        etag = self.client.get('/api/garrison/')['ETag']
+        self.dish.delete()
+        response = self.client.get('/api/garrison/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['dish'], [])
+
+    def test_allergen_delete_changes_ingredient_etag(self):
+        allergen = Allergens.objects.create(allergen_name="Gluten")
+        self.ingredient.allergen.add(allergen)
+        etag = self.client.get('/api/ingredient/')['ETag']
+        allergen.delete()
+        response = self.client.get('/api/ingredient/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['allergen'], [])
+
+    def test_ingredient_delete_changes_dish_etag(self):
+        # Sin alergenos ni nombre: ni la mascara ni el texto de busqueda cambian
+        ingredient = Ingredient.objects.create(ingredient_name="")
+        self.dish.ingredient.add(ingredient)
+        etag = self.client.get('/api/dish/')['ETag']
+        ingredient.delete()
+        response = self.client.get('/api/dish/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['ingredient'], [])
+
+    def test_other_models_do_not_change_etag(self):
+        etag = self.client.get('/api/category/')['ETag']
+        Desk.objects.create(desk_number=1, capacity=4)
+        Allergens.objects.create(allergen_name="Gluten")
+        response = self.client.get('/api/category/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_varies_with_query_params(self):
+        self.assertNotEqual(
+            self.client.get('/api/category/')['ETag'],
+            self.client.get('/api/category/?lang=ES')['ETag'],
+        )
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get('/api/dish/')['Last-Modified']
+        response = self.client.get('/api/dish/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+class ResponseCacheTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        response_cache.clear()
+        self.category = Category.objects.create(category_name="Entradas")
+        self.dish = Dish.objects.create(
+            dish_name="Pizza",
+            description="Pizza de la casa",
+            time_elaboration="00:30:00",
+            price=10,
+            link_ar="http://example.com",
+            category=self.category,
+        )
+        self.garrison = Garrison.objects.create(garrison_name="Papas")
+
+    def test_repeated_list_served_from_cache(self):
+        first = self.client.get('/api/dish/')
+        self.assertEqual(first['X-Response-Cache'], 'miss')
+        with self.assertNumQueries(1):
+            second = self.client.get('/api/dish/')
+        self.assertEqual(second['X-Response-Cache'], 'hit')
+        self.assertEqual(second.data, first.data)
+        stats = response_cache.stats()['endpoints']['dish-list']
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_ratio']), (1, 1, 0.5))
+
+    def test_write_invalidates(self):
+        self.client.get('/api/category/')
+        self.client.post('/api/category/', {'category_name': 'Postres'})
+        response = self.client.get('/api/category/')
+        self.assertEqual(response['X-Response-Cache'], 'miss')
+        self.assertEqual(len(response.data), 2)
+
+    def test_m2m_change_invalidates(self):
+        self.client.get('/api/garrison/')
+        self.garrison.dish.add(self.dish)
+        response = self.client.get('/api/garrison/')
+        self.assertEqual(response['X-Response-Cache'], 'miss')
+        self.assertEqual(response.data[0]['dish'], [self.dish.id])
+
+    def test_dish_delete_invalidates_garrison_list(self):
+        self.garrison.dish.add(self.dish)
+        self.assertEqual(self.client.get('/api/garrison/').data[0]['dish'], [self.dish.id])
+        self.dish.delete()
+        response = self.client.get('/api/garrison/')
+        self.assertEqual(response['X-Response-Cache'], 'miss')
+        self.assertEqual(response.data[0]['dish'], [])
+
+    def test_unrelated_write_keeps_entry(self):
+        self.client.get('/api/category/')
+        Garrison.objects.create(garrison_name="Arroz")
+        self.assertEqual(self.client.get('/api/category/')['X-Response-Cache'], 'hit')
+
+    def test_keyed_by_query_params(self):
+        self.client.get('/api/category/')
+        self.assertEqual(self.client.get('/api/category/?lang=ES')['X-Response-Cache'], 'miss')
+        self.assertEqual(self.client.get('/api/category/?lang=ES')['X-Response-Cache'], 'hit')
+
+    def test_file_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            caches_setting = {
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                'responses': {
+                    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                    'LOCATION': location,
+                },
+            }
+            with self.settings(CACHES=caches_setting):
+                self.client.get('/api/dish/')
+                self.assertEqual(self.client.get('/api/dish/')['X-Response-Cache'], 'hit')
+                self.assertTrue(os.listdir(location))
+                self.assertEqual(response_cache.stats()['backend'], 'FileBasedCache')
+
+class KeysetPaginationTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        desk = Desk.objects.create(desk_number=1, capacity=4)
+        slots = [('2024-05-01', '12:00'), ('2024-05-01', '13:00'), ('2024-05-02', '12:00')]
+        self.orders = [
+            Order.objects.create(desk=desk, date=date, time=hour, total_price=10, status='Pending')
+            for date, hour in slots for _ in range(3)
+        ]
+
+    def walk(self, url):
+        ids = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [order['id'] for order in response.data['results']]
+            url = response.data['next']
+            pages += 1
+        return ids, pages
+
+    def test_pages_follow_date_time_id_without_gaps(self):
+        ids, pages = self.walk('/api/order/?page_size=2')
+        expected = [order.id for order in sorted(
+            self.orders, key=lambda o: (o.date, o.time, o.id), reverse=True
+        )]
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 5)
+
+    def test_deep_page_query_count_is_constant(self):
+        response = self.client.get('/api/order/?page_size=7')
+        # Pagina y platos de los pedidos de la pagina, sin OFFSET ni COUNT
+        with self.assertNumQueries(2):
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['next'])
+
+    def test_cursor_condition_bounds_leading_column(self):
+        response = self.client.get('/api/order/?page_size=4')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(response.data['next'])
+        where = queries[0]['sql'].split(' WHERE ', 1)[1]
+        # La fecha del cursor acota la consulta fuera del OR: es la condicion
+        # con la que el indice (date, time, id) empieza a leer en el cursor
+        self.assertRegex(where, r'^\("dishesAPI_order"\."date" <= \S+ AND \("dishesAPI_order"\."date" < ')
+
+    def test_page_size_capped(self):
+        with self.settings(KEYSET_MAX_PAGE_SIZE=4):
+            response = self.client.get('/api/order/?page_size=100')
+        self.assertEqual(len(response.data['results']), 4)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/order/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_order_dishes_paginated_by_id(self):
+        category = Category.objects.create(category_name="Entradas")
+        dish = Dish.objects.create(
+            dish_name="Sopa", description="Sopa", time_elaboration="00:10:00",
+            price=5, link_ar="http://example.com", category=category,
+        )
+        order_dishes = [OrderDish.objects.create(order=order, dish=dish) for order in self.orders]
+        ids, _ = self.walk('/api/orderdish/?page_size=4')
+        self.assertEqual(ids, sorted((od.id for od in order_dishes), reverse=True))
+
+class SparseFieldsTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        response_cache.clear()
+        self.category = Category.objects.create(category_name="Entradas")
+        self.ingredient = Ingredient.objects.create(ingredient_name="Harina")
+        self.dish = Dish.objects.create(
+            dish_name="Pizza",
+            description="Pizza de la casa",
+            time_elaboration="00:30:00",
+            price=10,
+            link_ar="http://example.com",
+            category=self.category,
+        )
+        self.dish.ingredient.add(self.ingredient)
+
+    def test_fields_selects_and_narrows_sql(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/dish/?fields=id,dish_name,price')
+        self.assertEqual(response.data, [{'id': self.dish.id, 'dish_name': 'Pizza', 'price': 10.0}])
+        # Versiones y platos; sin prefetch de ingredientes ni columnas de mas
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('description', queries[1]['sql'])
+
+    def test_omit_drops_fields_and_prefetch(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/dish/{self.dish.id}/?omit=description,link_ar,ingredient')
+        self.assertNotIn('description', response.data)
+        self.assertNotIn('ingredient', response.data)
+        self.assertEqual(response.data['dish_name'], 'Pizza')
+
+    def test_selected_relation_is_prefetched(self):
+        Dish.objects.create(
+            dish_name="Sopa", description="Sopa", time_elaboration="00:10:00",
+            price=5, link_ar="http://example.com", category=self.category,
+        )
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/dish/?fields=id,ingredient')
+        self.assertEqual(response.data[0], {'id': self.dish.id, 'ingredient': [self.ingredient.id]})
+
+    def test_nested_menu_left_out(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/menu/?fields=id,category_name')
+        self.assertEqual(response.data, [{'id': self.category.id, 'category_name': 'Entradas'}])
+
+    def test_writes_ignore_fields(self):
+        response = self.client.post('/api/category/?fields=id', {'category_name': 'Postres'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['category_name'], 'Postres')
+
+    def test_paginated_orders(self):
+        desk = Desk.objects.create(desk_number=1, capacity=4)
+        for _ in range(3):
+            Order.objects.create(desk=desk, date='2024-05-01', time='12:00', total_price=10, status='Pending')
+        response = self.client.get('/api/order/?fields=id,status&page_size=2')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'status'})
+        with self.assertNumQueries(1):
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+
+class AllergenMaskTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        response_cache.clear()
+        self.category = Category.objects.create(category_name="Entradas")
+        self.gluten = Allergens.objects.create(allergen_name="Gluten")
+        self.lactose = Allergens.objects.create(allergen_name="Lactosa")
+        self.flour = Ingredient.objects.create(ingredient_name="Harina")
+        self.cheese = Ingredient.objects.create(ingredient_name="Queso")
+        self.flour.allergen.add(self.gluten)
+        self.cheese.allergen.add(self.lactose)
+        self.pizza = self.create_dish("Pizza", self.flour, self.cheese)
+        self.bread = self.create_dish("Pan", self.flour)
+        self.salad = self.create_dish("Ensalada")
+
+    def create_dish(self, name, *ingredients):
+        dish = Dish.objects.create(
+            dish_name=name, description=name, time_elaboration="00:10:00",
+            price=5, link_ar="http://example.com", category=self.category,
+        )
+        dish.ingredient.add(*ingredients)
+        return dish
+
+    def mask(self, dish):
+        dish.refresh_from_db()
+        return dish.allergen_mask
+
+    def names(self, query):
+        response = self.client.get(f'/api/dish/?exclude_allergens={query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {item['dish_name'] for item in response.data}
+
+    def test_bits_assigned_on_create(self):
+        self.assertNotEqual(self.gluten.bit, self.lactose.bit)
+        self.assertEqual(self.mask(self.pizza), (1 << self.gluten.bit) | (1 << self.lactose.bit))
+        self.assertEqual(self.mask(self.salad), 0)
+
+    def test_exclude_allergens(self):
+        self.assertEqual(self.names(self.lactose.id), {"Pan", "Ensalada"})
+        self.assertEqual(self.names(f'{self.gluten.id},{self.lactose.id}'), {"Ensalada"})
+        self.assertEqual(self.names('9999'), {"Pizza", "Pan", "Ensalada"})
+
+    def test_allergen_without_bit_still_excluded(self):
+        # bulk_create no pasa por las senales: el alergeno queda sin bit
+        sesame = Allergens.objects.bulk_create([Allergens(allergen_name="Sesamo")])[0]
+        self.assertIsNone(Allergens.objects.get(id=sesame.id).bit)
+        seeds = Ingredient.objects.create(ingredient_name="Semillas")
+        seeds.allergen.add(sesame)
+        self.salad.ingredient.add(seeds)
+        self.assertEqual(self.names(sesame.id), {"Pizza", "Pan"})
+        self.assertEqual(self.names(f'{sesame.id},{self.lactose.id}'), {"Pan"})
+
+    def test_single_predicate_on_dish_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/dish/?exclude_allergens={self.gluten.id}&fields=id')
+        self.assertEqual(response.data, [{'id': self.salad.id}])
+        dish_sql = [query['sql'] for query in queries if 'allergen_mask' in query['sql']]
+        self.assertEqual(len(dish_sql), 1)
+        self.assertNotIn('JOIN', dish_sql[0])
+
+    def test_invalid_ids(self):
+        response = self.client.get('/api/dish/?exclude_allergens=1,gluten')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_mask_not_serialized(self):
+        response = self.client.get(f'/api/dish/{self.pizza.id}/')
+        self.assertNotIn('allergen_mask', response.data)
+        response = self.client.get(f'/api/allergens/{self.gluten.id}/')
+        self.assertNotIn('bit', response.data)
+        response = self.client.get(f'/api/menu/{self.category.id}/')
+        allergen = response.data['dishes'][0]['ingredient'][0]['allergen'][0]
+        self.assertEqual(allergen['id'], self.gluten.id)
+        self.assertNotIn('bit', allergen)
+
+    def test_masks_follow_relation_changes(self):
+        self.pizza.ingredient.remove(self.cheese)
+        self.assertEqual(self.mask(self.pizza), 1 << self.gluten.bit)
+        self.cheese.dish_set.add(self.salad)
+        self.assertEqual(self.mask(self.salad), 1 << self.lactose.bit)
+        self.flour.allergen.clear()
+        self.assertEqual(self.mask(self.bread), 0)
+        self.gluten.ingredient_set.add(self.cheese)
+        self.assertEqual(self.mask(self.salad), (1 << self.gluten.bit) | (1 << self.lactose.bit))
+        self.cheese.dish_set.clear()
+        self.assertEqual(self.mask(self.salad), 0)
+
+    def test_masks_follow_deletes(self):
+        self.cheese.delete()
+        self.assertEqual(self.mask(self.pizza), 1 << self.gluten.bit)
+        self.gluten.delete()
+        self.assertEqual(self.mask(self.pizza), 0)
+        self.assertEqual(self.mask(self.bread), 0)
+
+    def test_mask_change_invalidates_cached_list(self):
+        self.assertEqual(self.names(self.lactose.id), {"Pan", "Ensalada"})
+        self.bread.ingredient.add(self.cheese)
+        self.assertEqual(self.names(self.lactose.id), {"Ensalada"})
+
+
+class DishSearchTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        dish_search_index.clear()
+        self.category = Category.objects.create(category_name="Principales")
+        self.tomato = Ingredient.objects.create(ingredient_name="Tomate")
+        self.cheese = Ingredient.objects.create(ingredient_name="Queso")
+        self.pizza = self.create_dish("Pizza margarita", "Masa fina al horno", self.tomato, self.cheese)
+        self.salad = self.create_dish("Ensalada", "Lechuga con tomate", self.tomato)
+        self.soup = self.create_dish("Sopa de tomate", "Caliente", self.cheese)
+        self.cake = self.create_dish("Tarta de queso", "Postre casero")
+
+    def create_dish(self, name, description, *ingredients):
+        dish = Dish.objects.create(
+            dish_name=name, description=description, time_elaboration="00:10:00",
+            price=5, link_ar="http://example.com", category=self.category,
+        )
+        dish.ingredient.add(*ingredients)
+        return dish
+
+    def search(self, query):
+        response = self.client.get('/api/dish/search/', {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['dish_name'] for item in response.data]
+
+    def test_ranked_by_field(self):
+        if uses_postgres_search():
+            # ts_rank suma las apariciones: ingrediente y descripcion superan
+            # a solo ingrediente
+            expected = ["Sopa de tomate", "Ensalada", "Pizza margarita"]
+        else:
+            # Indice en memoria: peso del mejor campo, nombre > ingredientes > descripcion
+            expected = ["Sopa de tomate", "Pizza margarita", "Ensalada"]
+        self.assertEqual(self.search('tomate'), expected)
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.search('queso tomate'), ["Sopa de tomate", "Pizza margarita"])
+
+    def test_accents_typos_and_prefixes(self):
+        self.assertEqual(self.search('TARTA'), ["Tarta de queso"])
+        self.assertEqual(self.search('piza'), ["Pizza margarita"])
+        self.assertEqual(self.search('ensal'), ["Ensalada"])
+        self.assertEqual(self.search('sópa'), ["Sopa de tomate"])
+        self.assertEqual(self.search('xyz'), [])
+
+    def test_index_follows_writes(self):
+        self.assertEqual(self.search('albahaca'), [])
+        basil = Ingredient.objects.create(ingredient_name="Albahaca")
+        self.salad.ingredient.add(basil)
+        self.assertEqual(self.search('albahaca'), ["Ensalada"])
+        basil.ingredient_name = "Oregano"
+        basil.save()
+        self.assertEqual(self.search('albahaca'), [])
+        self.assertEqual(self.search('oregano'), ["Ensalada"])
+        self.salad.delete()
+        self.assertEqual(self.search('oregano'), [])
+
+    def test_search_ingredients_not_serialized(self):
+        response = self.client.get('/api/dish/search/', {'q': 'pizza'})
+        self.assertNotIn('search_ingredients', response.data[0])
+
+    def test_limit_and_allergen_filter(self):
+        self.assertEqual(len(self.client.get('/api/dish/search/?q=tomate&limit=1').data), 1)
+        lactose = Allergens.objects.create(allergen_name="Lactosa")
+        self.cheese.allergen.add(lactose)
+        response = self.client.get(f'/api/dish/search/?q=tomate&exclude_allergens={lactose.id}')
+        self.assertEqual([item['dish_name'] for item in response.data], ["Ensalada"])
+        # Los dos primeros del ranking quedan fuera por el filtro
+        response = self.client.get(f'/api/dish/search/?q=tomate&limit=1&exclude_allergens={lactose.id}')
+        self.assertEqual([item['dish_name'] for item in response.data], ["Ensalada"])
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.client.get('/api/dish/search/').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/dish/search/?q=a&limit=0').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_reused_until_version_changes(self):
+        self.search('pizza')
+        # Platos y prefetch de ingredientes; el indice en memoria lee ademas
+        # las versiones, sin reconstruirse
+        with self.assertNumQueries(2 if uses_postgres_search() else 3):
+            self.search('pizza')
+
+    def test_postgres_query_uses_index_expressions(self):
+        migration = importlib.import_module('dishesAPI.migrations.0013_dish_search_unaccent')
+        self.assertEqual(SEARCH_DOCUMENT, migration.SEARCH_DOCUMENT)
+        self.assertEqual(SEARCH_TRIGRAM_TEXT, migration.SEARCH_TRIGRAM_TEXT)
+        queryset = postgres_queryset(Dish.objects.all(), 'Sópa  TOMATE')
+        sql, params = queryset.query.sql_with_params()
+        self.assertIn(f"({SEARCH_DOCUMENT}) @@ plainto_tsquery('spanish', %s)", sql)
+        self.assertIn(f"%s <%% {SEARCH_TRIGRAM_TEXT}", sql)
+        # La consulta llega sin acentos ni mayusculas, como los indices
+        self.assertEqual(params, ('sopa tomate', 'sopa tomate', 'sopa', 'sopa', 'tomate', 'tomate'))
+
+    @skipUnless(connection.vendor == 'postgresql', 'pg_trgm only exists on Postgres')
+    @override_settings(DISH_SEARCH_SIMILARITY=0.3)
+    def test_postgres_similarity_threshold_from_settings(self):
+        # Lo mismo que hace la senal al abrir cada conexion
+        configure_search_connection(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW pg_trgm.word_similarity_threshold")
+            self.assertEqual(float(cursor.fetchone()[0]), 0.3)
+
+
+class StreamingListTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        desk = Desk.objects.create(desk_number=1, capacity=4)
+        category = Category.objects.create(category_name="Entradas")
+        self.dish = Dish.objects.create(
+            dish_name="Ñoquis", description="Caseros", time_elaboration="00:10:00",
+            price=5, link_ar="http://example.com", category=category,
+        )
+        order = Order.objects.create(desk=desk, date='2024-05-01', time='12:00', total_price=10, status='Pending')
+        invoice = Invoice.objects.create(order=order, invoice_number="INV1", total_price=10)
+        OrderDish.objects.bulk_create(OrderDish(order=order, dish=self.dish, quantity=i) for i in range(7))
+        InvoiceDish.objects.bulk_create(InvoiceDish(invoice=invoice, dish=self.dish, quantity=i) for i in range(5))
+
+    def stream(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return list(response.streaming_content)
+
+    def test_stream_matches_paginated_list(self):
+        for url in ('/api/orderdish/', '/api/invoicedish/'):
+            chunks = self.stream(f'{url}?stream=1')
+            expected = self.client.get(f'{url}?page_size=100').data['results']
+            self.assertEqual(json.loads(b''.join(chunks)), json.loads(json.dumps(expected)))
+
+    @override_settings(STREAMING_CHUNK_SIZE=3)
+    def test_rows_encoded_in_chunks(self):
+        chunks = self.stream('/api/orderdish/?stream=1')
+        # [, 3 filas, ',', 3 filas, ',', 1 fila, ]
+        self.assertEqual(len(chunks), 7)
+        self.assertEqual(len(json.loads(b''.join(chunks))), 7)
+
+    def test_stdlib_encoder_fallback(self):
+        with override_settings(STREAMING_USE_ORJSON=False):
+            stdlib = b''.join(self.stream('/api/orderdish/?stream=1&fields=id,quantity'))
+        fast = b''.join(self.stream('/api/orderdish/?stream=1&fields=id,quantity'))
+        self.assertEqual(stdlib, fast)
+        self.assertEqual(json.loads(stdlib)[0], {'id': OrderDish.objects.order_by('-id')[0].id, 'quantity': 6})
+
+    def test_empty_list(self):
+        OrderDish.objects.all().delete()
+        self.assertEqual(b''.join(self.stream('/api/orderdish/?stream=1')), b'[]')
+
+    def test_stream_filter_and_fields(self):
+        chunks = self.stream('/api/invoicedish/?stream=true&omit=invoice,dish')
+        self.assertEqual(set(json.loads(b''.join(chunks))[0]), {'id', 'quantity'})
+
+
 class TranslateFieldsTestCase(TestCase):
+    def setUp(self):
+        translation_cache.clear()
+        translation_memory.clear()
+        translator_service.reset()
+        translator_service.breaker.reset()
+        usage_tracker.reset()
+
     def test_translate_fields_success(self):
         data = [{'name': 'Hola'}]
         fields = ['name']
@@ -593,7 +1270,7 @@ class TranslateFieldsTestCase(TestCase):
         target_lang = 'EN-GB'
         if 'DEEPL_AUTH_KEY' in os.environ:
             del os.environ['DEEPL_AUTH_KEY']
-        with self.assertRaises(ValueError) as exc:
+        with self.settings(DEEPL_AUTH_KEY=None), self.assertRaises(ValueError) as exc:
             views.translate_fields(data, fields, target_lang)
         self.assertIn('DeepL API key is not configured', str(exc.exception))
 
@@ -636,6 +1313,589 @@ class TranslateFieldsTestCase(TestCase):
             finally:
                 views.deepl.Translator = original_translator
 
+class FakeDeepLMixin:
+    def setUp(self):
+        response_cache.clear()
+        translation_cache.clear()
+        translation_memory.clear()
+        usage_tracker.reset()
+        # Breaker nuevo en cada test: los lotes lentos que un test anterior
+        # dejo en segundo plano terminan sobre el breaker de ese test
+        self.original_breaker = translator_service.breaker
+        translator_service.breaker = CircuitBreaker(
+            'deepl',
+            failure_threshold=self.original_breaker.failure_threshold,
+            slow_call_threshold=self.original_breaker.slow_call_threshold,
+            reset_timeout=self.original_breaker.reset_timeout,
+        )
+        self.calls = []
+        calls = self.calls
+
+        class FakeTranslation:
+            def __init__(self, text):
+                self.text = text
+        class FakeTranslator:
+            def __init__(self, key):
+                pass
+            def translate_text(self, texts, target_lang=None):
+                calls.append(list(texts))
+                return [FakeTranslation(f'{text} ({target_lang})') for text in texts]
+
+        translator_service.reset()
+        self.settings_override = self.settings(DEEPL_AUTH_KEY='fake-key')
+        self.settings_override.enable()
+        self.original_translator = views.deepl.Translator
+        views.deepl.Translator = FakeTranslator
+
+    def tearDown(self):
+        views.deepl.Translator = self.original_translator
+        self.settings_override.disable()
+        translator_service.reset()
+        translator_service.breaker = self.original_breaker
+
+    def authorization(self, is_staff=True):
+        user = User.objects.create_user(
+            username='staff', email='staff@example.com', password='testpass', is_staff=is_staff
+        )
+        payload = {'user_id': user.id, 'exp': datetime.utcnow() + timedelta(minutes=60), 'type': 'access'}
+        return f"Bearer {jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')}"
+
+class TranslationCacheTestCase(FakeDeepLMixin, TestCase):
+    def test_repeated_translation_served_from_memory(self):
+        views.translate_fields([{'name': 'Hola'}], ['name'], 'EN-GB')
+        data = [{'name': 'Hola'}]
+        views.translate_fields(data, ['name'], 'EN-GB')
+        self.assertEqual(data[0]['name'], 'Hola (EN-GB)')
+        self.assertEqual(self.calls, [['Hola']])
+        self.assertEqual(translation_cache.stats()['memory_hits'], 1)
+
+    def test_translation_persisted_and_reloaded_from_db(self):
+        views.translate_fields([{'name': 'Hola'}], ['name'], 'EN-GB')
+        self.assertTrue(TranslationCacheEntry.objects.filter(source_text='Hola', target_lang='EN-GB').exists())
+
+        # Un proceso nuevo arranca con el LRU vacio pero reutiliza la tabla
+        translation_cache.clear()
+        translation_memory.clear()
+        data = [{'name': 'Hola'}]
+        views.translate_fields(data, ['name'], 'EN-GB')
+        self.assertEqual(data[0]['name'], 'Hola (EN-GB)')
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(translation_cache.stats()['db_hits'], 1)
+
+    def test_cache_is_keyed_by_target_language(self):
+        views.translate_fields([{'name': 'Hola'}], ['name'], 'EN-GB')
+        data = [{'name': 'Hola'}]
+        views.translate_fields(data, ['name'], 'EN-US')
+        self.assertEqual(data[0]['name'], 'Hola (EN-US)')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_only_missing_texts_are_sent(self):
+        views.translate_fields([{'name': 'Hola'}], ['name'], 'EN-GB')
+        data = [{'name': 'Hola', 'description': 'Sopa'}]
+        views.translate_fields(data, ['name', 'description'], 'EN-GB')
+        self.assertEqual(self.calls[-1], ['Sopa'])
+        self.assertEqual(data[0], {'name': 'Hola (EN-GB)', 'description': 'Sopa (EN-GB)'})
+
+    def test_lru_is_bounded(self):
+        cache = TranslationCache(maxsize=2)
+        cache.set_many({'uno': 'one', 'dos': 'two', 'tres': 'three'}, 'EN-GB')
+        self.assertEqual(cache.stats()['size'], 2)
+        self.assertEqual(cache.get_many(['uno'], 'EN-GB'), {'uno': 'one'})
+        self.assertEqual(cache.stats()['db_hits'], 1)
+
+class BatchTranslatorTestCase(FakeDeepLMixin, TestCase):
+    def test_whole_payload_translated_in_one_request(self):
+        data = [{'name': f'Plato {i}', 'description': 'Con papas'} for i in range(20)]
+        views.translate_fields(data, ['name', 'description'], 'EN-GB')
+        self.assertEqual(len(self.calls), 1)
+        # 'Con papas' se repite en todas las filas pero se envia una sola vez
+        self.assertEqual(len(self.calls[0]), 21)
+        self.assertEqual(data[5]['name'], 'Plato 5 (EN-GB)')
+        self.assertEqual(data[19]['description'], 'Con papas (EN-GB)')
+
+    def test_large_payload_split_by_text_limit(self):
+        data = [{'name': f'Plato {i}'} for i in range(120)]
+        views.translate_fields(data, ['name'], 'EN-GB')
+        self.assertEqual([len(call) for call in self.calls], [50, 50, 20])
+        self.assertEqual(data[119]['name'], 'Plato 119 (EN-GB)')
+
+    def test_empty_values_are_not_sent(self):
+        data = [{'name': 'Hola', 'description': ''}, {'name': None}]
+        views.translate_fields(data, ['name', 'description'], 'EN-GB')
+        self.assertEqual(self.calls, [['Hola']])
+        self.assertEqual(data, [{'name': 'Hola (EN-GB)', 'description': ''}, {'name': None}])
+
+    def test_chunk_texts_respects_byte_limit(self):
+        chunks = chunk_texts(['a' * 40, 'b' * 40, 'c' * 40], max_texts=50, max_bytes=100)
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+
+class TranslatorServiceTestCase(TestCase):
+    def setUp(self):
+        self.built = []
+        built = self.built
+
+        class FakeTranslator:
+            def __init__(self, key):
+                built.append(key)
+                self.closed = False
+            def close(self):
+                self.closed = True
+
+        self.original_translator = views.deepl.Translator
+        views.deepl.Translator = FakeTranslator
+        self.service = TranslatorService()
+
+    def tearDown(self):
+        views.deepl.Translator = self.original_translator
+
+    def test_translator_reused_across_calls(self):
+        with self.settings(DEEPL_AUTH_KEY='fake-key'):
+            first = self.service.get_translator()
+            second = self.service.get_translator()
+        self.assertIs(first, second)
+        self.assertEqual(self.built, ['fake-key'])
+
+    def test_translator_shared_between_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with self.settings(DEEPL_AUTH_KEY='fake-key'):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                translators = list(pool.map(lambda _: self.service.get_translator(), range(32)))
+        self.assertEqual(len({id(t) for t in translators}), 1)
+        self.assertEqual(len(self.built), 1)
+
+    def test_translator_rebuilt_when_key_changes(self):
+        with self.settings(DEEPL_AUTH_KEY='key-1'):
+            first = self.service.get_translator()
+        with self.settings(DEEPL_AUTH_KEY='key-2'):
+            second = self.service.get_translator()
+        self.assertIsNot(first, second)
+        self.assertTrue(first.closed)
+        self.assertEqual(self.built, ['key-1', 'key-2'])
+
+    def test_real_client_configured_with_pool_and_timeouts(self):
+        views.deepl.Translator = self.original_translator
+        http_client = views.deepl.http_client
+        self.addCleanup(setattr, http_client, 'min_connection_timeout', http_client.min_connection_timeout)
+        self.addCleanup(setattr, http_client, 'max_network_retries', http_client.max_network_retries)
+        with self.settings(DEEPL_AUTH_KEY='fake-key:fx', DEEPL_TIMEOUT=3.0, DEEPL_MAX_RETRIES=1, DEEPL_POOL_SIZE=7):
+            translator = self.service.get_translator()
+        adapter = translator._client._session.get_adapter('https://api-free.deepl.com')
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertEqual(views.deepl.http_client.min_connection_timeout, 3.0)
+        self.assertEqual(views.deepl.http_client.max_network_retries, 1)
+        self.service.reset()
+
+class TranslateOnWriteTestCase(FakeDeepLMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(category_name="Entradas")
+
+    def create_dish(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Dish.objects.create(
+                dish_name="Sopa",
+                description="Sopa de la casa",
+                time_elaboration="00:30:00",
+                price=5,
+                link_ar="http://example.com",
+                category=self.category,
+            )
+
+    def test_translations_stored_on_create(self):
+        dish = self.create_dish()
+        stored = dict(TranslatedField.objects.filter(
+            model_name='dish', object_id=dish.id, language='EN-GB'
+        ).values_list('field_name', 'text'))
+        self.assertEqual(stored, {'dish_name': 'Sopa (EN-GB)', 'description': 'Sopa de la casa (EN-GB)'})
+
+    def test_translated_read_served_from_store(self):
+        dish = self.create_dish()
+        calls_after_write = len(self.calls)
+        response = self.client.get('/api/dish/?lang=EN-GB')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        item = next(d for d in response.data if d['id'] == dish.id)
+        self.assertEqual(item['dish_name'], 'Sopa (EN-GB)')
+        self.assertEqual(item['description'], 'Sopa de la casa (EN-GB)')
+        self.assertEqual(len(self.calls), calls_after_write)
+
+    def test_only_changed_fields_retranslated_on_update(self):
+        dish = self.create_dish()
+        translation_cache.clear()
+        translation_memory.clear()
+        del self.calls[:]
+        dish.dish_name = "Crema"
+        with self.captureOnCommitCallbacks(execute=True):
+            dish.save()
+        self.assertEqual(self.calls, [['Crema']])
+        self.assertEqual(
+            TranslatedField.objects.get(object_id=dish.id, field_name='dish_name', language='EN-GB').text,
+            'Crema (EN-GB)'
+        )
+
+    def test_stale_translation_falls_back_to_translator(self):
+        dish = self.create_dish()
+        # Una actualizacion masiva no dispara senales
+        Dish.objects.filter(id=dish.id).update(dish_name="Caldo")
+        response = self.client.get(f'/api/dish/{dish.id}/?lang=EN-GB')
+        self.assertEqual(response.data['dish_name'], 'Caldo (EN-GB)')
+
+    def test_translations_deleted_with_instance(self):
+        dish = self.create_dish()
+        dish.delete()
+        self.assertFalse(TranslatedField.objects.filter(model_name='dish', object_id=dish.id).exists())
+
+    def test_no_translation_on_write_without_api_key(self):
+        with self.settings(DEEPL_AUTH_KEY=None):
+            dish = self.create_dish()
+        self.assertEqual(self.calls, [])
+        self.assertFalse(TranslatedField.objects.filter(object_id=dish.id).exists())
+
+class AllLanguagesPayloadTestCase(FakeDeepLMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category = Category.objects.create(category_name="Entradas")
+            self.garrison = Garrison.objects.create(garrison_name="Arroz")
+
+    def test_every_language_in_one_response(self):
+        calls_after_write = len(self.calls)
+        response = self.client.get('/api/category/?lang=*')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        item = response.data[0]
+        self.assertEqual(item['category_name'], 'Entradas')
+        self.assertEqual(item['translations'], {
+            'EN-GB': {'category_name': 'Entradas (EN-GB)'},
+            'ES': {'category_name': 'Entradas'},
+        })
+        self.assertEqual(len(self.calls), calls_after_write)
+
+    def test_unstored_rows_translated_once_per_language(self):
+        Garrison.objects.filter(id=self.garrison.id).update(garrison_name="Papas")
+        response = self.client.get('/api/garrison/?lang=*')
+        self.assertEqual(response.data[0]['translations']['EN-GB'], {'garrison_name': 'Papas (EN-GB)'})
+        self.assertEqual(self.calls[-1], ['Papas'])
+        self.assertNotIn('X-Translation-Partial', response)
+
+class TranslatedMenuTestCase(FakeDeepLMixin, TestCase):
+    def test_nested_fields_translated_from_store(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            category = Category.objects.create(category_name="Entradas")
+            dish = Dish.objects.create(
+                dish_name="Sopa",
+                description="Sopa de la casa",
+                time_elaboration="00:30:00",
+                price=5,
+                link_ar="http://example.com",
+                category=category,
+            )
+            garrison = Garrison.objects.create(garrison_name="Arroz")
+        garrison.dish.add(dish)
+        calls_after_write = len(self.calls)
+        response = self.client.get('/api/menu/?lang=EN-GB')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        category = response.data[0]
+        self.assertEqual(category['category_name'], 'Entradas (EN-GB)')
+        self.assertEqual(category['dishes'][0]['description'], 'Sopa de la casa (EN-GB)')
+        self.assertEqual(category['dishes'][0]['garrisons'][0]['garrison_name'], 'Arroz (EN-GB)')
+        self.assertEqual(len(self.calls), calls_after_write)
+
+class TranslationDeadlineTestCase(TestCase):
+    class SlowTranslator:
+        def __init__(self, slow_texts, delay):
+            self.slow_texts = slow_texts
+            self.delay = delay
+
+        def translate_text(self, texts, target_lang=None):
+            if any(text in self.slow_texts for text in texts):
+                import time as _time
+                _time.sleep(self.delay)
+            if 'boom' in texts:
+                raise views.deepl.exceptions.DeepLException('DeepL error')
+            return [type('Result', (), {'text': text.upper()}) for text in texts]
+
+    def test_deadline_keeps_finished_batches(self):
+        translator = self.SlowTranslator({'lento'}, 0.5)
+        engine = BatchTranslator(lambda: translator, max_texts=1)
+        translations = engine.translate(['rapido', 'lento'], 'EN-GB', deadline=0.2)
+        self.assertEqual(translations, {'rapido': 'RAPIDO'})
+        self.assertTrue(engine.partial)
+
+    def test_failed_batch_falls_back_with_deadline(self):
+        translator = self.SlowTranslator(set(), 0)
+        engine = BatchTranslator(lambda: translator, max_texts=1)
+        translations = engine.translate(['hola', 'boom'], 'EN-GB', deadline=1)
+        self.assertEqual(translations, {'hola': 'HOLA'})
+        self.assertTrue(engine.partial)
+
+    def test_no_deadline_raises(self):
+        translator = self.SlowTranslator(set(), 0)
+        engine = BatchTranslator(lambda: translator)
+        with self.assertRaises(views.deepl.exceptions.DeepLException):
+            engine.translate(['boom'], 'EN-GB')
+
+class TranslatedListDeadlineTestCase(FakeDeepLMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(category_name="Platos lentos")
+
+    def test_slow_translation_returns_source_text(self):
+        original = views.deepl.Translator
+        views.deepl.Translator = lambda key: TranslationDeadlineTestCase.SlowTranslator({'Platos lentos'}, 0.5)
+        try:
+            with self.settings(TRANSLATION_DEADLINE=0.05):
+                response = self.client.get('/api/category/?lang=EN-GB')
+        finally:
+            views.deepl.Translator = original
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['category_name'], 'Platos lentos')
+        self.assertEqual(response['X-Translation-Partial'], 'true')
+
+    def test_menu_shares_one_deadline(self):
+        # Categorias, platos y guarniciones se traducen con el mismo plazo
+        dish = Dish.objects.create(
+            dish_name="Guiso lento", description="Lento", time_elaboration="00:10:00",
+            price=5, link_ar="http://example.com", category=self.category,
+        )
+        garrison = Garrison.objects.create(garrison_name="Arroz lento")
+        garrison.dish.add(dish)
+        slow = {'Platos lentos', 'Guiso lento', 'Lento', 'Arroz lento'}
+        original = views.deepl.Translator
+        views.deepl.Translator = lambda key: TranslationDeadlineTestCase.SlowTranslator(slow, 0.5)
+        try:
+            with self.settings(TRANSLATION_DEADLINE=0.3):
+                started = time_module.monotonic()
+                response = self.client.get('/api/menu/?lang=EN-GB')
+                elapsed = time_module.monotonic() - started
+        finally:
+            views.deepl.Translator = original
+        self.assertEqual(response['X-Translation-Partial'], 'true')
+        self.assertLess(elapsed, 0.6)
+
+    def test_complete_translation_has_no_partial_header(self):
+        response = self.client.get('/api/category/?lang=EN-GB')
+        self.assertEqual(response.data[0]['category_name'], 'Platos lentos (EN-GB)')
+        self.assertFalse(response.has_header('X-Translation-Partial'))
+
+class CircuitBreakerTestCase(TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker('test', failure_threshold=2, slow_call_threshold=1.0,
+                                      reset_timeout=10.0, clock=lambda: self.now)
+
+    def fail(self):
+        raise RuntimeError('down')
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                self.breaker.call(self.fail)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(lambda: 'ok')
+        snapshot = self.breaker.snapshot()
+        self.assertEqual(snapshot['trip_count'], 1)
+        self.assertEqual(snapshot['rejected_calls'], 1)
+
+    def test_slow_calls_count_as_failures(self):
+        def slow():
+            self.now += 2.0
+            return 'ok'
+        self.assertEqual(self.breaker.call(slow), 'ok')
+        self.assertEqual(self.breaker.call(slow), 'ok')
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.snapshot()['slow_calls'], 2)
+
+    def test_half_open_probe_closes_on_success(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.now += 10.0
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+        # Solo una llamada de prueba a la vez
+        self.assertFalse(self.breaker.allow_request())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_probe_reopens_on_failure(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.now += 10.0
+        with self.assertRaises(RuntimeError):
+            self.breaker.call(self.fail)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.snapshot()['trip_count'], 2)
+
+class TranslationCircuitTestCase(FakeDeepLMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        Category.objects.create(category_name="Postres")
+
+    def test_open_circuit_returns_source_text_without_calling_deepl(self):
+        breaker = translator_service.breaker
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        response = self.client.get('/api/category/?lang=EN-GB')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['category_name'], 'Postres')
+        self.assertEqual(response['X-Translation-Partial'], 'true')
+        self.assertNotIn('ETag', response)
+        self.assertEqual(self.calls, [])
+        breaker.reset()
+        response = self.client.get('/api/category/?lang=EN-GB')
+        self.assertEqual(response['X-Response-Cache'], 'miss')
+        self.assertEqual(response.data[0]['category_name'], 'Postres (EN-GB)')
+
+    def test_status_endpoint_exposes_breaker_state(self):
+        breaker = translator_service.breaker
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        response = self.client.get('/api/translation/status/', HTTP_AUTHORIZATION=self.authorization())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['circuit_breaker']['state'], 'open')
+        self.assertEqual(response.data['circuit_breaker']['trip_count'], 1)
+        self.assertIn('memory_hits', response.data['cache'])
+
+    def test_status_endpoint_requires_staff(self):
+        response = self.client.get('/api/translation/status/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get('/api/translation/status/', HTTP_AUTHORIZATION=self.authorization(is_staff=False))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+class TranslationMemoryTestCase(FakeDeepLMixin, TestCase):
+    def translate(self, text):
+        data = [{'description': text}]
+        views.translate_fields(data, ['description'], 'EN-GB')
+        return data[0]['description']
+
+    def test_known_segments_are_not_resent(self):
+        self.translate('Lomo fino, papas fritas')
+        result = self.translate('Pollo asado, papas fritas')
+        self.assertEqual(self.calls[-1], ['Pollo asado'])
+        self.assertEqual(result, 'Pollo asado (EN-GB), papas fritas (EN-GB)')
+
+    def test_fully_known_text_needs_no_request(self):
+        self.translate('Lomo fino. Salsa de la casa')
+        self.translate('Pollo')
+        calls = len(self.calls)
+        result = self.translate('Pollo. Salsa de la casa')
+        self.assertEqual(len(self.calls), calls)
+        self.assertEqual(result, 'Pollo (EN-GB). Salsa de la casa (EN-GB)')
+        self.assertEqual(translation_memory.stats()['exact_hits'], 2)
+
+    def test_near_duplicate_reused_with_matching_case(self):
+        self.translate('Salsa de la casa')
+        result = self.translate('salsa  de la cása')
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(result, 'salsa de la casa (EN-GB)')
+        self.assertEqual(translation_memory.stats()['fuzzy_hits'], 1)
+
+    def test_typo_reused(self):
+        self.translate('Papas fritas caseras')
+        self.translate('Papas frittas caseras')
+        self.assertEqual(len(self.calls), 1)
+
+    def test_different_words_are_translated(self):
+        self.translate('Con papas fritas')
+        self.translate('Sin papas fritas')
+        self.translate('Con pasas fritas')
+        self.assertEqual(self.calls, [['Con papas fritas'], ['Sin papas fritas'], ['Con pasas fritas']])
+
+    def test_memory_loaded_from_table(self):
+        self.translate('Lomo fino, papas fritas')
+        translation_cache.clear()
+        translation_memory.clear()
+        self.translate('Pollo, papas fritas')
+        self.assertEqual(self.calls[-1], ['Pollo'])
+
+    def test_unknown_text_sent_whole_and_stored_by_segment(self):
+        result = self.translate('Lomo fino. Precio 1.5 euros')
+        # Sin segmentos conocidos DeepL recibe el texto con todo su contexto
+        self.assertEqual(self.calls, [['Lomo fino. Precio 1.5 euros']])
+        self.assertEqual(result, 'Lomo fino. Precio 1.5 euros (EN-GB)')
+        self.assertEqual(translation_memory.lookup('Precio 1.5 euros', 'EN-GB'), 'Precio 1.5 euros (EN-GB)')
+        self.translate('Pollo. Precio 1.5 euros')
+        self.assertEqual(self.calls[-1], ['Pollo'])
+
+    def test_misaligned_translation_not_split(self):
+        memory = TranslationMemory()
+        memory._loaded.add('EN-GB')
+        memory.add({'Lomo, papas y arroz. Salsa': 'Loin with chips and rice. Sauce'}, 'EN-GB')
+        self.assertEqual(memory.stats()['segments'], 0)
+        memory.add({'Lomo. Salsa': 'Loin. Sauce'}, 'EN-GB')
+        self.assertEqual(memory.lookup('salsa', 'EN-GB'), 'sauce')
+
+    def test_fuzzy_threshold(self):
+        memory = TranslationMemory(threshold=0.99)
+        memory._loaded.add('EN-GB')
+        memory.add({'Papas fritas caseras': 'Homemade chips'}, 'EN-GB')
+        self.assertIsNone(memory.lookup('Papas frittas caseras', 'EN-GB'))
+        self.assertEqual(memory.lookup('papas fritas cáseras', 'EN-GB'), 'homemade chips')
+
+class TranslationUsageTestCase(FakeDeepLMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        Category.objects.create(category_name="Postres")
+        self.addCleanup(setattr, usage_tracker, 'budget', usage_tracker.budget)
+
+    def test_usage_recorded_per_endpoint(self):
+        response = self.client.get('/api/category/?lang=EN-GB')
+        self.assertIn('deepl;dur=', response['Server-Timing'])
+        self.assertIn('1 requests, 7 chars', response['Server-Timing'])
+        endpoints = usage_tracker.snapshot()['endpoints']
+        self.assertEqual(endpoints['category-list']['characters'], 7)
+        self.assertEqual(endpoints['category-list']['deepl_requests'], 1)
+        self.assertEqual(endpoints['category-list']['cache_misses'], 1)
+
+    def test_flush_writes_daily_rows(self):
+        views.translate_fields([{'name': 'Hola'}], ['name'], 'EN-GB', endpoint='menu')
+        views.translate_fields([{'name': 'Hola'}], ['name'], 'EN-GB', endpoint='menu')
+        usage_tracker.flush()
+        views.translate_fields([{'name': 'Adios'}], ['name'], 'EN-GB', endpoint='menu')
+        usage_tracker.flush()
+        row = TranslationUsage.objects.get(endpoint='menu')
+        self.assertEqual(row.characters, 9)
+        self.assertEqual(row.deepl_requests, 2)
+        self.assertEqual(row.cache_hits, 1)
+        self.assertEqual(row.cache_misses, 2)
+
+    def test_flush_if_due_respects_interval(self):
+        now = [0.0]
+        tracker = UsageTracker(flush_interval=60, clock=lambda: now[0])
+        tracker.record('menu', characters=10, requests=1)
+        tracker.flush_if_due()
+        self.assertFalse(TranslationUsage.objects.exists())
+        now[0] = 61.0
+        tracker.flush_if_due()
+        self.assertEqual(TranslationUsage.objects.get(endpoint='menu').characters, 10)
+
+    def test_budget_threshold_switches_to_cache_only(self):
+        usage_tracker.budget = 100
+        usage_tracker.record('warm_translations', characters=95)
+        response = self.client.get('/api/category/?lang=EN-GB')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['category_name'], 'Postres')
+        self.assertEqual(response['X-Translation-Partial'], 'true')
+        self.assertEqual(self.calls, [])
+        response = self.client.get('/api/translation/status/', HTTP_AUTHORIZATION=self.authorization())
+        self.assertTrue(response.data['usage']['cache_only'])
+
+    def test_budget_counts_stored_usage(self):
+        TranslationUsage.objects.create(date=datetime.now().date(), endpoint='old', characters=90)
+        usage_tracker.budget = 100
+        engine = BatchTranslator(translator_service.get_translator, usage=usage_tracker)
+        with self.assertRaises(QuotaExceededError):
+            engine.translate(['Hola'], 'EN-GB')
+        self.assertEqual(self.calls, [])
+
+    def test_cached_text_served_in_cache_only_mode(self):
+        views.translate_fields([{'name': 'Hola'}], ['name'], 'EN-GB')
+        usage_tracker.budget = 1
+        data = [{'name': 'Hola'}]
+        engine = views.translate_fields(data, ['name'], 'EN-GB')
+        self.assertEqual(data[0]['name'], 'Hola (EN-GB)')
+        self.assertFalse(engine.partial)
+        self.assertEqual(len(self.calls), 1)
+
 class TranslateResponseTestCase(TestCase):
     def test_translate_response_unsupported_language(self):
         class DummyRequest:
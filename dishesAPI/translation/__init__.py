@@ -0,0 +1,33 @@
+from django.conf import settings
+
+from .breaker import CircuitBreaker, CircuitOpenError
+from .cache import TranslationCache, translation_cache
+from .engine import BatchTranslator, chunk_texts
+from .languages import ALL_LANGUAGES, LANGUAGE_MAPPING, SOURCE_LANGUAGE, SUPPORTED_LANGUAGES, target_languages
+from .memory import TranslationMemory, translation_memory
+from .service import TranslatorService, translator_service
+from .usage import QuotaExceededError, UsageTracker, usage_tracker
+
+
+def default_engine(endpoint=None):
+    """
+    Motor de traduccion con la cache compartida y el cliente de DeepL del
+    proceso; su uso se contabiliza bajo `endpoint`.
+    """
+    return BatchTranslator(
+        translator_service.get_translator,
+        cache=translation_cache,
+        breaker=translator_service.breaker,
+        memory=translation_memory if getattr(settings, 'TRANSLATION_MEMORY_ENABLED', True) else None,
+        usage=usage_tracker,
+        endpoint=endpoint,
+    )
+
+
+__all__ = [
+    'ALL_LANGUAGES', 'BatchTranslator', 'CircuitBreaker', 'CircuitOpenError', 'LANGUAGE_MAPPING',
+    'QuotaExceededError', 'SOURCE_LANGUAGE', 'SUPPORTED_LANGUAGES', 'TranslationCache',
+    'TranslationMemory', 'TranslatorService', 'UsageTracker', 'chunk_texts',
+    'default_engine', 'target_languages', 'translation_cache', 'translation_memory',
+    'translator_service', 'usage_tracker',
+]
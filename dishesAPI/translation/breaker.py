@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker para la dependencia de DeepL.
+
+    - closed: las llamadas pasan; cada fallo o llamada lenta suma uno y al
+      llegar a `failure_threshold` seguidos el circuito se abre.
+    - open: las llamadas se rechazan sin tocar la red durante `reset_timeout`
+      segundos.
+    - half_open: pasado ese tiempo se deja pasar una sola llamada de prueba; si
+      va bien el circuito se cierra y si falla se vuelve a abrir.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, slow_call_threshold=None,
+                 reset_timeout=30.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self.trip_count = 0
+        self.rejected_calls = 0
+        self.slow_calls = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def is_open(self):
+        """True mientras el circuito rechaza llamadas (sin consumir la prueba)."""
+        with self._lock:
+            state = self._current_state()
+            return state == self.OPEN or (state == self.HALF_OPEN and self._probe_in_flight)
+
+    def allow_request(self):
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected_calls += 1
+            return False
+
+    def record_success(self, duration=0.0):
+        if self.slow_call_threshold is not None and duration > self.slow_call_threshold:
+            with self._lock:
+                self.slow_calls += 1
+            self.record_failure()
+            return
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            state = self._current_state()
+            if state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._trip()
+
+    def _trip(self):
+        if self._state != self.OPEN:
+            self.trip_count += 1
+            logger.warning(f"Circuit '{self.name}' opened after {self._failures} failures")
+        self._state = self.OPEN
+        self._opened_at = self.clock()
+        self._probe_in_flight = False
+
+    def call(self, func, *args, **kwargs):
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+        started = self.clock()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success(self.clock() - started)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+            self.trip_count = 0
+            self.rejected_calls = 0
+            self.slow_calls = 0
+
+    def snapshot(self):
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == self.OPEN:
+                retry_in = max(self.reset_timeout - (self.clock() - self._opened_at), 0.0)
+            return {
+                'name': self.name,
+                'state': state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'slow_call_threshold': self.slow_call_threshold,
+                'reset_timeout': self.reset_timeout,
+                'retry_in': retry_in,
+                'trip_count': self.trip_count,
+                'rejected_calls': self.rejected_calls,
+                'slow_calls': self.slow_calls,
+            }
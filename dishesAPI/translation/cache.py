@@ -0,0 +1,118 @@
+import hashlib
+import logging
+import threading
+
+from cachetools import LRUCache
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+def source_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class TranslationCache:
+    """
+    Cache de traducciones en dos niveles: un LRU acotado en memoria del proceso
+    delante de la tabla TranslationCacheEntry, indexada por
+    (hash del texto fuente, idioma destino).
+    """
+
+    def __init__(self, maxsize=None):
+        if maxsize is None:
+            maxsize = getattr(settings, 'TRANSLATION_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+        self._lru = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def get_many(self, texts, target_lang):
+        """Devuelve {texto: traduccion} para los textos que ya estan en cache."""
+        found = {}
+        pending = {}
+        with self._lock:
+            for text in set(texts):
+                key = (source_hash(text), target_lang)
+                translated = self._lru.get(key)
+                if translated is None:
+                    pending[key[0]] = text
+                else:
+                    found[text] = translated
+            self.memory_hits += len(found)
+
+        if not pending:
+            return found
+
+        from ..models import TranslationCacheEntry
+
+        rows = TranslationCacheEntry.objects.filter(
+            target_lang=target_lang,
+            source_hash__in=list(pending)
+        ).values_list('source_hash', 'source_text', 'translated_text')
+
+        promoted = 0
+        with self._lock:
+            for digest, source_text, translated_text in rows:
+                text = pending.get(digest)
+                if text is None or text != source_text:
+                    continue
+                found[text] = translated_text
+                self._lru[(digest, target_lang)] = translated_text
+                promoted += 1
+            self.db_hits += promoted
+            self.misses += len(pending) - promoted
+        return found
+
+    def set_many(self, translations, target_lang, persist=True):
+        """Guarda {texto: traduccion} en memoria y, si `persist`, en la tabla."""
+        if not translations:
+            return
+
+        from ..models import TranslationCacheEntry
+
+        entries = []
+        with self._lock:
+            for text, translated in translations.items():
+                digest = source_hash(text)
+                self._lru[(digest, target_lang)] = translated
+                if not persist:
+                    continue
+                entries.append(TranslationCacheEntry(
+                    source_hash=digest,
+                    target_lang=target_lang,
+                    source_text=text,
+                    translated_text=translated,
+                ))
+        if not entries:
+            return
+        try:
+            TranslationCacheEntry.objects.bulk_create(entries, ignore_conflicts=True)
+        except Exception as e:
+            # La cache persistente es una optimizacion: si falla, la
+            # traduccion ya obtenida se sigue devolviendo.
+            logger.error(f"Could not persist translations: {str(e)}")
+
+    def clear(self):
+        """Vacia el nivel en memoria (la tabla se conserva)."""
+        with self._lock:
+            self._lru.clear()
+            self.memory_hits = 0
+            self.db_hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._lru),
+                'maxsize': self._lru.maxsize,
+                'memory_hits': self.memory_hits,
+                'db_hits': self.db_hits,
+                'misses': self.misses,
+            }
+
+
+translation_cache = TranslationCache()
@@ -0,0 +1,252 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+
+from django.conf import settings
+
+from .breaker import CircuitOpenError
+from .usage import QuotaExceededError
+
+logger = logging.getLogger(__name__)
+
+# Limites de la API de DeepL para /v2/translate: 50 textos por peticion y un
+# cuerpo de 128 KiB. Se deja margen para el resto de parametros del request.
+MAX_TEXTS_PER_REQUEST = 50
+MAX_REQUEST_BYTES = 120 * 1024
+
+DEFAULT_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Pool de hilos compartido para las peticiones a DeepL con plazo."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'TRANSLATION_WORKERS', DEFAULT_WORKERS),
+                    thread_name_prefix='translation',
+                )
+    return _executor
+
+
+def chunk_texts(texts, max_texts=MAX_TEXTS_PER_REQUEST, max_bytes=MAX_REQUEST_BYTES):
+    """Agrupa los textos en lotes que respetan los limites de DeepL."""
+    chunks = []
+    current = []
+    current_bytes = 0
+    for text in texts:
+        size = len(text.encode('utf-8'))
+        if current and (len(current) >= max_texts or current_bytes + size > max_bytes):
+            chunks.append(current)
+            current = []
+            current_bytes = 0
+        current.append(text)
+        current_bytes += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def collect_texts(data, fields):
+    """Textos no vacios del payload, sin duplicados y en orden de aparicion."""
+    return list(dict.fromkeys(
+        item[field] for item in data for field in fields if item.get(field)
+    ))
+
+
+def scatter_translations(data, fields, translations):
+    """Sustituye cada valor del payload por su traduccion, si la hay."""
+    for item in data:
+        for field in fields:
+            value = item.get(field)
+            if value and value in translations:
+                item[field] = translations[value]
+
+
+class BatchTranslator:
+    """
+    Traduce todos los textos de una respuesta con el minimo de peticiones a
+    DeepL: consulta la cache, elimina duplicados y envia los textos restantes
+    en lotes tan grandes como permiten los limites de la API.
+
+    `get_translator` es un callable que devuelve el cliente de DeepL; solo se
+    invoca si hay textos que no estan en cache.
+
+    Sin `deadline` los lotes se envian uno tras otro, o en paralelo si se pasa
+    un `executor`, y cualquier error se propaga.
+
+    Con `deadline` (segundos) los lotes se envian en paralelo y se espera como
+    mucho ese tiempo: los textos que no llegan a tiempo, o cuyo lote falla, se
+    quedan sin traducir y `partial` pasa a True en lugar de lanzar la excepcion.
+
+    Si se pasa un `breaker`, cada peticion a DeepL pasa por el; mientras esta
+    abierto no se toca la red y los textos sin cache se devuelven sin traducir.
+
+    Con una `memory` (TranslationMemory) los textos que faltan en cache se
+    dividen en segmentos y solo los segmentos desconocidos se envian a DeepL;
+    un texto sin ningun segmento conocido se envia entero.
+
+    Con un `usage` (UsageTracker) los caracteres, peticiones, aciertos de cache
+    y latencia se acumulan bajo `endpoint`; si el presupuesto de caracteres
+    esta casi agotado el motor pasa a modo solo-cache.
+    """
+
+    def __init__(self, get_translator, cache=None,
+                 max_texts=MAX_TEXTS_PER_REQUEST, max_bytes=MAX_REQUEST_BYTES,
+                 executor=None, breaker=None, memory=None, usage=None, endpoint=None):
+        self.get_translator = get_translator
+        self.cache = cache
+        self.breaker = breaker
+        self.memory = memory
+        self.usage = usage
+        self.endpoint = endpoint
+        self.max_texts = max_texts
+        self.max_bytes = max_bytes
+        self.executor = executor
+        self._stats_lock = threading.Lock()
+        self.round_trips = 0
+        self.characters = 0
+        self.deepl_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.partial = False
+
+    def translate(self, texts, target_lang, deadline=None):
+        """Devuelve {texto: traduccion} para los textos no vacios que se tradujeron."""
+        started = time.monotonic()
+        unique = list(dict.fromkeys(text for text in texts if text))
+        if not unique:
+            return {}
+
+        translations = self.cache.get_many(unique, target_lang) if self.cache else {}
+        missing = [text for text in unique if text not in translations]
+        self.cache_hits += len(translations)
+        self.cache_misses += len(missing)
+        if self.usage is not None:
+            self.usage.record(self.endpoint, cache_hits=len(translations), cache_misses=len(missing))
+        if not missing:
+            return translations
+
+        plans = {}
+        if self.memory is not None:
+            for text in missing:
+                plans[text] = self.memory.plan(text, target_lang)
+            to_send = list(dict.fromkeys(
+                segment for _, unknown in plans.values() for segment in unknown
+            ))
+        else:
+            to_send = missing
+
+        fresh = {}
+        if to_send:
+            if self.breaker is not None and self.breaker.is_open():
+                if deadline is None:
+                    raise CircuitOpenError(f"Circuit '{self.breaker.name}' is open")
+                self.partial = True
+            elif self.usage is not None and self.usage.cache_only():
+                if deadline is None:
+                    raise QuotaExceededError("DeepL character budget exhausted")
+                self.partial = True
+            elif deadline is not None and deadline - (time.monotonic() - started) <= 0:
+                # El plazo de la peticion ya se agoto: solo lo que habia en cache
+                self.partial = True
+            else:
+                translator = self.get_translator()
+                chunks = chunk_texts(to_send, self.max_texts, self.max_bytes)
+                if deadline is None:
+                    fresh = self._translate_all(translator, chunks, target_lang)
+                else:
+                    remaining = deadline - (time.monotonic() - started)
+                    fresh = self._translate_concurrently(translator, chunks, target_lang, remaining)
+
+        if self.memory is not None:
+            self.memory.add(fresh, target_lang)
+            segments = fresh
+            fresh = dict(segments)
+            for text, (parts, _) in plans.items():
+                assembled = self.memory.assemble(parts, segments)
+                if assembled is not None:
+                    fresh[text] = assembled
+
+        if self.cache:
+            self.cache.set_many(fresh, target_lang)
+        translations.update(fresh)
+        return translations
+
+    def translate_payload(self, data, fields, target_lang, deadline=None):
+        """Traduce en el sitio los `fields` de cada elemento de `data`."""
+        translations = self.translate(collect_texts(data, fields), target_lang, deadline=deadline)
+        scatter_translations(data, fields, translations)
+        return data
+
+    def _translate_chunk(self, translator, chunk, target_lang):
+        started = time.monotonic()
+        if self.breaker is not None:
+            results = self.breaker.call(translator.translate_text, chunk, target_lang=target_lang)
+        else:
+            results = translator.translate_text(chunk, target_lang=target_lang)
+        elapsed = time.monotonic() - started
+        characters = sum(len(text) for text in chunk)
+        with self._stats_lock:
+            self.round_trips += 1
+            self.characters += characters
+            self.deepl_time += elapsed
+        if self.usage is not None:
+            self.usage.record(self.endpoint, characters=characters, requests=1, latency=elapsed)
+        return {text: result.text for text, result in zip(chunk, results)}
+
+    def _translate_all(self, translator, chunks, target_lang):
+        # Sin plazo: con un `executor` propio los lotes van en paralelo; el
+        # primer error se propaga igual que en el modo secuencial
+        if self.executor is not None and len(chunks) > 1:
+            results = self.executor.map(
+                lambda chunk: self._translate_chunk(translator, chunk, target_lang), chunks
+            )
+        else:
+            results = (self._translate_chunk(translator, chunk, target_lang) for chunk in chunks)
+        fresh = {}
+        for result in results:
+            fresh.update(result)
+        return fresh
+
+    def _translate_concurrently(self, translator, chunks, target_lang, timeout):
+        executor = self.executor or get_executor()
+        futures = [
+            executor.submit(self._translate_chunk, translator, chunk, target_lang)
+            for chunk in chunks
+        ]
+        done, not_done = wait(futures, timeout=max(timeout, 0))
+
+        fresh = {}
+        for future in done:
+            try:
+                fresh.update(future.result())
+            except Exception as e:
+                logger.error(f"Translation batch failed: {str(e)}")
+                self.partial = True
+
+        if not_done:
+            self.partial = True
+            logger.warning(
+                f"Translation deadline exceeded: {len(not_done)} of {len(futures)} batches pending"
+            )
+            for future in not_done:
+                # Los lotes que aun no empezaron se descartan; los que ya estan en
+                # vuelo se aprovechan para la cache en memoria cuando terminen
+                if not future.cancel():
+                    future.add_done_callback(partial(self._remember_late, target_lang))
+        return fresh
+
+    def _remember_late(self, target_lang, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        if self.memory is not None:
+            self.memory.add(future.result(), target_lang)
+        if self.cache is not None:
+            self.cache.set_many(future.result(), target_lang, persist=False)
@@ -0,0 +1,16 @@
+# Idioma en el que se escribe el menu
+SOURCE_LANGUAGE = "ES"
+
+# Ampliar la lista de idiomas soportados
+SUPPORTED_LANGUAGES = ["EN-GB", "ES"]
+
+# Valor de `lang` que pide todos los idiomas soportados en una sola respuesta
+ALL_LANGUAGES = "*"
+
+# Mapeo de idiomas obsoletos a los nuevos valores
+LANGUAGE_MAPPING = {
+    "EN": "EN-GB"
+}
+
+def target_languages():
+    return [lang for lang in SUPPORTED_LANGUAGES if lang != SOURCE_LANGUAGE]
@@ -0,0 +1,245 @@
+import logging
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FUZZY_THRESHOLD = 0.8
+DEFAULT_MEMORY_SIZE = 20000
+
+# Un segmento termina en signos de puntuacion o saltos de linea; el separador
+# (con sus espacios) se conserva tal cual al recomponer la traduccion. Un
+# signo seguido de una cifra no separa: "1.5", "1,5" o "12:30"
+SEGMENT_SEPARATOR = re.compile(r'(\s*(?:[.;:!?]+(?!\d)|,(?!\d)|\n)\s*)')
+WORD = re.compile(r'\w+')
+
+
+def split_segments(text):
+    """Divide `text` en [segmento, separador, segmento, ...]."""
+    return SEGMENT_SEPARATOR.split(text)
+
+
+def exact_key(segment):
+    return ' '.join(segment.casefold().split())
+
+
+def fuzzy_key(segment):
+    folded = unicodedata.normalize('NFKD', exact_key(segment))
+    return ''.join(char for char in folded if not unicodedata.combining(char))
+
+
+def trigrams(key):
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _is_typo(a, b):
+    """Una letra de mas o de menos en medio de una palabra larga."""
+    if len(a) < len(b):
+        a, b = b, a
+    if len(a) - len(b) != 1 or len(b) < 5 or a[-1] != b[-1]:
+        return False
+    return any(a[:i] + a[i + 1:] == b for i in range(len(a) - 1))
+
+
+def words_compatible(a, b):
+    """
+    Solo se reutiliza una traduccion si los segmentos tienen las mismas
+    palabras salvo acentos, mayusculas, puntuacion o una errata evidente;
+    "con papas" y "sin papas" nunca se consideran equivalentes.
+    """
+    words_a = WORD.findall(a)
+    words_b = WORD.findall(b)
+    if len(words_a) != len(words_b):
+        return False
+    return all(x == y or _is_typo(x, y) for x, y in zip(words_a, words_b))
+
+
+def match_case(source, matched_source, translation):
+    """Ajusta la mayuscula inicial de la traduccion reutilizada."""
+    if not source or not matched_source or not translation:
+        return translation
+    if source[0].isupper() and not matched_source[0].isupper():
+        return translation[0].upper() + translation[1:]
+    if source[0].islower() and matched_source[0].isupper():
+        return translation[0].lower() + translation[1:]
+    return translation
+
+
+class TranslationMemory:
+    """
+    Memoria de traduccion por segmentos.
+
+    Cada texto se divide en segmentos (frases y elementos separados por comas)
+    y cada segmento se busca primero de forma exacta (sin distinguir
+    mayusculas ni espacios) y luego en un indice de trigramas que encuentra
+    variantes casi identicas. Si se conoce algun segmento solo se envian a
+    DeepL los que faltan; si no se conoce ninguno se envia el texto entero,
+    para que DeepL traduzca con todo el contexto, y su traduccion se divide
+    despues para guardar los segmentos. La memoria se carga desde
+    TranslationCacheEntry la primera vez que se usa cada idioma.
+    """
+
+    def __init__(self, threshold=None, maxsize=None):
+        if threshold is None:
+            threshold = getattr(settings, 'TRANSLATION_MEMORY_FUZZY_THRESHOLD', DEFAULT_FUZZY_THRESHOLD)
+        if maxsize is None:
+            maxsize = getattr(settings, 'TRANSLATION_MEMORY_SIZE', DEFAULT_MEMORY_SIZE)
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._fuzzy = {}
+        self._index = defaultdict(set)
+        self._loaded = set()
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+    def lookup(self, segment, target_lang):
+        """Traduccion de `segment` desde la memoria, o None."""
+        self._ensure_loaded(target_lang)
+        with self._lock:
+            match = self._exact.get((target_lang, exact_key(segment)))
+            if match is not None:
+                self.exact_hits += 1
+                return match_case(segment, *match)
+
+            match = self._fuzzy_match(segment, target_lang)
+            if match is not None:
+                self.fuzzy_hits += 1
+                return match_case(segment, *match)
+
+            self.misses += 1
+            return None
+
+    def plan(self, text, target_lang):
+        """
+        Devuelve (partes, nuevos): `partes` alterna segmentos y separadores;
+        cada segmento es (texto, traduccion o None). `nuevos` son los
+        segmentos que hay que pedir a DeepL, o el texto entero si no se
+        conoce ninguno de sus segmentos.
+        """
+        parts = []
+        unknown = []
+        segments = 0
+        for position, part in enumerate(split_segments(text)):
+            if position % 2 or not part.strip():
+                parts.append(part)
+                continue
+            segments += 1
+            translation = self.lookup(part, target_lang)
+            parts.append((part, translation))
+            if translation is None:
+                unknown.append(part)
+        if segments > 1 and len(unknown) == segments:
+            return [(text, None)], [text]
+        return parts, unknown
+
+    @staticmethod
+    def assemble(parts, translations):
+        """Recompone el texto traducido o devuelve None si falta algun segmento."""
+        output = []
+        for part in parts:
+            if isinstance(part, str):
+                output.append(part)
+                continue
+            segment, translation = part
+            if translation is None:
+                translation = translations.get(segment)
+                if translation is None:
+                    return None
+            output.append(translation)
+        return ''.join(output)
+
+    def add(self, translations, target_lang):
+        """
+        Guarda los segmentos de cada traduccion. Un texto de varios segmentos
+        solo se guarda si su traduccion se divide en el mismo numero de
+        partes; si no, no se sabe que segmento corresponde a cada uno.
+        """
+        with self._lock:
+            for source, translation in translations.items():
+                source_parts = split_segments(source)
+                if len(source_parts) == 1:
+                    self._add(source, translation, target_lang)
+                    continue
+                translated_parts = split_segments(translation)
+                if len(translated_parts) != len(source_parts):
+                    continue
+                for position in range(0, len(source_parts), 2):
+                    self._add(source_parts[position], translated_parts[position].strip(), target_lang)
+
+    def clear(self):
+        with self._lock:
+            self._exact.clear()
+            self._fuzzy.clear()
+            self._index.clear()
+            self._loaded.clear()
+            self.exact_hits = 0
+            self.fuzzy_hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'segments': len(self._exact),
+                'maxsize': self.maxsize,
+                'exact_hits': self.exact_hits,
+                'fuzzy_hits': self.fuzzy_hits,
+                'misses': self.misses,
+            }
+
+    def _add(self, source, translation, target_lang):
+        key = (target_lang, exact_key(source))
+        if not key[1] or key in self._exact:
+            return
+        if len(self._exact) >= self.maxsize:
+            return
+        self._exact[key] = (source, translation)
+        folded = fuzzy_key(source)
+        grams = trigrams(folded)
+        self._fuzzy[key] = (folded, grams)
+        for gram in grams:
+            self._index[(target_lang, gram)].add(key)
+
+    def _fuzzy_match(self, segment, target_lang):
+        folded = fuzzy_key(segment)
+        grams = trigrams(folded)
+        shared = defaultdict(int)
+        for gram in grams:
+            for key in self._index.get((target_lang, gram), ()):
+                shared[key] += 1
+
+        best = None
+        best_score = self.threshold
+        for key, common in shared.items():
+            candidate, candidate_grams = self._fuzzy[key]
+            score = common / (len(grams) + len(candidate_grams) - common)
+            if score >= best_score and words_compatible(folded, candidate):
+                best, best_score = key, score
+        return self._exact[best] if best is not None else None
+
+    def _ensure_loaded(self, target_lang):
+        if target_lang in self._loaded:
+            return
+        from ..models import TranslationCacheEntry
+
+        with self._lock:
+            if target_lang in self._loaded:
+                return
+            self._loaded.add(target_lang)
+        try:
+            rows = TranslationCacheEntry.objects.filter(
+                target_lang=target_lang
+            ).order_by('-created_at').values_list('source_text', 'translated_text')[:self.maxsize]
+            self.add(dict(rows), target_lang)
+        except Exception as e:
+            logger.error(f"Could not load translation memory: {str(e)}")
+
+
+translation_memory = TranslationMemory()
@@ -0,0 +1,87 @@
+import logging
+import threading
+
+import deepl
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+class TranslatorService:
+    """
+    Cliente de DeepL compartido por todo el proceso.
+
+    El `deepl.Translator` se construye una sola vez (por clave de API) y se
+    reutiliza entre peticiones e hilos, de modo que su sesion HTTP mantiene
+    las conexiones abiertas (keep-alive) en lugar de repetir el handshake TLS
+    en cada respuesta traducida.
+
+    Todas las llamadas comparten un circuit breaker (`breaker`) para dejar de
+    esperar a DeepL mientras esta caido.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._translator = None
+        self._auth_key = None
+        self.breaker = CircuitBreaker(
+            'deepl',
+            failure_threshold=getattr(settings, 'TRANSLATION_BREAKER_FAILURES', 5),
+            slow_call_threshold=getattr(settings, 'TRANSLATION_BREAKER_SLOW_CALL', None),
+            reset_timeout=getattr(settings, 'TRANSLATION_BREAKER_RESET', 30.0),
+        )
+
+    def get_translator(self):
+        auth_key = getattr(settings, 'DEEPL_AUTH_KEY', None)
+        if not auth_key:
+            logger.error("DeepL API key is not configured.")
+            raise ValueError("DeepL API key is not configured.")
+
+        translator = self._translator
+        if translator is not None and self._auth_key == auth_key:
+            return translator
+
+        with self._lock:
+            if self._translator is None or self._auth_key != auth_key:
+                self._close(self._translator)
+                self._translator = self._build(auth_key)
+                self._auth_key = auth_key
+            return self._translator
+
+    def reset(self):
+        """Descarta el cliente actual; el siguiente uso crea uno nuevo."""
+        with self._lock:
+            self._close(self._translator)
+            self._translator = None
+            self._auth_key = None
+
+    def _build(self, auth_key):
+        # Los timeouts y reintentos del SDK son globales del modulo http_client
+        deepl.http_client.min_connection_timeout = getattr(settings, 'DEEPL_TIMEOUT', 5.0)
+        deepl.http_client.max_network_retries = getattr(settings, 'DEEPL_MAX_RETRIES', 2)
+
+        translator = deepl.Translator(auth_key)
+
+        session = getattr(getattr(translator, '_client', None), '_session', None)
+        if session is not None:
+            pool_size = getattr(settings, 'DEEPL_POOL_SIZE', 10)
+            # Los reintentos los gestiona el SDK; el adapter solo agrupa conexiones
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        return translator
+
+    @staticmethod
+    def _close(translator):
+        close = getattr(translator, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                logger.error(f"Error closing DeepL translator: {str(e)}")
+
+
+translator_service = TranslatorService()
@@ -0,0 +1,137 @@
+import logging
+
+from ..models import Category, Dish, Garrison, TranslatedField
+from .cache import source_hash
+from .languages import target_languages
+
+logger = logging.getLogger(__name__)
+
+# Campos que se traducen al escribir cada modelo
+TRANSLATABLE_FIELDS = {
+    Category: ['category_name'],
+    Dish: ['dish_name', 'description'],
+    Garrison: ['garrison_name'],
+}
+
+
+def get_stored_translations(model, ids, fields, language):
+    """Devuelve {(id, campo): (hash_fuente, texto)} de las traducciones guardadas."""
+    if not ids:
+        return {}
+    rows = TranslatedField.objects.filter(
+        model_name=model._meta.model_name,
+        object_id__in=ids,
+        language=language,
+        field_name__in=fields,
+    ).values_list('object_id', 'field_name', 'source_hash', 'text')
+    return {
+        (object_id, field_name): (digest, text)
+        for object_id, field_name, digest, text in rows
+    }
+
+
+def apply_stored_translations(model, data, fields, language):
+    """
+    Sustituye en `data` los campos que tienen una traduccion guardada y
+    vigente (mismo hash que el texto actual). Devuelve la lista de
+    (item, {campo: texto}) que aun quedan por traducir.
+    """
+    ids = [item['id'] for item in data if item.get('id') is not None]
+    stored = get_stored_translations(model, ids, fields, language)
+
+    pending = []
+    for item in data:
+        missing = {}
+        for field in fields:
+            value = item.get(field)
+            if not value:
+                continue
+            translation = stored.get((item.get('id'), field))
+            if translation and translation[0] == source_hash(value):
+                item[field] = translation[1]
+            else:
+                missing[field] = value
+        if missing:
+            pending.append((item, missing))
+    return pending
+
+
+def store_translations(model, instances, engine, languages=None):
+    """
+    Traduce los campos de `instances` a cada idioma y los guarda en
+    TranslatedField. Solo se envian los campos cuyo texto cambio desde la
+    ultima traduccion guardada; todos los textos de un idioma se traducen con
+    una sola llamada al motor (que agrupa y deduplica). Devuelve el numero de
+    campos guardados.
+    """
+    fields = TRANSLATABLE_FIELDS.get(model)
+    if not fields or not instances:
+        return 0
+
+    model_name = model._meta.model_name
+    ids = [instance.pk for instance in instances]
+    values = {
+        (instance.pk, field): getattr(instance, field)
+        for instance in instances for field in fields
+        if getattr(instance, field)
+    }
+    hashes = {key: source_hash(value) for key, value in values.items()}
+
+    existing = {
+        (object_id, field_name, language): digest
+        for object_id, field_name, language, digest in TranslatedField.objects.filter(
+            model_name=model_name, object_id__in=ids
+        ).values_list('object_id', 'field_name', 'language', 'source_hash')
+    }
+
+    # Campos que se vaciaron ya no tienen traduccion
+    emptied = {
+        (object_id, field_name) for object_id, field_name, _ in existing
+        if (object_id, field_name) not in values
+    }
+    for object_id, field_name in emptied:
+        TranslatedField.objects.filter(
+            model_name=model_name, object_id=object_id, field_name=field_name
+        ).delete()
+
+    stored = 0
+    for language in languages or target_languages():
+        outdated = [
+            key for key, digest in hashes.items()
+            if existing.get((key[0], key[1], language)) != digest
+        ]
+        if not outdated:
+            continue
+
+        translations = engine.translate([values[key] for key in outdated], language)
+        rows = [
+            TranslatedField(
+                model_name=model_name,
+                object_id=object_id,
+                field_name=field,
+                language=language,
+                source_hash=hashes[(object_id, field)],
+                text=translations[values[(object_id, field)]],
+            )
+            for object_id, field in outdated
+            if values[(object_id, field)] in translations
+        ]
+        TranslatedField.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['model_name', 'object_id', 'language', 'field_name'],
+            update_fields=['source_hash', 'text', 'updated_at'],
+        )
+        stored += len(rows)
+    return stored
+
+
+def store_instance_translations(instance, engine, languages=None):
+    return store_translations(type(instance), [instance], engine, languages)
+
+
+def delete_instance_translations(instance):
+    TranslatedField.objects.filter(
+        model_name=instance._meta.model_name,
+        object_id=instance.pk,
+    ).delete()
@@ -0,0 +1,163 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 60.0
+DEFAULT_BUDGET_THRESHOLD = 0.9
+
+COUNTERS = ('characters', 'deepl_requests', 'cache_hits', 'cache_misses', 'latency_ms')
+
+
+class QuotaExceededError(Exception):
+    pass
+
+
+def _empty_counters():
+    return dict.fromkeys(COUNTERS, 0)
+
+
+class UsageTracker:
+    """
+    Contadores de uso de DeepL por endpoint: caracteres enviados, peticiones,
+    aciertos y fallos de cache y latencia acumulada.
+
+    Los contadores se suman en memoria y se vuelcan a TranslationUsage (una
+    fila por dia y endpoint) como mucho cada `flush_interval` segundos. Con un
+    presupuesto mensual de caracteres (`DEEPL_CHARACTER_BUDGET`), al superar
+    `DEEPL_BUDGET_THRESHOLD` del mismo `cache_only()` pasa a True y el motor
+    deja de llamar a DeepL.
+    """
+
+    def __init__(self, flush_interval=None, budget=None, threshold=None, clock=time.monotonic):
+        if flush_interval is None:
+            flush_interval = getattr(settings, 'TRANSLATION_USAGE_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+        if budget is None:
+            budget = getattr(settings, 'DEEPL_CHARACTER_BUDGET', 0)
+        if threshold is None:
+            threshold = getattr(settings, 'DEEPL_BUDGET_THRESHOLD', DEFAULT_BUDGET_THRESHOLD)
+        self.flush_interval = flush_interval
+        self.budget = budget
+        self.threshold = threshold
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = defaultdict(_empty_counters)
+        self._totals = defaultdict(_empty_counters)
+        self._last_flush = clock()
+        self._month = None
+        self._month_characters = None
+
+    def record(self, endpoint, characters=0, requests=0, cache_hits=0, cache_misses=0, latency=0.0):
+        endpoint = endpoint or 'other'
+        values = {
+            'characters': characters,
+            'deepl_requests': requests,
+            'cache_hits': cache_hits,
+            'cache_misses': cache_misses,
+            'latency_ms': latency * 1000,
+        }
+        with self._lock:
+            for counters in (self._pending[endpoint], self._totals[endpoint]):
+                for name, value in values.items():
+                    counters[name] += value
+
+    def month_characters(self):
+        """Caracteres usados en el mes en curso (tabla + pendientes de volcar)."""
+        month = timezone.now().date().replace(day=1)
+        if self._month != month or self._month_characters is None:
+            self._refresh_month(month)
+        with self._lock:
+            pending = sum(counters['characters'] for counters in self._pending.values())
+        return self._month_characters + pending
+
+    def cache_only(self):
+        if not self.budget:
+            return False
+        return self.month_characters() >= self.budget * self.threshold
+
+    def flush_if_due(self):
+        if self.clock() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Vuelca los contadores pendientes a TranslationUsage."""
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                pending = dict(self._pending)
+                self._pending = defaultdict(_empty_counters)
+                self._last_flush = self.clock()
+            if not pending:
+                return
+            today = timezone.now().date()
+            try:
+                for endpoint, counters in pending.items():
+                    self._save(today, endpoint, counters)
+            except Exception as e:
+                logger.error(f"Could not flush translation usage: {str(e)}")
+                with self._lock:
+                    for endpoint, counters in pending.items():
+                        for name, value in counters.items():
+                            self._pending[endpoint][name] += value
+                return
+            self._refresh_month(today.replace(day=1))
+        finally:
+            self._flush_lock.release()
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {endpoint: dict(counters) for endpoint, counters in self._totals.items()}
+        used = self.month_characters() if self.budget else None
+        return {
+            'endpoints': endpoints,
+            'budget': self.budget or None,
+            'month_characters': used,
+            'cache_only': self.cache_only(),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._pending = defaultdict(_empty_counters)
+            self._totals = defaultdict(_empty_counters)
+            self._last_flush = self.clock()
+            self._month = None
+            self._month_characters = None
+
+    def _save(self, date, endpoint, counters):
+        from ..models import TranslationUsage
+
+        increments = {name: F(name) + value for name, value in counters.items()}
+        updated = TranslationUsage.objects.filter(date=date, endpoint=endpoint).update(**increments)
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                TranslationUsage.objects.create(date=date, endpoint=endpoint, **counters)
+        except IntegrityError:
+            # Otro proceso creo la fila entre tanto
+            TranslationUsage.objects.filter(date=date, endpoint=endpoint).update(**increments)
+
+    def _refresh_month(self, month):
+        from ..models import TranslationUsage
+
+        try:
+            total = TranslationUsage.objects.filter(date__gte=month).aggregate(
+                total=Sum('characters')
+            )['total'] or 0
+        except Exception as e:
+            logger.error(f"Could not read translation usage: {str(e)}")
+            total = self._month_characters or 0
+        self._month = month
+        self._month_characters = total
+
+
+usage_tracker = UsageTracker()
@@ -4,7 +4,7 @@ from .views import (
     DeskViewSet, AllergensViewSet, IngredientViewSet,
     DishViewSet, OrderViewSet, OrderDishViewSet,
     CategoryViewSet, GarrisonViewSet,
-    InvoiceViewSet, InvoiceDishViewSet
+    InvoiceViewSet, InvoiceDishViewSet, MenuViewSet, TranslationStatusViewSet
 )
 
 router = routers.DefaultRouter()
@@ -18,6 +18,8 @@ router.register(r'category', CategoryViewSet)
 router.register(r'garrison', GarrisonViewSet)
 router.register(r'invoice', InvoiceViewSet)
 router.register(r'invoicedish', InvoiceDishViewSet)
+router.register(r'menu', MenuViewSet, basename='menu')
+router.register(r'translation', TranslationStatusViewSet, basename='translation')
 
 urlpatterns = [
     path('', include(router.urls)),
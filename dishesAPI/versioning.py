@@ -0,0 +1,46 @@
+import hashlib
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Allergens, Category, Dish, Garrison, Ingredient, ModelVersion
+
+# Modelos del menu cuya version se incrementa en cada escritura
+VERSIONED_MODELS = (Allergens, Category, Dish, Garrison, Ingredient)
+
+
+def bump_version(model):
+    """Incrementa la version de `model` dentro de la transaccion en curso."""
+    model_name = model._meta.model_name
+    now = timezone.now()
+    updated = ModelVersion.objects.filter(model_name=model_name).update(
+        version=F('version') + 1, updated_at=now
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            ModelVersion.objects.create(model_name=model_name, version=1, updated_at=now)
+    except IntegrityError:
+        # Otro proceso creo la fila entre tanto
+        ModelVersion.objects.filter(model_name=model_name).update(
+            version=F('version') + 1, updated_at=now
+        )
+
+
+def get_versions(models):
+    """Devuelve {modelo: (version, updated_at)} con una sola consulta."""
+    names = [model._meta.model_name for model in models]
+    rows = ModelVersion.objects.filter(model_name__in=names).values_list(
+        'model_name', 'version', 'updated_at'
+    )
+    return {model_name: (version, updated_at) for model_name, version, updated_at in rows}
+
+
+def versions_etag(versions, *parts):
+    """ETag fuerte a partir de las versiones y de lo que varia la respuesta."""
+    key = '|'.join(
+        [f'{name}:{versions[name][0]}' for name in sorted(versions)] + [str(part) for part in parts]
+    )
+    return f'"{hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]}"'
@@ -1,18 +1,18 @@
 from datetime import datetime
-import os
+import time
 import deepl
 import re
 import logging
 from rest_framework import viewsets
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser, SAFE_METHODS
 from rest_framework.decorators import action
 from dotenv import load_dotenv
-from django.db.models import Sum, Count
-import jwt
+from django.db.models import Sum, Count, Prefetch
 from django.conf import settings
-from django.contrib.auth import get_user_model
-from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
+from rest_framework.exceptions import APIException, AuthenticationFailed
+from django.utils.http import http_date, parse_http_date_safe
+from authAPI.authentication import JWTAuthentication
 
 load_dotenv()
 
@@ -24,116 +24,264 @@ from .serializer import (
     CategorySerializer, DeskSerializer, AllergensSerializer,
     IngredientSerializer, DishSerializer, GarrisonSerializer,
     OrderSerializer, OrderDishSerializer, InvoiceSerializer,
-    InvoiceDishSerializer
+    InvoiceDishSerializer, MenuSerializer
 )
-
-# Ampliar la lista de idiomas soportados
-SUPPORTED_LANGUAGES = ["EN-GB", "ES"]
+from .translation import (
+    ALL_LANGUAGES, LANGUAGE_MAPPING, SOURCE_LANGUAGE, SUPPORTED_LANGUAGES, default_engine,
+    translation_cache, translation_memory, translator_service, usage_tracker
+)
+from .translation.store import apply_stored_translations
+from .versioning import get_versions, versions_etag
+from .response_cache import cache_response, response_cache
+from .pagination import KeysetPagination
+from .filters import AllergenExclusionFilter
+from .desks import desk_map
+from .search import DEFAULT_LIMIT, search_dishes
+from .fast_serializer import FastSerializer
+from .streaming import StreamingListMixin
 
 # Configurar el logger
 logger = logging.getLogger(__name__)
 
-# Mapeo de idiomas obsoletos a los nuevos valores
-LANGUAGE_MAPPING = {
-    "EN": "EN-GB"
-}
-
-def translate_fields(data, fields, target_lang):
-    auth_key = os.getenv("DEEPL_AUTH_KEY")
-    if not auth_key:
-        logger.error("DeepL API key is not configured.")
-        raise ValueError("DeepL API key is not configured.")
-
-    translator = deepl.Translator(auth_key)
+def translate_fields(data, fields, target_lang, deadline=None, endpoint=None):
+    """
+    Traduce en el sitio los `fields` de `data`. Con `deadline` (segundos) lo
+    que no se traduzca a tiempo conserva el texto original. Devuelve el motor
+    usado, con sus contadores (`partial`, `characters`, `cache_hits`...).
+    """
+    engine = default_engine(endpoint)
 
     try:
-        for item in data:
-            texts_to_translate = [item[field] if item.get(field) else "" for field in fields]
-            translations = translator.translate_text(
-                texts_to_translate, 
-                target_lang=target_lang
-            )
-            for i, field in enumerate(fields):
-                if item.get(field):
-                    item[field] = translations[i].text
+        engine.translate_payload(data, fields, target_lang, deadline=deadline)
+        return engine
     except deepl.exceptions.DeepLException as e:
         logger.error(f"DeepL API error: {str(e)}")
         raise
+    except ValueError:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         raise
 
-class BaseProtectedViewSet(viewsets.ModelViewSet):
+class SparseQuerysetMixin:
+    """
+    Con `?fields=` / `?omit=` la consulta solo carga las columnas de los
+    campos pedidos (`.only()`) y no hace los prefetch de las relaciones que
+    quedaron fuera de la respuesta.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = getattr(self.request, 'query_params', None)
+        if not params or self.request.method not in SAFE_METHODS:
+            return queryset
+        if getattr(self, 'action', None) not in ('list', 'retrieve'):
+            return queryset
+        if not (params.get('fields') or params.get('omit')):
+            return queryset
+
+        sources = {
+            field.source.split('.')[0]
+            for field in self.get_serializer().fields.values() if field.source != '*'
+        }
+        # La paginacion por cursor lee las columnas del orden
+        sources.update(name.lstrip('-') for name in getattr(self, 'ordering', None) or ())
+        columns = [
+            field.name for field in queryset.model._meta.concrete_fields
+            if field.primary_key or field.name in sources
+        ]
+        lookups = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_through', lookup).split('__')[0] in sources
+        ]
+        return queryset.prefetch_related(None).prefetch_related(*lookups).only(*columns)
+
+class FastListMixin:
+    """
+    Los listados se serializan con FastSerializer (`.values()` y conversores
+    precompilados) en lugar de instanciar el ModelSerializer por fila. Si el
+    serializer tiene campos que FastSerializer no reproduce, o con
+    FAST_READ_SERIALIZATION desactivado, se usa el camino normal de DRF.
+    """
+
+    def get_fast_serializer(self):
+        if not getattr(settings, 'FAST_READ_SERIALIZATION', True):
+            return None
+        return FastSerializer.compile(self.get_serializer())
+
+    def serialize_list(self, queryset):
+        fast = self.get_fast_serializer()
+        if fast is None:
+            return self.get_serializer(queryset, many=True).data
+        return fast.serialize(fast.values(queryset))
+
+    def list(self, request, *args, **kwargs):
+        fast = self.get_fast_serializer()
+        if fast is None:
+            return super().list(request, *args, **kwargs)
+        queryset = fast.values(
+            self.filter_queryset(self.get_queryset()),
+            [name.lstrip('-') for name in getattr(self, 'ordering', None) or ()]
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast.serialize(page))
+        return Response(fast.serialize(queryset))
+
+class NotModified(APIException):
+    status_code = 304
+    default_detail = 'Not modified.'
+
+class BaseProtectedViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
+    authentication_classes = [JWTAuthentication]
+    write_actions = ['create', 'update', 'partial_update', 'destroy']
+    read_actions = ['list', 'retrieve']
+    # Modelos de los que depende la respuesta (por defecto, el del queryset)
+    version_models = None
+
+    def perform_authentication(self, request):
+        # Las lecturas son publicas: el token solo se verifica cuando se usa
+        # `request.user`, es decir, en las escrituras
+        pass
+
+    def initial(self, request, *args, **kwargs):
+        # Un solo plazo de traduccion para toda la peticion, aunque se traduzcan
+        # varios modelos (menu) o varios idiomas (lang=*)
+        deadline = getattr(settings, 'TRANSLATION_DEADLINE', None)
+        self.translation_deadline_at = time.monotonic() + deadline if deadline is not None else None
+        super().initial(request, *args, **kwargs)
+        if self.action in self.write_actions:
+            self.get_jwt_user(request)
+        elif self.action in self.read_actions and request.method in ('GET', 'HEAD'):
+            self.check_not_modified(request)
+
+    def check_not_modified(self, request):
+        """
+        GET condicional: la version de los modelos se lee antes de la
+        consulta principal, asi que el ETag nunca es mas nuevo que los datos.
+        Si el cliente ya tiene esa version se responde 304 sin serializar.
+        """
+        versions = get_versions(self.version_models or [self.queryset.model])
+        if not versions:
+            return
+        self.versions = versions
+        self.etag = versions_etag(versions, request.get_full_path(), request.headers.get('Accept', ''))
+        self.last_modified = max(updated_at for _, updated_at in versions.values())
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            if self.etag in tags or '*' in tags:
+                raise NotModified()
+            return
+
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        if if_modified_since and int(self.last_modified.timestamp()) <= if_modified_since:
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=304)
+        return super().handle_exception(exc)
+
     def get_jwt_user(self, request):
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
+        # DRF autentica una sola vez y guarda el resultado en la peticion
+        user = request.user
+        if not user or not user.is_authenticated:
             raise AuthenticationFailed('No JWT token provided')
-        token = auth_header.split(' ')[1]
-        try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-        except jwt.ExpiredSignatureError:
-            raise AuthenticationFailed('Token expired')
-        except jwt.InvalidTokenError:
-            raise AuthenticationFailed('Invalid token')
-        User = get_user_model()
-        try:
-            user = User.objects.get(id=payload['user_id'])
-        except User.DoesNotExist:
-            raise AuthenticationFailed('User not found')
-        if not user.is_active:
-            raise PermissionDenied('User inactive')
         return user
 
-    def dispatch(self, request, *args, **kwargs):
-        action = getattr(self, "action", None)
-        if action in ['create', 'update', 'partial_update', 'destroy']:
-            user = self.get_jwt_user(request)
-            request.user = user
-        return super().dispatch(request, *args, **kwargs)
-
     def perform_destroy(self, instance):
         return super().perform_destroy(instance)
 
     def partial_update(self, request, *args, **kwargs):
         return Response({'error': 'Method not allowed'}, status=405)
 
-    def translate_response(self, data, fields, request):
-        target_lang = request.query_params.get('lang', 'ES').upper()
-        target_lang = re.sub(r'[^A-Z-]', '', target_lang.strip())
+    def translate_response(self, data, fields, request, model=None):
+        requested = request.query_params.get('lang', 'ES').strip()
+        if requested == ALL_LANGUAGES:
+            self.translate_all_languages(data, fields, model)
+            return
+
+        target_lang = re.sub(r'[^A-Z-]', '', requested.upper())
         target_lang = LANGUAGE_MAPPING.get(target_lang, target_lang)
 
         if target_lang not in SUPPORTED_LANGUAGES:
             raise ValueError(f"Language '{target_lang}' not supported.")
 
-        if target_lang != 'ES':
-            translate_fields(data, fields, target_lang)
-
-class ManualJWTProtectedActionsMixin:
-    def create(self, request, *args, **kwargs):
-        try:
-            self.get_jwt_user(request)
-        except Exception as e:
-            return Response({'detail': str(e)}, status=401)
-        return super().create(request, *args, **kwargs)
-
-    def update(self, request, *args, **kwargs):
-        try:
-            self.get_jwt_user(request)
-        except Exception as e:
-            return Response({'detail': str(e)}, status=401)
-        return super().update(request, *args, **kwargs)
-
-    def destroy(self, request, *args, **kwargs):
-        try:
-            self.get_jwt_user(request)
-        except Exception as e:
-            return Response({'detail': str(e)}, status=401)
-        return super().destroy(request, *args, **kwargs)
+        if target_lang == SOURCE_LANGUAGE:
+            return
+
+        self.translate_into(data, fields, target_lang, model)
+
+    def translate_all_languages(self, data, fields, model=None):
+        """
+        Modo `lang=*`: cada elemento conserva sus campos originales y anade
+        `translations` con los `fields` en todos los idiomas soportados, para
+        que el cliente cambie de idioma sin volver a pedir el menu.
+        """
+        per_language = {}
+        for language in SUPPORTED_LANGUAGES:
+            copies = [{field: item.get(field) for field in ['id'] + fields} for item in data]
+            if language != SOURCE_LANGUAGE:
+                self.translate_into(copies, fields, language, model)
+            per_language[language] = copies
+
+        for position, item in enumerate(data):
+            item['translations'] = {
+                language: {field: copies[position][field] for field in fields}
+                for language, copies in per_language.items()
+            }
+
+    def translate_into(self, data, fields, target_lang, model=None):
+        # Primero las traducciones guardadas al escribir; solo lo que falte
+        # (filas antiguas o sin traducir) pasa por la cache / DeepL
+        pending = apply_stored_translations(model or self.queryset.model, data, fields, target_lang)
+        if pending:
+            missing = [values for _, values in pending]
+            deadline = self.remaining_translation_time()
+            endpoint = f"{getattr(self, 'basename', None) or type(self).__name__}-{getattr(self, 'action', None)}"
+            engine = translate_fields(missing, fields, target_lang, deadline=deadline, endpoint=endpoint)
+            if engine is not None:
+                self.translation_engines = getattr(self, 'translation_engines', []) + [engine]
+                if engine.partial:
+                    self.translation_partial = True
+            for item, values in pending:
+                item.update(values)
+
+    def remaining_translation_time(self):
+        deadline_at = getattr(self, 'translation_deadline_at', None)
+        if deadline_at is None:
+            return None
+        return max(deadline_at - time.monotonic(), 0)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'translation_partial', False):
+            response['X-Translation-Partial'] = 'true'
+        elif getattr(self, 'etag', None) and response.status_code in (200, 304):
+            # Una traduccion incompleta no se cachea: el cliente debe repetir
+            response['ETag'] = self.etag
+            response['Last-Modified'] = http_date(self.last_modified.timestamp())
+        engines = getattr(self, 'translation_engines', None)
+        if engines:
+            # Contadores de esta peticion, visibles en las herramientas del navegador
+            requests = sum(engine.round_trips for engine in engines)
+            characters = sum(engine.characters for engine in engines)
+            deepl_ms = sum(engine.deepl_time for engine in engines) * 1000
+            hits = sum(engine.cache_hits for engine in engines)
+            misses = sum(engine.cache_misses for engine in engines)
+            response['Server-Timing'] = (
+                f'deepl;dur={deepl_ms:.1f};desc="{requests} requests, {characters} chars", '
+                f'translation-cache;desc="hits={hits} misses={misses}"'
+            )
+        return response
 
-class CategoryViewSet(ManualJWTProtectedActionsMixin, BaseProtectedViewSet):
+class CategoryViewSet(BaseProtectedViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
+    @cache_response
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
         serializer = self.get_serializer(queryset, many=True)
@@ -148,41 +296,67 @@ class CategoryViewSet(ManualJWTProtectedActionsMixin, BaseProtectedViewSet):
 
         return Response(data)
 
-class DeskViewSet(ManualJWTProtectedActionsMixin, BaseProtectedViewSet):
+class DeskViewSet(BaseProtectedViewSet):
     queryset = Desk.objects.all()
     serializer_class = DeskSerializer
 
     @action(detail=False, methods=['get'], url_path='by-number/(?P<desk_number>\\d+)')
     def by_number(self, request, desk_number=None):
-        try:
-            desk = Desk.objects.get(desk_number=desk_number)
-            serializer = self.get_serializer(desk)
-            return Response(serializer.data)
-        except Desk.DoesNotExist:
+        desk = desk_map.get(int(desk_number))
+        if desk is None:
             return Response({'error': f'Desk with number {desk_number} does not exist.'}, status=404)
+        serializer = self.get_serializer(desk)
+        return Response(serializer.data)
 
-class AllergensViewSet(ManualJWTProtectedActionsMixin, BaseProtectedViewSet):
+class AllergensViewSet(BaseProtectedViewSet):
     queryset = Allergens.objects.all()
     serializer_class = AllergensSerializer
 
-class IngredientViewSet(ManualJWTProtectedActionsMixin, BaseProtectedViewSet):
-    queryset = Ingredient.objects.all()
+class IngredientViewSet(BaseProtectedViewSet):
+    queryset = Ingredient.objects.prefetch_related('allergen')
     serializer_class = IngredientSerializer
 
-class DishViewSet(ManualJWTProtectedActionsMixin, BaseProtectedViewSet):
-    queryset = Dish.objects.all()
+class DishViewSet(FastListMixin, BaseProtectedViewSet):
+    # Ids relacionados por id: mismo orden que FastSerializer en cualquier base de datos
+    queryset = Dish.objects.prefetch_related(Prefetch('ingredient', Ingredient.objects.order_by('id')))
     serializer_class = DishSerializer
+    filter_backends = [AllergenExclusionFilter]
 
+    @cache_response
     def list(self, request, *args, **kwargs):
         try:
-            queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
-            data = serializer.data
+            data = self.serialize_list(self.filter_queryset(self.get_queryset()))
+            self.translate_response(data, ['dish_name', 'description'], request)
+            return Response(data)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        except Exception as e:
+            return Response({'error': 'An unexpected error occurred.'}, status=500)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """`?q=` en nombre, descripcion e ingredientes, del mas al menos relevante."""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': "The 'q' parameter is required."}, status=400)
+        try:
+            limit = min(
+                int(request.query_params.get('limit', getattr(settings, 'DISH_SEARCH_LIMIT', DEFAULT_LIMIT))),
+                getattr(settings, 'DISH_SEARCH_MAX_LIMIT', 100)
+            )
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return Response({'error': "The 'limit' parameter must be a positive integer."}, status=400)
+        try:
+            dishes = search_dishes(self.filter_queryset(self.get_queryset()), query, limit)
+            data = self.get_serializer(dishes, many=True).data
             self.translate_response(data, ['dish_name', 'description'], request)
             return Response(data)
         except ValueError as e:
             return Response({'error': str(e)}, status=400)
         except Exception as e:
+            logger.error(f"Dish search failed: {str(e)}")
             return Response({'error': 'An unexpected error occurred.'}, status=500)
 
     def retrieve(self, request, *args, **kwargs):
@@ -198,7 +372,7 @@ class DishViewSet(ManualJWTProtectedActionsMixin, BaseProtectedViewSet):
             return Response({'error': 'An unexpected error occurred.'}, status=500)
 
 class GarrisonViewSet(BaseProtectedViewSet):
-    queryset = Garrison.objects.all()
+    queryset = Garrison.objects.prefetch_related('dish')
     serializer_class = GarrisonSerializer
 
     def retrieve(self, request, *args, **kwargs):
@@ -215,6 +389,7 @@ class GarrisonViewSet(BaseProtectedViewSet):
 
         return Response(data)
 
+    @cache_response
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
         serializer = self.get_serializer(queryset, many=True)
@@ -229,9 +404,75 @@ class GarrisonViewSet(BaseProtectedViewSet):
 
         return Response(data)
 
-class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.all()
+class MenuViewSet(BaseProtectedViewSet):
+    """
+    Menu completo en una sola respuesta: categorias con sus platos y, por
+    plato, ingredientes (con alergenos) y guarniciones. Se construye siempre
+    con el mismo numero de consultas, sea cual sea el tamano del menu.
+    """
+    queryset = Category.objects.prefetch_related(
+        Prefetch(
+            'dish_set',
+            queryset=Dish.objects.prefetch_related('ingredient__allergen', 'garrisons').order_by('id'),
+        )
+    ).order_by('id')
+    serializer_class = MenuSerializer
+    version_models = [Allergens, Category, Dish, Garrison, Ingredient]
+    http_method_names = ['get', 'head', 'options']
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        data = self.get_serializer(queryset, many=True).data
+
+        try:
+            self.translate_menu(data, request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        except Exception as e:
+            return Response({'error': 'An unexpected error occurred.'}, status=500)
+
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        data = self.get_serializer(self.get_object()).data
+
+        try:
+            self.translate_menu([data], request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        except Exception as e:
+            return Response({'error': 'An unexpected error occurred.'}, status=500)
+
+        return Response(data)
+
+    def translate_menu(self, categories, request):
+        dishes = [dish for category in categories for dish in category.get('dishes', [])]
+        garrisons = [garrison for dish in dishes for garrison in dish.get('garrisons', [])]
+        self.translate_response(categories, ['category_name'], request, Category)
+        self.translate_response(dishes, ['dish_name', 'description'], request, Dish)
+        self.translate_response(garrisons, ['garrison_name'], request, Garrison)
+
+class TranslationStatusViewSet(viewsets.ViewSet):
+    # Estado interno (breaker, caches, consumo de DeepL): solo para staff
+    permission_classes = [IsAdminUser]
+    authentication_classes = [JWTAuthentication]
+
+    @action(detail=False, methods=['get'])
+    def status(self, request):
+        return Response({
+            'circuit_breaker': translator_service.breaker.snapshot(),
+            'cache': translation_cache.stats(),
+            'memory': translation_memory.stats(),
+            'usage': usage_tracker.snapshot(),
+            'response_cache': response_cache.stats(),
+        })
+
+class OrderViewSet(FastListMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
+    queryset = Order.objects.prefetch_related(Prefetch('order_dish', Dish.objects.order_by('id')))
     serializer_class = OrderSerializer
+    pagination_class = KeysetPagination
+    ordering = ('-date', '-time', '-id')
     permission_classes = [AllowAny]
     authentication_classes = []  # Permitir acceso sin autenticación
 
@@ -284,20 +525,26 @@ class OrderViewSet(viewsets.ModelViewSet):
             logger.error(f"Error in unified_statistics endpoint: {str(e)}")
             return Response({'error': str(e)}, status=500)
 
-class OrderDishViewSet(viewsets.ModelViewSet):
+class OrderDishViewSet(StreamingListMixin, FastListMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = OrderDish.objects.all()
     serializer_class = OrderDishSerializer
+    pagination_class = KeysetPagination
+    ordering = ('-id',)
     permission_classes = [AllowAny]
     authentication_classes = []
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = Invoice.objects.all()
     serializer_class = InvoiceSerializer
+    pagination_class = KeysetPagination
+    ordering = ('-id',)
     permission_classes = [AllowAny]
     authentication_classes = []
 
-class InvoiceDishViewSet(viewsets.ModelViewSet):
+class InvoiceDishViewSet(StreamingListMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = InvoiceDish.objects.all()
     serializer_class = InvoiceDishSerializer
+    pagination_class = KeysetPagination
+    ordering = ('-id',)
     permission_classes = [AllowAny]
     authentication_classes = []
\ No newline at end of file